@@ -1,17 +1,21 @@
 from django.urls import path
 from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
     TokenRefreshView,
     TokenVerifyView,
 )
-from .views import UserRegistrationView, UserProfileView, ChangePasswordView
+from .views import (
+    UserRegistrationView,
+    UserProfileView,
+    ChangePasswordView,
+    CartMergingTokenObtainPairView,
+)
 
 urlpatterns = [
     path("register/", UserRegistrationView.as_view(), name="user-register"),
     path("profile/", UserProfileView.as_view(), name="user-profile"),
     path("change-password/", ChangePasswordView.as_view(), name="change-password"),
     # JWT Token URLs
-    path("token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
+    path("token/", CartMergingTokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("token/verify/", TokenVerifyView.as_view(), name="token_verify"),
 ]
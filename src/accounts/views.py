@@ -1,6 +1,9 @@
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.views import TokenObtainPairView
+from orders.guest_cart import GUEST_CART_HEADER, merge_guest_cart
 from .serializers import (
     UserRegistrationSerializer,
     UserProfileSerializer,
@@ -68,3 +71,24 @@ class ChangePasswordView(APIView):
         return Response(
             {"message": "Password changed successfully."}, status=status.HTTP_200_OK
         )
+
+
+class CartMergingTokenObtainPairView(TokenObtainPairView):
+    """
+    API endpoint for obtaining a JWT pair.
+    POST /api/auth/token/
+    When an X-Cart-Key header is sent, the guest cart is merged into the user's cart.
+    """
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        try:
+            serializer.is_valid(raise_exception=True)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+
+        cart_key = request.headers.get(GUEST_CART_HEADER)
+        if cart_key:
+            merge_guest_cart(serializer.user, cart_key)
+
+        return Response(serializer.validated_data, status=status.HTTP_200_OK)
@@ -63,6 +63,7 @@ INSTALLED_APPS = [
     "products",
     "content",
     "orders",
+    "reports",
     "django_cleanup.apps.CleanupConfig",
     "docs",
     "drf_spectacular",
@@ -193,6 +194,60 @@ AWS_S3_OBJECT_PARAMETERS = {"CacheControl": "max-age=86400"}
 AWS_DEFAULT_ACL = None
 AWS_QUERYSTRING_AUTH = False  # To avoid URLs with tokens
 
+# Cache
+# LocMem is per-process; point CACHE_BACKEND/CACHE_LOCATION at a shared cache
+# (e.g. Redis or Memcached) when running several workers.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
+CATALOG_CACHE_TIMEOUT = int(os.getenv("CATALOG_CACHE_TIMEOUT", 300))
+
+# Seconds a cart line keeps its quantity reserved after being added/updated
+CART_RESERVATION_TTL = int(os.getenv("CART_RESERVATION_TTL", 900))
+
+# Seconds an anonymous (signed-token) cart survives without activity
+GUEST_CART_TTL = int(os.getenv("GUEST_CART_TTL", 7 * 24 * 3600))
+
+# Seconds a checkout Idempotency-Key is replayed before it expires
+IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL", 24 * 3600))
+
+# Queue checkouts (202 + ticket) for the process_checkout_queue worker
+CHECKOUT_QUEUE_ENABLED = bool(int(os.getenv("CHECKOUT_QUEUE_ENABLED", 0)))
+# Seconds a worker's claim on a ticket lasts before the ticket is requeued
+CHECKOUT_QUEUE_LEASE = int(os.getenv("CHECKOUT_QUEUE_LEASE", 300))
+
+# Days after which DELIVERED/CANCELLED orders move to the archive tables
+ORDER_ARCHIVE_AFTER_DAYS = int(os.getenv("ORDER_ARCHIVE_AFTER_DAYS", 365))
+
+# Order event outbox: sinks dispatch_outbox delivers to (BACKEND + OPTIONS,
+# like CACHES/STORAGES), and how often a failing batch is retried
+OUTBOX_SINKS = []
+if os.getenv("OUTBOX_WEBHOOK_URL"):
+    OUTBOX_SINKS.append(
+        {
+            "BACKEND": "orders.outbox.WebhookSink",
+            "OPTIONS": {
+                "url": os.getenv("OUTBOX_WEBHOOK_URL"),
+                "secret": os.getenv("OUTBOX_WEBHOOK_SECRET", ""),
+                "timeout": int(os.getenv("OUTBOX_WEBHOOK_TIMEOUT", 10)),
+            },
+        }
+    )
+if os.getenv("OUTBOX_FILE_PATH"):
+    OUTBOX_SINKS.append(
+        {
+            "BACKEND": "orders.outbox.FileSink",
+            "OPTIONS": {"path": os.getenv("OUTBOX_FILE_PATH")},
+        }
+    )
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 8))
+OUTBOX_RETRY_BACKOFF = int(os.getenv("OUTBOX_RETRY_BACKOFF", 30))
+
 # Custom User Model
 AUTH_USER_MODEL = "accounts.CustomUser"
 
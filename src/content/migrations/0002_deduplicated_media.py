@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:47
+
+import utils.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("content", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="contentblock",
+            name="image",
+            field=models.ImageField(
+                blank=True,
+                db_index=True,
+                max_length=255,
+                null=True,
+                storage=utils.storage.get_media_storage,
+                upload_to="content/",
+            ),
+        ),
+    ]
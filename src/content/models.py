@@ -1,4 +1,5 @@
 from django.db import models
+from utils.storage import get_media_storage
 
 
 class Content(models.Model):
@@ -30,7 +31,14 @@ class ContentBlock(models.Model):
     subtitle = models.CharField(max_length=200, blank=True)
     content_text = models.TextField(blank=True)
     items = models.JSONField(default=list, blank=True)
-    image = models.ImageField(upload_to="content/", blank=True, null=True)
+    image = models.ImageField(
+        upload_to="content/",
+        storage=get_media_storage,
+        max_length=255,
+        db_index=True,
+        blank=True,
+        null=True,
+    )
     order = models.PositiveIntegerField(default=0)
     is_active = models.BooleanField(default=True)
     type = models.CharField(max_length=50, blank=True)
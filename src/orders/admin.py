@@ -1,20 +1,152 @@
-from django.contrib import admin
-from .models import Order, OrderProduct, Cart, CartProduct
+from django import forms
+from django.contrib import admin, messages
+from django.utils import timezone
+from .export import export_lines, streaming_export_response
+from .models import (
+    ArchivedOrder,
+    ArchivedOrderProduct,
+    Cart,
+    CartProduct,
+    CheckoutTicket,
+    IdempotencyKey,
+    Order,
+    OrderProduct,
+    OutboxEvent,
+)
 
 
 class OrderProductInline(admin.TabularInline):
     model = OrderProduct
     extra = 0
-    readonly_fields = ["price_at_purchase"]
+    readonly_fields = ["price_at_purchase", "product_name", "variant_name", "sku"]
+
+
+class OrderAdminForm(forms.ModelForm):
+    class Meta:
+        model = Order
+        fields = "__all__"
+
+    def clean_status(self):
+        status = self.cleaned_data["status"]
+        original = self.instance
+        if original.pk and status != original.status:
+            if not original.can_transition_to(status):
+                raise forms.ValidationError(
+                    f"No se puede pasar de {original.status} a {status}"
+                )
+        return status
+
+
+def transition_action(status, label):
+    def action(modeladmin, request, queryset):
+        updated = queryset.transition_to(status)
+        skipped = queryset.count() - len(updated)
+        modeladmin.message_user(request, f"{len(updated)} pedidos marcados {label}")
+        if skipped:
+            modeladmin.message_user(
+                request,
+                f"{skipped} pedidos omitidos (transición no permitida)",
+                messages.WARNING,
+            )
+
+    action.__name__ = f"mark_{status.lower()}"
+    action.short_description = f"Marcar como {label}"
+    return action
+
+
+@admin.action(description="Exportar líneas seleccionadas (CSV)")
+def export_csv(modeladmin, request, queryset):
+    return streaming_export_response(export_lines(orders=queryset), "csv")
 
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
+    form = OrderAdminForm
     list_display = ["id", "user", "status", "total_price", "created_at"]
     list_filter = ["status", "created_at"]
     search_fields = ["user__username", "id"]
     inlines = [OrderProductInline]
+    actions = [
+        transition_action("PAID", "pagados"),
+        transition_action("SHIPPED", "enviados"),
+        transition_action("DELIVERED", "entregados"),
+        transition_action("CANCELLED", "cancelados"),
+        export_csv,
+    ]
+
+    def save_model(self, request, obj, form, change):
+        # Status edits go through transition_to so its signals fire
+        if not change or "status" not in form.changed_data:
+            return super().save_model(request, obj, form, change)
+        status, obj.status = obj.status, form.initial["status"]
+        super().save_model(request, obj, form, change)
+        Order.objects.filter(pk=obj.pk).transition_to(status)
+        obj.status = status
+
+
+class ArchivedOrderProductInline(admin.TabularInline):
+    model = ArchivedOrderProduct
+    extra = 0
+    can_delete = False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    list_display = ["id", "user", "status", "total_price", "created_at", "archived_at"]
+    list_filter = ["status", "created_at"]
+    search_fields = ["user__email", "id"]
+    inlines = [ArchivedOrderProductInline]
+    actions = [export_csv]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(CheckoutTicket)
+class CheckoutTicketAdmin(admin.ModelAdmin):
+    list_display = ["id", "user", "status", "order", "created_at", "processed_at"]
+    list_filter = ["status"]
+    search_fields = ["user__email", "id"]
+    raw_id_fields = ["user", "order"]
+
+
+@admin.action(description="Reintentar envío")
+def retry_events(modeladmin, request, queryset):
+    updated = queryset.exclude(status=OutboxEvent.DELIVERED).update(
+        status=OutboxEvent.PENDING, attempts=0, next_attempt_at=timezone.now()
+    )
+    modeladmin.message_user(request, f"{updated} eventos reencolados")
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = [
+        "id",
+        "event_type",
+        "order_id",
+        "status",
+        "attempts",
+        "next_attempt_at",
+        "created_at",
+    ]
+    list_filter = ["status", "event_type"]
+    search_fields = ["order_id"]
+    readonly_fields = ["payload", "last_error", "created_at", "delivered_at"]
+    actions = [retry_events]
 
 
 admin.site.register(Cart)
 admin.site.register(CartProduct)
+
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    list_display = ["key", "user", "response_status", "created_at"]
+    search_fields = ["key", "user__email"]
+    readonly_fields = ["response_status", "response_body", "created_at"]
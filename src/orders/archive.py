@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedOrder, ArchivedOrderProduct, Order, OrderProduct
+
+ARCHIVABLE_STATUSES = ("DELIVERED", "CANCELLED")
+ORDER_FIELDS = [
+    "id",
+    "user_id",
+    "status",
+    "total_price",
+    "shipping_address",
+    "billing_address",
+    "tracking_number",
+    "created_at",
+    "updated_at",
+]
+LINE_FIELDS = [
+    "id",
+    "order_id",
+    "product_variant_id",
+    "quantity",
+    "price_at_purchase",
+    "product_name",
+    "variant_name",
+    "sku",
+    "attributes",
+]
+
+
+def archive_cutoff(days=None):
+    if days is None:
+        days = settings.ORDER_ARCHIVE_AFTER_DAYS
+    return timezone.now() - timedelta(days=days)
+
+
+def archive_batch(cutoff, batch_size):
+    """
+    Moves up to `batch_size` closed orders placed before `cutoff`, with their
+    lines, into the archive tables in one short transaction: two bulk INSERTs
+    and two DELETEs. Returns the number of orders moved.
+    """
+    with transaction.atomic():
+        orders = list(
+            Order.objects.filter(status__in=ARCHIVABLE_STATUSES, created_at__lt=cutoff)
+            .select_for_update()
+            .order_by("id")
+            .values(*ORDER_FIELDS)[:batch_size]
+        )
+        if not orders:
+            return 0
+        ids = [order["id"] for order in orders]
+        lines = OrderProduct.objects.filter(order_id__in=ids)
+
+        ArchivedOrder.objects.bulk_create([ArchivedOrder(**o) for o in orders])
+        ArchivedOrderProduct.objects.bulk_create(
+            [ArchivedOrderProduct(**line) for line in lines.values(*LINE_FIELDS)]
+        )
+        lines.delete()
+        Order.objects.filter(id__in=ids).delete()
+    return len(ids)
+
+
+def archive_orders(cutoff, batch_size=500):
+    """Archives every closed order older than `cutoff`, batch by batch."""
+    archived = 0
+    while True:
+        moved = archive_batch(cutoff, batch_size)
+        if not moved:
+            return archived
+        archived += moved
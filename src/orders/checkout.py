@@ -0,0 +1,183 @@
+from collections import Counter
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Prefetch, Q, Sum, When
+
+from products.models import AttributeValue, ProductVariant, StockMovement
+from products.stock_ledger import record_movements
+from products.variant_matrix import invalidate_variant_matrix
+from .models import CartProduct, Order, OrderProduct, variant_snapshot
+from .reservations import held_quantity, with_available_stock
+from .signals import order_placed
+
+
+class CheckoutError(Exception):
+    """Raised when a cart cannot be turned into an order (empty cart, no stock)."""
+
+
+def load_cart_items(user):
+    return list(
+        CartProduct.objects.filter(cart__user=user)
+        .select_related("product_variant__product")
+        .prefetch_related(
+            Prefetch(
+                "product_variant__attribute_values",
+                queryset=AttributeValue.objects.select_related("attribute"),
+            )
+        )
+        .order_by("product_variant_id")
+    )
+
+
+def decrement_stock(quantities, cart=None):
+    """
+    Decrements stock for {variant_id: quantity} with a single conditional UPDATE:
+
+        UPDATE ... SET stock = CASE id WHEN .. THEN stock - qty END
+        WHERE (id = .. AND stock >= qty + held by other carts) OR ...
+
+    The database re-checks the condition against the latest committed row, so
+    concurrent checkouts cannot oversell, and stock reserved by other carts is
+    left alone. The cart's own holds turn into the sale, no extra locking needed.
+    Returns the ids that lacked stock.
+    """
+    held = held_quantity(exclude_cart=cart)
+    condition = Q()
+    for variant_id, quantity in quantities.items():
+        condition |= Q(id=variant_id, stock__gte=held + quantity)
+
+    updated = ProductVariant.objects.filter(condition).update(
+        stock=Case(
+            *[
+                When(id=variant_id, then=F("stock") - quantity)
+                for variant_id, quantity in quantities.items()
+            ],
+            default=F("stock"),
+            output_field=IntegerField(),
+        )
+    )
+    if updated == len(quantities):
+        return []
+
+    available = dict(
+        with_available_stock(
+            ProductVariant.objects.filter(id__in=quantities), exclude_cart=cart
+        ).values_list("id", "available_stock")
+    )
+    return [vid for vid, qty in quantities.items() if available.get(vid, 0) < qty]
+
+
+def create_order(user, items, shipping_address, billing_address):
+    order = Order.objects.create(
+        user=user,
+        status="PENDING",
+        total_price=sum(
+            (i.product_variant.price * i.quantity for i in items), Decimal("0.00")
+        ),
+        shipping_address=shipping_address,
+        billing_address=billing_address,
+    )
+    OrderProduct.objects.bulk_create(
+        [
+            OrderProduct(
+                order=order,
+                product_variant=item.product_variant,
+                quantity=item.quantity,
+                price_at_purchase=item.product_variant.price,
+                **variant_snapshot(item.product_variant),
+            )
+            for item in items
+        ]
+    )
+    return order
+
+
+def place_order(user, shipping_address, billing_address):
+    """
+    Converts the user's cart into an Order in one transaction: order +
+    bulk-created lines, cart cleared, SALE movements appended to the stock
+    ledger, and finally the conditional stock decrement.
+
+    The update of the shared variant rows comes last, so their row locks are
+    held only until the commit right after it; during a flash sale concurrent
+    checkouts of the same SKU queue for that short tail instead of the whole
+    transaction. Product rows are not touched: popularity (units_sold) is
+    refreshed from the sales rollups by a periodic job.
+    """
+    with transaction.atomic():
+        items = load_cart_items(user)
+        if not items:
+            raise CheckoutError("El carrito está vacío")
+
+        quantities = Counter()
+        product_ids = set()
+        for item in items:
+            quantities[item.product_variant_id] += item.quantity
+            product_ids.add(item.product_variant.product_id)
+
+        order = create_order(user, items, shipping_address, billing_address)
+        CartProduct.objects.filter(id__in=[item.id for item in items]).delete()
+        record_movements(
+            StockMovement.SALE,
+            {vid: -qty for vid, qty in quantities.items()},
+            order_id=order.id,
+        )
+        order_placed.send(sender=Order, order=order)
+
+        missing = decrement_stock(quantities, cart=items[0].cart_id)
+        if missing:
+            variant = next(
+                i.product_variant for i in items if i.product_variant_id in missing
+            )
+            raise CheckoutError(f"Stock insuficiente para {variant.product.name}")
+
+        transaction.on_commit(lambda: invalidate_variant_matrix(*product_ids))
+
+    return order
+
+
+def restock_orders(order_ids):
+    """
+    Puts the stock of cancelled orders back: one aggregate query, one UPDATE
+    and one CANCELLATION movement per order line in the ledger.
+    """
+    lines = list(
+        OrderProduct.objects.filter(order_id__in=order_ids)
+        .values_list("order_id", "product_variant_id")
+        .annotate(total=Sum("quantity"))
+        .order_by()
+    )
+    quantities = Counter()
+    for _, variant_id, quantity in lines:
+        quantities[variant_id] += quantity
+    if not quantities:
+        return
+
+    ProductVariant.objects.filter(id__in=quantities).update(
+        stock=Case(
+            *[
+                When(id=variant_id, then=F("stock") + quantity)
+                for variant_id, quantity in quantities.items()
+            ],
+            default=F("stock"),
+            output_field=IntegerField(),
+        )
+    )
+    StockMovement.objects.bulk_create(
+        [
+            StockMovement(
+                product_variant_id=variant_id,
+                kind=StockMovement.CANCELLATION,
+                quantity=quantity,
+                order_id=order_id,
+            )
+            for order_id, variant_id, quantity in lines
+        ]
+    )
+    product_ids = set(
+        ProductVariant.objects.filter(id__in=quantities).values_list(
+            "product_id", flat=True
+        )
+    )
+    transaction.on_commit(lambda: invalidate_variant_matrix(*product_ids))
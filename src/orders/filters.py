@@ -0,0 +1,12 @@
+from django_filters import rest_framework as filters
+from .models import Order
+
+
+class OrderFilter(filters.FilterSet):
+    status = filters.ChoiceFilter(choices=Order.STATUS_CHOICES)
+    # ?created_after=2026-01-01&created_before=2026-01-31 (inclusive days)
+    created = filters.DateFromToRangeFilter(field_name="created_at")
+
+    class Meta:
+        model = Order
+        fields = ["status", "created"]
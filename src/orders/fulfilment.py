@@ -0,0 +1,94 @@
+import csv
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Order
+from .signals import order_status_changed
+
+TRACKING_CSV_FIELDS = ("order_id", "tracking_number")
+TRACKING_MAX_LENGTH = Order._meta.get_field("tracking_number").max_length
+
+
+def read_tracking_csv(lines):
+    """Yields (line_number, order_id, tracking_number) from a CSV with a header row."""
+    reader = csv.DictReader(lines)
+    missing = set(TRACKING_CSV_FIELDS) - set(reader.fieldnames or [])
+    if missing:
+        raise ValueError(f"Missing CSV columns: {', '.join(sorted(missing))}")
+    for row in reader:
+        yield (
+            reader.line_num,
+            (row["order_id"] or "").strip(),
+            (row["tracking_number"] or "").strip(),
+        )
+
+
+def parse_tracking_row(order_id, tracking_number):
+    """Returns (order_id, tracking_number) or raises ValueError with the reason."""
+    if not order_id.isdigit():
+        raise ValueError("Invalid order_id")
+    if not tracking_number or len(tracking_number) > TRACKING_MAX_LENGTH:
+        raise ValueError("Invalid tracking_number")
+    return int(order_id), tracking_number
+
+
+def apply_tracking_batch(rows):
+    """
+    Sets tracking numbers for one chunk of (line, order_id, tracking_number):
+    one SELECT for the orders and one bulk_update. PAID orders move to SHIPPED;
+    SHIPPED orders only get their tracking number corrected.
+    Returns (updated, errors).
+    """
+    errors, parsed = [], {}
+    for line, order_id, tracking_number in rows:
+        try:
+            order_id, tracking_number = parse_tracking_row(order_id, tracking_number)
+        except ValueError as e:
+            errors.append({"line": line, "error": str(e)})
+            continue
+        parsed[order_id] = (line, tracking_number)
+
+    now = timezone.now()
+    with transaction.atomic():
+        orders = Order.objects.select_for_update().in_bulk(list(parsed))
+        changed, shipped = [], []
+        for order_id, (line, tracking_number) in parsed.items():
+            order = orders.get(order_id)
+            if order is None:
+                errors.append({"line": line, "error": "Order not found"})
+            elif order.status not in ("PAID", "SHIPPED"):
+                errors.append(
+                    {"line": line, "error": f"Cannot ship a {order.status} order"}
+                )
+            else:
+                if order.status == "PAID":
+                    shipped.append(order.id)
+                order.tracking_number = tracking_number
+                order.status = "SHIPPED"
+                order.updated_at = now
+                changed.append(order)
+        Order.objects.bulk_update(changed, ["tracking_number", "status", "updated_at"])
+        if shipped:
+            order_status_changed.send(sender=Order, order_ids=shipped, status="SHIPPED")
+    return len(changed), errors
+
+
+def import_tracking_numbers(lines, batch_size=500):
+    """
+    Imports an order_id,tracking_number CSV in chunks of `batch_size` rows,
+    each applied in its own short transaction.
+    Returns {"updated": n, "errors": [{"line", "error"}, ...]}.
+    """
+    rows = read_tracking_csv(lines)
+    result = {"updated": 0, "errors": []}
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        updated, errors = apply_tracking_batch(batch)
+        result["updated"] += updated
+        result["errors"] += errors
+    result["errors"].sort(key=lambda e: e["line"])
+    return result
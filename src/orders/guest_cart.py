@@ -0,0 +1,85 @@
+import secrets
+
+from django.conf import settings
+from django.core import signing
+from django.db import transaction
+
+from .models import Cart
+from .reservations import fill_cart, lock_variants
+
+GUEST_CART_HEADER = "X-Cart-Key"
+GUEST_CART_SALT = "orders.guest-cart"
+# Bounds the size of the token the client sends back on every request
+GUEST_CART_MAX_LINES = 50
+
+
+def new_cart_id():
+    return secrets.token_urlsafe(12)
+
+
+class GuestCart:
+    """
+    Anonymous cart carried by the client: the X-Cart-Key header is a signed,
+    compressed {"id", "lines": {variant_id: quantity}} token re-issued on every
+    change. Any worker can read it and nothing is stored server-side until the
+    guest logs in; a token not refreshed for GUEST_CART_TTL seconds is ignored.
+    """
+
+    def __init__(self, key=None):
+        self.id, self.lines = None, {}
+        if not key:
+            return
+        try:
+            data = signing.loads(
+                key, salt=GUEST_CART_SALT, max_age=settings.GUEST_CART_TTL
+            )
+        except signing.BadSignature:
+            return
+        self.id = data["id"]
+        self.lines = {int(vid): qty for vid, qty in data["lines"].items()}
+
+    @property
+    def key(self):
+        if self.id is None:
+            return None
+        return signing.dumps(
+            {"id": self.id, "lines": self.lines}, salt=GUEST_CART_SALT, compress=True
+        )
+
+    def is_full_for(self, variant_id):
+        return variant_id not in self.lines and len(self.lines) >= GUEST_CART_MAX_LINES
+
+    def set(self, variant_id, quantity):
+        if self.id is None:
+            self.id = new_cart_id()
+        if quantity <= 0:
+            self.lines.pop(variant_id, None)
+        else:
+            self.lines[variant_id] = quantity
+
+    def clear(self):
+        self.lines = {}
+
+
+def merge_guest_cart(user, key):
+    """
+    Moves a guest cart into the user's persistent Cart: quantities are added to
+    existing lines, capped at available stock (other carts' holds excluded),
+    and reserved like any cart line. A token is merged only once per cart, so
+    replaying it on a later login does not add the lines again.
+    """
+    guest = GuestCart(key)
+    if not guest.lines:
+        return None
+
+    with transaction.atomic():
+        # Variants before the cart: add_to_cart takes its locks in that order
+        lock_variants(guest.lines)
+        cart, _ = Cart.objects.get_or_create(user=user)
+        cart = Cart.objects.select_for_update().get(pk=cart.pk)
+        if cart.merged_guest_cart == guest.id:
+            return cart
+        fill_cart(cart, guest.lines)
+        cart.merged_guest_cart = guest.id
+        cart.save(update_fields=["merged_guest_cart"])
+    return cart
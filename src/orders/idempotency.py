@@ -0,0 +1,95 @@
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = IdempotencyKey._meta.get_field("key").max_length
+
+
+def is_valid_key(key):
+    return 0 < len(key) <= MAX_KEY_LENGTH
+
+
+def expiry_cutoff():
+    """Keys created before this are expired: no longer replayed, safe to purge."""
+    return timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+
+
+def stored_response(user, key):
+    """
+    Returns the (status, body) recorded for an unexpired key, or None (one
+    indexed lookup).
+    """
+    return (
+        IdempotencyKey.objects.filter(
+            user=user,
+            key=key,
+            response_status__isnull=False,
+            created_at__gte=expiry_cutoff(),
+        )
+        .values_list("response_status", "response_body")
+        .first()
+    )
+
+
+def claim_and_run(user, key, produce):
+    with transaction.atomic():
+        claim = IdempotencyKey.objects.create(user=user, key=key)
+        status_code, data = produce()
+        claim.response_status = status_code
+        # Store exactly what the client received
+        claim.response_body = json.loads(JSONRenderer().render(data))
+        claim.save(update_fields=["response_status", "response_body"])
+    return status_code, data
+
+
+def run_idempotent(user, key, produce):
+    """
+    Runs produce() -> (status, data) at most once per (user, key) and returns
+    (status, body, replayed).
+
+    The key is claimed in the same transaction as the work: if produce() raises,
+    the claim is rolled back and the client may retry. A concurrent request with
+    the same key blocks on the unique index until the first one commits, then
+    gets IntegrityError and replays the stored response. Keys expire after
+    IDEMPOTENCY_KEY_TTL seconds; purge_idempotency_keys deletes them.
+    """
+    stored = stored_response(user, key)
+    if stored is not None:
+        return (*stored, True)
+
+    try:
+        status_code, data = claim_and_run(user, key, produce)
+    except IntegrityError:
+        stored = stored_response(user, key)
+        if stored is not None:
+            return (*stored, True)
+        # The key was used before but has expired: it starts over as a new key
+        expired = IdempotencyKey.objects.filter(
+            user=user, key=key, created_at__lt=expiry_cutoff()
+        )
+        if not expired.delete()[0]:
+            raise
+        status_code, data = claim_and_run(user, key, produce)
+    return status_code, data, False
+
+
+def purge_expired_keys(batch_size=1000):
+    """Deletes expired keys in batches, one short transaction each."""
+    cutoff = expiry_cutoff()
+    purged = 0
+    while True:
+        ids = list(
+            IdempotencyKey.objects.filter(created_at__lt=cutoff).values_list(
+                "id", flat=True
+            )[:batch_size]
+        )
+        if not ids:
+            return purged
+        purged += IdempotencyKey.objects.filter(id__in=ids).delete()[0]
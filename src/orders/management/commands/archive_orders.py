@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from orders.archive import archive_cutoff, archive_orders
+
+
+class Command(BaseCommand):
+    help = "Moves DELIVERED/CANCELLED orders older than --days into the archive tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, help="Defaults to settings.ORDER_ARCHIVE_AFTER_DAYS"
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        archived = archive_orders(
+            archive_cutoff(options["days"]), batch_size=options["batch_size"]
+        )
+        self.stdout.write(f"Archived {archived} orders")
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.outbox import load_sinks, run_dispatcher
+
+
+class Command(BaseCommand):
+    help = "Delivers pending order events from the outbox to OUTBOX_SINKS."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--poll-interval", type=float, default=1.0)
+        parser.add_argument(
+            "--once", action="store_true", help="Exit when nothing is due"
+        )
+
+    def handle(self, *args, **options):
+        sinks = load_sinks()
+        if not sinks:
+            raise CommandError("No outbox sinks configured (OUTBOX_SINKS)")
+        delivered, failed = run_dispatcher(
+            sinks,
+            batch_size=options["batch_size"],
+            poll_interval=options["poll_interval"],
+            once=options["once"],
+        )
+        self.stdout.write(f"Delivered {delivered} events, {failed} failed attempts")
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from orders.models import CartProduct
+
+
+class Command(BaseCommand):
+    help = "Releases expired cart stock holds in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        now = timezone.now()
+        released = 0
+
+        while True:
+            ids = list(
+                CartProduct.objects.filter(reserved_until__lte=now).values_list(
+                    "id", flat=True
+                )[:batch_size]
+            )
+            if not ids:
+                break
+            # Each batch is its own short statement; no long-running locks
+            released += CartProduct.objects.filter(id__in=ids).update(
+                reserved_until=None
+            )
+
+        self.stdout.write(f"Released {released} expired reservations")
@@ -0,0 +1,25 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from orders.export import EXPORT_FORMATS, export_lines, stream_export
+
+
+class Command(BaseCommand):
+    help = "Streams order lines placed in a date range as CSV or NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", type=date.fromisoformat)
+        parser.add_argument("--end", type=date.fromisoformat)
+        parser.add_argument("--output", choices=list(EXPORT_FORMATS), default="csv")
+        parser.add_argument("--file", help="Write to this path instead of stdout")
+
+    def handle(self, *args, **options):
+        lines = export_lines(start=options["start"], end=options["end"])
+        chunks = stream_export(lines, options["output"])
+        if not options["file"]:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+        with open(options["file"], "w", newline="", encoding="utf-8") as f:
+            f.writelines(chunks)
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.fulfilment import import_tracking_numbers
+
+
+class Command(BaseCommand):
+    help = "Imports tracking numbers from an order_id,tracking_number CSV and ships the orders."
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_path")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["csv_path"], newline="", encoding="utf-8-sig") as f:
+                result = import_tracking_numbers(f, batch_size=options["batch_size"])
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for error in result["errors"]:
+            self.stderr.write(f"Line {error['line']}: {error['error']}")
+        self.stdout.write(
+            f"Updated {result['updated']} orders, {len(result['errors'])} errors"
+        )
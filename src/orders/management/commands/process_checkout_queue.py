@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from orders.queue import requeue_stale, run_worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Processes queued checkouts first-come-first-served (CHECKOUT_QUEUE_ENABLED)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10)
+        parser.add_argument("--poll-interval", type=float, default=1.0)
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=None,
+            help="Requeue tickets claimed more than this many seconds ago "
+            "(default CHECKOUT_QUEUE_LEASE)",
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Exit when the queue is empty"
+        )
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale(options["stale_after"])
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale tickets")
+        processed = run_worker(
+            batch_size=options["batch_size"],
+            poll_interval=options["poll_interval"],
+            once=options["once"],
+        )
+        self.stdout.write(f"Processed {processed} checkout tickets")
@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from orders.models import Cart, CartProduct
+
+
+class Command(BaseCommand):
+    help = "Deletes carts with no activity in the last --days days, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=30)
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        abandoned = Cart.objects.filter(created_at__lt=cutoff).exclude(
+            items__updated_at__gte=cutoff
+        )
+        purged = last_id = 0
+
+        while True:
+            ids = list(
+                abandoned.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            last_id = ids[-1]
+            # One short transaction per batch keeps row locks brief. The carts
+            # are locked and re-checked: one that got a line since it was
+            # selected (or is in use right now) is left alone.
+            with transaction.atomic():
+                ids = list(
+                    abandoned.filter(id__in=ids)
+                    .select_for_update(skip_locked=True)
+                    .values_list("id", flat=True)
+                )
+                CartProduct.objects.filter(cart_id__in=ids).delete()
+                purged += (
+                    Cart.objects.filter(id__in=ids).delete()[1].get(Cart._meta.label, 0)
+                )
+
+        self.stdout.write(f"Purged {purged} abandoned carts")
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from orders.idempotency import purge_expired_keys
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes checkout idempotency keys older than IDEMPOTENCY_KEY_TTL, in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        purged = purge_expired_keys(options["batch_size"])
+        self.stdout.write(f"Purged {purged} expired idempotency keys")
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0001_initial"),
+        ("products", "0004_product_ordering"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cartproduct",
+            name="reserved_until",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="cartproduct",
+            index=models.Index(
+                condition=models.Q(("reserved_until__isnull", False)),
+                fields=["product_variant", "reserved_until"],
+                include=("quantity",),
+                name="cartproduct_active_hold_idx",
+            ),
+        ),
+    ]
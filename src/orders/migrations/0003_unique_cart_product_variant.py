@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:59
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def merge_duplicate_lines(apps, schema_editor):
+    """Folds duplicate (cart, variant) lines into the oldest one before the constraint."""
+    CartProduct = apps.get_model("orders", "CartProduct")
+    duplicates = (
+        CartProduct.objects.values("cart_id", "product_variant_id")
+        .annotate(lines=Count("id"), total=Sum("quantity"))
+        .filter(lines__gt=1)
+    )
+    for duplicate in duplicates:
+        lines = CartProduct.objects.filter(
+            cart_id=duplicate["cart_id"],
+            product_variant_id=duplicate["product_variant_id"],
+        ).order_by("id")
+        keep = lines.first()
+        lines.exclude(pk=keep.pk).delete()
+        CartProduct.objects.filter(pk=keep.pk).update(quantity=duplicate["total"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0002_cart_reservations"),
+        ("products", "0004_product_ordering"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_lines, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="cartproduct",
+            constraint=models.UniqueConstraint(
+                fields=("cart", "product_variant"), name="unique_cart_product_variant"
+            ),
+        ),
+    ]
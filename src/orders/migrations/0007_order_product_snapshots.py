@@ -0,0 +1,70 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:12
+
+from django.db import migrations, models
+from django.db.models import Prefetch
+
+
+def backfill_snapshots(apps, schema_editor):
+    """Copies the current catalog data onto existing order lines, in batches."""
+    OrderProduct = apps.get_model("orders", "OrderProduct")
+    AttributeValue = apps.get_model("products", "AttributeValue")
+    lines = (
+        OrderProduct.objects.filter(product_name="")
+        .select_related("product_variant__product")
+        .prefetch_related(
+            Prefetch(
+                "product_variant__attribute_values",
+                queryset=AttributeValue.objects.select_related("attribute"),
+            )
+        )
+        .order_by("id")
+    )
+    batch = []
+    for line in lines.iterator(chunk_size=1000):
+        variant = line.product_variant
+        line.product_name = variant.product.name
+        line.variant_name = variant.name
+        line.sku = variant.sku
+        line.attributes = {
+            av.attribute.name: av.value for av in variant.attribute_values.all()
+        }
+        batch.append(line)
+        if len(batch) == 1000:
+            OrderProduct.objects.bulk_update(
+                batch, ["product_name", "variant_name", "sku", "attributes"]
+            )
+            batch = []
+    OrderProduct.objects.bulk_update(
+        batch, ["product_name", "variant_name", "sku", "attributes"]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0006_order_history_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="orderproduct",
+            name="attributes",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name="orderproduct",
+            name="product_name",
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name="orderproduct",
+            name="sku",
+            field=models.CharField(blank=True, max_length=50),
+        ),
+        migrations.AddField(
+            model_name="orderproduct",
+            name="variant_name",
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.RunPython(backfill_snapshots, migrations.RunPython.noop),
+    ]
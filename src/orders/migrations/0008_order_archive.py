@@ -0,0 +1,98 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0007_order_product_snapshots"),
+        ("products", "0004_product_ordering"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedOrder",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "Pendiente"),
+                            ("PAID", "Pagado"),
+                            ("SHIPPED", "Enviado"),
+                            ("DELIVERED", "Entregado"),
+                            ("CANCELLED", "Cancelado"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("total_price", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("shipping_address", models.TextField()),
+                ("billing_address", models.TextField()),
+                (
+                    "tracking_number",
+                    models.CharField(blank=True, max_length=100, null=True),
+                ),
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="archived_orders",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ArchivedOrderProduct",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("quantity", models.PositiveIntegerField()),
+                (
+                    "price_at_purchase",
+                    models.DecimalField(decimal_places=2, max_digits=10),
+                ),
+                ("product_name", models.CharField(blank=True, max_length=255)),
+                ("variant_name", models.CharField(blank=True, max_length=100)),
+                ("sku", models.CharField(blank=True, max_length=50)),
+                ("attributes", models.JSONField(blank=True, default=dict)),
+                (
+                    "order",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="products",
+                        to="orders.archivedorder",
+                    ),
+                ),
+                (
+                    "product_variant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="archived_order_items",
+                        to="products.productvariant",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="archivedorder",
+            index=models.Index(
+                fields=["user", "created_at"], name="archivedorder_user_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="archivedorder",
+            index=models.Index(
+                fields=["user", "status", "created_at"],
+                name="archivedorder_user_status_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0010_order_outbox"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cart",
+            name="merged_guest_cart",
+            field=models.CharField(blank=True, max_length=32),
+        ),
+    ]
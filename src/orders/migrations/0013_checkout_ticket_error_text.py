@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0012_idempotency_key_created_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="checkoutticket",
+            name="error",
+            field=models.TextField(blank=True),
+        ),
+    ]
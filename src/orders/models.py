@@ -1,6 +1,39 @@
+from collections import Counter
+from decimal import Decimal
+
 from django.conf import settings
-from django.db import models
-from products.models import ProductVariant
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from products.models import AttributeValue, ProductVariant
+from .signals import order_status_changed, orders_cancelled
+
+
+class OrderQuerySet(models.QuerySet):
+    def transition_to(self, status):
+        """
+        Moves every order in the queryset whose current status allows it to
+        `status` with one set-based UPDATE; the others are left untouched.
+        Returns the ids that were transitioned.
+        """
+        if status not in dict(Order.STATUS_CHOICES):
+            raise ValueError(f"Unknown order status: {status}")
+        sources = [s for s, targets in Order.TRANSITIONS.items() if status in targets]
+
+        with transaction.atomic():
+            ids = list(
+                self.filter(status__in=sources)
+                .select_for_update()
+                .values_list("id", flat=True)
+            )
+            Order.objects.filter(id__in=ids).update(
+                status=status, updated_at=timezone.now()
+            )
+            if ids:
+                order_status_changed.send(sender=Order, order_ids=ids, status=status)
+            if status == "CANCELLED" and ids:
+                orders_cancelled.send(sender=Order, order_ids=ids)
+        return ids
 
 
 class Order(models.Model):
@@ -11,6 +44,15 @@ class Order(models.Model):
         ("DELIVERED", "Entregado"),
         ("CANCELLED", "Cancelado"),
     )
+    # Allowed status changes: PENDING -> PAID -> SHIPPED -> DELIVERED, and
+    # cancellation until the order ships
+    TRANSITIONS = {
+        "PENDING": {"PAID", "CANCELLED"},
+        "PAID": {"SHIPPED", "CANCELLED"},
+        "SHIPPED": {"DELIVERED"},
+        "DELIVERED": set(),
+        "CANCELLED": set(),
+    }
 
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, related_name="orders", on_delete=models.PROTECT
@@ -23,9 +65,63 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = OrderQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Order history: per-user keyset pages and status filters
+            models.Index(fields=["user", "created_at"], name="order_user_created_idx"),
+            models.Index(
+                fields=["user", "status", "created_at"],
+                name="order_user_status_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"Pedido {self.id} - {self.user.email}"
 
+    def can_transition_to(self, status):
+        return status in self.TRANSITIONS[self.status]
+
+
+class IdempotencyKey(models.Model):
+    """Checkout response recorded under a client-supplied Idempotency-Key."""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="idempotency_keys",
+        on_delete=models.CASCADE,
+    )
+    key = models.CharField(max_length=255)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "key"], name="unique_user_idempotency_key"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.key} ({self.user.email})"
+
+
+def variant_snapshot(variant):
+    """
+    Catalog data copied onto an order line when it is placed. Expects the
+    variant's product and attribute_values__attribute to be loaded.
+    """
+    return {
+        "product_name": variant.product.name,
+        "variant_name": variant.name,
+        "sku": variant.sku,
+        "attributes": {
+            av.attribute.name: av.value for av in variant.attribute_values.all()
+        },
+    }
+
 
 class OrderProduct(models.Model):
     order = models.ForeignKey(Order, related_name="products", on_delete=models.CASCADE)
@@ -34,25 +130,217 @@ class OrderProduct(models.Model):
     )
     quantity = models.PositiveIntegerField()
     price_at_purchase = models.DecimalField(max_digits=10, decimal_places=2)
+    # Snapshot of the catalog at purchase time; later catalog edits don't change it
+    product_name = models.CharField(max_length=255, blank=True)
+    variant_name = models.CharField(max_length=100, blank=True)
+    sku = models.CharField(max_length=50, blank=True)
+    attributes = models.JSONField(default=dict, blank=True)
+
+    def save(self, *args, **kwargs):
+        if not self.product_name:
+            for field, value in variant_snapshot(self.product_variant).items():
+                setattr(self, field, value)
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product_name} ({self.variant_name})"
+
+
+class CheckoutTicket(models.Model):
+    """Queued checkout request, processed first-come-first-served by a worker."""
+
+    QUEUED = "QUEUED"
+    PROCESSING = "PROCESSING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+    STATUS_CHOICES = (
+        (QUEUED, "En cola"),
+        (PROCESSING, "Procesando"),
+        (DONE, "Completado"),
+        (FAILED, "Fallido"),
+    )
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="checkout_tickets",
+        on_delete=models.CASCADE,
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    shipping_address = models.TextField()
+    billing_address = models.TextField()
+    order = models.ForeignKey(
+        Order, related_name="+", null=True, blank=True, on_delete=models.SET_NULL
+    )
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # FIFO claims and queue positions
+            models.Index(fields=["status", "id"], name="checkoutticket_queue_idx")
+        ]
 
     def __str__(self):
-        return f"{self.quantity} x {self.product_variant.product.name} ({self.product_variant.name})"
+        return f"Ticket {self.id} ({self.status}) - {self.user.email}"
+
+
+class OutboxEvent(models.Model):
+    """
+    Order event written in the same transaction as the change it describes and
+    delivered later by dispatch_outbox (at least once: sinks must dedupe on id).
+    """
+
+    PENDING = "PENDING"
+    DELIVERED = "DELIVERED"
+    FAILED = "FAILED"
+    STATUS_CHOICES = (
+        (PENDING, "Pendiente"),
+        (DELIVERED, "Entregado"),
+        (FAILED, "Fallido"),
+    )
+
+    event_type = models.CharField(max_length=50)
+    order_id = models.BigIntegerField()
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Dispatcher claims: pending events due now, oldest first
+            models.Index(
+                fields=["next_attempt_at", "id"],
+                condition=models.Q(status="PENDING"),
+                name="outboxevent_pending_idx",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} #{self.order_id} ({self.status})"
+
+
+class ArchivedOrder(models.Model):
+    """
+    Closed (DELIVERED/CANCELLED) order moved out of the hot Order table by
+    archive_orders. Keeps the original id, so ids stay unique across both.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="archived_orders",
+        on_delete=models.PROTECT,
+    )
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    total_price = models.DecimalField(max_digits=10, decimal_places=2)
+    shipping_address = models.TextField()
+    billing_address = models.TextField()
+    tracking_number = models.CharField(max_length=100, blank=True, null=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "created_at"], name="archivedorder_user_created_idx"
+            ),
+            models.Index(
+                fields=["user", "status", "created_at"],
+                name="archivedorder_user_status_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Pedido archivado {self.id} - {self.user.email}"
+
+
+class ArchivedOrderProduct(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    order = models.ForeignKey(
+        ArchivedOrder, related_name="products", on_delete=models.CASCADE
+    )
+    product_variant = models.ForeignKey(
+        ProductVariant, related_name="archived_order_items", on_delete=models.PROTECT
+    )
+    quantity = models.PositiveIntegerField()
+    price_at_purchase = models.DecimalField(max_digits=10, decimal_places=2)
+    product_name = models.CharField(max_length=255, blank=True)
+    variant_name = models.CharField(max_length=100, blank=True)
+    sku = models.CharField(max_length=50, blank=True)
+    attributes = models.JSONField(default=dict, blank=True)
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product_name} ({self.variant_name})"
 
 
 class CartManager(models.Manager):
-    def create_from_products(self, user, products):
-        cart = Cart.objects.create(user=user)
-        for product_data in products:
-            CartProduct.objects.create(
-                cart=cart,
-                product_variant=product_data.get("product_variant_id"),
-                quantity=product_data.get("quantity"),
+    def with_details(self):
+        """
+        Cart read model: one prefetch plan for the lines (variant, product and
+        attribute values) and totals computed by the database.
+        """
+        price = models.F("items__product_variant__price")
+        items = (
+            CartProduct.objects.select_related("product_variant__product")
+            .prefetch_related(
+                models.Prefetch(
+                    "product_variant__attribute_values",
+                    queryset=AttributeValue.objects.select_related("attribute"),
+                )
+            )
+            .annotate(
+                subtotal=models.ExpressionWrapper(
+                    models.F("quantity") * models.F("product_variant__price"),
+                    output_field=models.DecimalField(max_digits=12, decimal_places=2),
+                )
             )
+            .order_by("id")
+        )
+        return (
+            self.get_queryset()
+            .prefetch_related(models.Prefetch("items", queryset=items))
+            .annotate(
+                total_price=Coalesce(
+                    models.Sum(models.F("items__quantity") * price),
+                    Decimal("0.00"),
+                    output_field=models.DecimalField(max_digits=12, decimal_places=2),
+                ),
+                total_items=Coalesce(models.Sum("items__quantity"), 0),
+            )
+        )
+
+    def create_from_products(self, user, products):
+        """
+        Adds lines ({"product_variant_id": variant or id, "quantity": n}) to the
+        user's cart, creating it if needed, with one availability query and one
+        bulk upsert (see reservations.fill_cart). Lines are capped at available
+        stock; the units left out are in `cart.unavailable` ({variant_id: n}).
+        """
+        from .reservations import fill_cart
+
+        quantities = Counter()
+        for line in products:
+            variant = line.get("product_variant_id")
+            quantities[getattr(variant, "pk", variant)] += line.get("quantity")
+
+        with transaction.atomic():
+            cart, _ = self.get_or_create(user=user)
+            cart.unavailable = fill_cart(cart, quantities)
         return cart
 
 
 class Cart(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.PROTECT)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Id of the last guest cart token merged into this cart (see guest_cart)
+    merged_guest_cart = models.CharField(max_length=32, blank=True)
 
     objects = CartManager()
 
@@ -64,3 +352,21 @@ class CartProduct(models.Model):
     cart = models.ForeignKey(Cart, related_name="items", on_delete=models.CASCADE)
     product_variant = models.ForeignKey(ProductVariant, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField()
+    # Stock hold: while in the future, `quantity` units are reserved for this cart
+    reserved_until = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["cart", "product_variant"], name="unique_cart_product_variant"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["product_variant", "reserved_until"],
+                include=["quantity"],
+                condition=models.Q(reserved_until__isnull=False),
+                name="cartproduct_active_hold_idx",
+            )
+        ]
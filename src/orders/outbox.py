@@ -0,0 +1,189 @@
+import hashlib
+import hmac
+import json
+import time
+import urllib.request
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Order, OrderProduct, OutboxEvent
+
+ORDER_PLACED = "order.placed"
+
+
+def status_event_type(status):
+    return f"order.{status.lower()}"
+
+
+def record_order_placed(order):
+    """Writes the order.placed event; call inside the checkout transaction."""
+    lines = OrderProduct.objects.filter(order=order).values_list(
+        "sku", "quantity", "price_at_purchase"
+    )
+    OutboxEvent.objects.create(
+        event_type=ORDER_PLACED,
+        order_id=order.id,
+        payload={
+            "order_id": order.id,
+            "customer_email": order.user.email,
+            "status": order.status,
+            "total_price": str(order.total_price),
+            "lines": [
+                {"sku": sku, "quantity": quantity, "price": str(price)}
+                for sku, quantity, price in lines
+            ],
+        },
+    )
+
+
+def record_status_change(order_ids, status):
+    """Writes one order.<status> event per order; call inside the transition."""
+    orders = Order.objects.filter(id__in=order_ids).values_list(
+        "id", "user__email", "total_price", "tracking_number"
+    )
+    OutboxEvent.objects.bulk_create(
+        [
+            OutboxEvent(
+                event_type=status_event_type(status),
+                order_id=order_id,
+                payload={
+                    "order_id": order_id,
+                    "customer_email": email,
+                    "status": status,
+                    "total_price": str(total_price),
+                    "tracking_number": tracking_number,
+                },
+            )
+            for order_id, email, total_price, tracking_number in orders.order_by("id")
+        ]
+    )
+
+
+def event_message(event):
+    """What a sink receives for an event; `id` is the deduplication key."""
+    return {
+        "id": event.id,
+        "type": event.event_type,
+        "order_id": event.order_id,
+        "created_at": event.created_at.isoformat(),
+        "payload": event.payload,
+    }
+
+
+class FileSink:
+    """Appends events as NDJSON lines to a local file (development/testing)."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, events):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event_message(event)) + "\n")
+
+
+class WebhookSink:
+    """
+    POSTs the whole batch as {"events": [...]} in one request. With a secret
+    the body is signed (HMAC-SHA256) in the X-Outbox-Signature header.
+    Any non-2xx answer or network error fails the batch.
+    """
+
+    def __init__(self, url, secret="", timeout=10):
+        self.url = url
+        self.secret = secret
+        self.timeout = timeout
+
+    def send(self, events):
+        body = json.dumps({"events": [event_message(e) for e in events]}).encode()
+        headers = {"Content-Type": "application/json"}
+        if self.secret:
+            headers["X-Outbox-Signature"] = hmac.new(
+                self.secret.encode(), body, hashlib.sha256
+            ).hexdigest()
+        request = urllib.request.Request(
+            self.url, data=body, headers=headers, method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            if not 200 <= response.status < 300:
+                raise OSError(f"Webhook answered {response.status}")
+
+
+def load_sinks(config=None):
+    """Instantiates the sinks configured in OUTBOX_SINKS (BACKEND + OPTIONS)."""
+    config = settings.OUTBOX_SINKS if config is None else config
+    return [
+        import_string(sink["BACKEND"])(**sink.get("OPTIONS", {})) for sink in config
+    ]
+
+
+def retry_delay(attempts):
+    """Exponential backoff: OUTBOX_RETRY_BACKOFF * 2^(attempts-1), capped at 1h."""
+    return timedelta(
+        seconds=min(settings.OUTBOX_RETRY_BACKOFF * 2 ** (attempts - 1), 3600)
+    )
+
+
+def mark_failed(events, error):
+    now = timezone.now()
+    for event in events:
+        event.attempts += 1
+        event.last_error = error
+        event.next_attempt_at = now + retry_delay(event.attempts)
+        if event.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            event.status = OutboxEvent.FAILED
+    OutboxEvent.objects.bulk_update(
+        events, ["attempts", "last_error", "next_attempt_at", "status"]
+    )
+
+
+def dispatch_batch(sinks, batch_size=100):
+    """
+    Claims the oldest due events with SELECT ... FOR UPDATE SKIP LOCKED and
+    delivers them to every sink. The locks are held until delivery is recorded,
+    so concurrent dispatchers work on disjoint batches. A failing sink fails the
+    whole batch, which is retried later with backoff. Returns (claimed, error).
+    """
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.filter(
+                status=OutboxEvent.PENDING, next_attempt_at__lte=timezone.now()
+            )
+            .order_by("id")
+            .select_for_update(skip_locked=True)[:batch_size]
+        )
+        if not events:
+            return 0, None
+        try:
+            for sink in sinks:
+                sink.send(events)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            mark_failed(events, error)
+            return len(events), error
+        OutboxEvent.objects.filter(id__in=[e.id for e in events]).update(
+            status=OutboxEvent.DELIVERED, delivered_at=timezone.now()
+        )
+    return len(events), None
+
+
+def run_dispatcher(sinks, batch_size=100, poll_interval=1.0, once=False):
+    """
+    Dispatcher loop; sleeps when nothing is due or a batch failed. Returns
+    (delivered, failed_attempts) once the outbox has nothing due and `once`.
+    """
+    delivered = failed = 0
+    while True:
+        claimed, error = dispatch_batch(sinks, batch_size)
+        if error:
+            failed += claimed
+        else:
+            delivered += claimed
+        if once and (not claimed or error):
+            return delivered, failed
+        if not claimed or error:
+            time.sleep(poll_interval)
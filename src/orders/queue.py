@@ -0,0 +1,182 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from products.models import ProductVariant
+from .checkout import CheckoutError, place_order
+from .models import CartProduct, CheckoutTicket
+
+ACTIVE_STATUSES = (CheckoutTicket.QUEUED, CheckoutTicket.PROCESSING)
+PROCESSING_ERROR = "Error al procesar el pedido"
+
+
+def enqueue_checkout(user, shipping_address, billing_address):
+    """
+    Queues the user's checkout and returns its ticket. No stock rows are
+    touched here; a user with a ticket still in the queue gets that one back.
+    """
+    if not CartProduct.objects.filter(cart__user=user).exists():
+        raise CheckoutError("El carrito está vacío")
+    active = CheckoutTicket.objects.filter(user=user, status__in=ACTIVE_STATUSES)
+    return active.order_by("id").first() or CheckoutTicket.objects.create(
+        user=user,
+        shipping_address=shipping_address,
+        billing_address=billing_address,
+    )
+
+
+def queue_position(ticket):
+    """Tickets ahead of this one in the queue (0 = next); None once claimed."""
+    if ticket.status != CheckoutTicket.QUEUED:
+        return None
+    return CheckoutTicket.objects.filter(
+        status=CheckoutTicket.QUEUED, id__lt=ticket.id
+    ).count()
+
+
+def claim_tickets(batch_size):
+    """
+    Claims the oldest queued tickets. SKIP LOCKED lets several workers claim
+    disjoint batches without waiting on each other. Returns (ids, claimed_at);
+    claimed_at identifies this claim, see process_ticket.
+    """
+    claimed_at = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            CheckoutTicket.objects.filter(status=CheckoutTicket.QUEUED)
+            .order_by("id")
+            .select_for_update(skip_locked=True)
+            .values_list("id", flat=True)[:batch_size]
+        )
+        CheckoutTicket.objects.filter(id__in=ids).update(
+            status=CheckoutTicket.PROCESSING, claimed_at=claimed_at
+        )
+    return ids, claimed_at
+
+
+def lock_skus(user):
+    """
+    Locks the variant rows in the user's cart, skipping rows another worker
+    holds. Each SKU is thus checked out by at most one worker at a time:
+    instead of waiting on a busy SKU a worker moves on to other tickets.
+    Returns False when some SKU is busy.
+    """
+    variant_ids = set(
+        CartProduct.objects.filter(cart__user=user).values_list(
+            "product_variant_id", flat=True
+        )
+    )
+    locked = (
+        ProductVariant.objects.filter(id__in=variant_ids)
+        .order_by("id")
+        .select_for_update(skip_locked=True)
+        .values_list("id", flat=True)
+    )
+    return len(locked) == len(variant_ids)
+
+
+def process_ticket(ticket_id, claimed_at):
+    """
+    Places the ticket's order; the ticket outcome commits together with the
+    order, so a crash mid-way leaves it PROCESSING and safe to requeue.
+
+    The ticket row stays locked throughout and is only processed while it is
+    still PROCESSING under this claim: a ticket requeued (and possibly taken
+    by another worker) after its lease expired is skipped, so it can never be
+    processed twice. A ticket whose SKUs are busy goes back to the queue,
+    keeping its place. Returns the ticket, or None when it was skipped.
+    """
+    with transaction.atomic():
+        ticket = (
+            CheckoutTicket.objects.select_for_update()
+            .select_related("user")
+            .filter(
+                id=ticket_id, status=CheckoutTicket.PROCESSING, claimed_at=claimed_at
+            )
+            .first()
+        )
+        if ticket is None:
+            return None
+        if not lock_skus(ticket.user):
+            ticket.status, ticket.claimed_at = CheckoutTicket.QUEUED, None
+            ticket.save(update_fields=["status", "claimed_at"])
+            return None
+        try:
+            ticket.order = place_order(
+                ticket.user, ticket.shipping_address, ticket.billing_address
+            )
+            ticket.status = CheckoutTicket.DONE
+        except CheckoutError as e:
+            ticket.status, ticket.error = CheckoutTicket.FAILED, str(e)
+        except Exception:
+            ticket.status, ticket.error = CheckoutTicket.FAILED, PROCESSING_ERROR
+        ticket.processed_at = timezone.now()
+        ticket.save(update_fields=["order", "status", "error", "processed_at"])
+    return ticket
+
+
+def requeue_stale(lease_seconds=None):
+    """
+    Puts tickets whose claim is older than the lease (worker died) back in
+    the queue. A ticket a live worker is processing is row-locked, so this
+    waits for it and then leaves it alone as it is no longer PROCESSING.
+    """
+    if lease_seconds is None:
+        lease_seconds = settings.CHECKOUT_QUEUE_LEASE
+    cutoff = timezone.now() - timedelta(seconds=lease_seconds)
+    return CheckoutTicket.objects.filter(
+        status=CheckoutTicket.PROCESSING, claimed_at__lt=cutoff
+    ).update(status=CheckoutTicket.QUEUED, claimed_at=None)
+
+
+def fail_ticket(ticket_id, claimed_at):
+    """
+    Marks a ticket FAILED after process_ticket itself raised (its transaction
+    was rolled back), so it is not requeued to fail the next worker too.
+    Returns True when the ticket was still under this claim.
+    """
+    return CheckoutTicket.objects.filter(
+        id=ticket_id, status=CheckoutTicket.PROCESSING, claimed_at=claimed_at
+    ).update(
+        status=CheckoutTicket.FAILED,
+        error=PROCESSING_ERROR,
+        processed_at=timezone.now(),
+    )
+
+
+def process_queue(batch_size=10):
+    """
+    Processes one claimed batch, in ticket order. Returns the ids of the
+    tickets handled (tickets skipped or sent back because their SKUs were busy
+    excluded). A ticket that can't even be processed is failed on its own and
+    does not stop the rest of the batch.
+    """
+    ids, claimed_at = claim_tickets(batch_size)
+    handled = []
+    for ticket_id in sorted(ids):
+        try:
+            if process_ticket(ticket_id, claimed_at) is not None:
+                handled.append(ticket_id)
+        except Exception:
+            if fail_ticket(ticket_id, claimed_at):
+                handled.append(ticket_id)
+    return handled
+
+
+def run_worker(batch_size=10, poll_interval=1.0, once=False):
+    """
+    Worker loop. Each worker runs one checkout at a time and a SKU is only
+    checked out by one worker at a time, so no worker sits waiting on
+    another's stock row lock.
+    """
+    processed = 0
+    while True:
+        handled = process_queue(batch_size)
+        processed += len(handled)
+        if once and not handled:
+            return processed
+        if not handled:
+            time.sleep(poll_interval)
@@ -0,0 +1,25 @@
+from django.dispatch import receiver
+from .checkout import restock_orders
+from .outbox import record_order_placed, record_status_change
+from .signals import order_placed, order_status_changed, orders_cancelled
+
+
+@receiver(orders_cancelled)
+def restock_cancelled_orders(sender, order_ids, **kwargs):
+    # Runs inside the transition's transaction: stock comes back atomically
+    # with the status change
+    restock_orders(order_ids)
+
+
+# Outbox writes share the transaction of the change: an event exists if and
+# only if the order (or status change) was committed
+
+
+@receiver(order_placed)
+def outbox_order_placed(sender, order, **kwargs):
+    record_order_placed(order)
+
+
+@receiver(order_status_changed)
+def outbox_status_changed(sender, order_ids, status, **kwargs):
+    record_status_change(order_ids, status)
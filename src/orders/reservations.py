@@ -0,0 +1,220 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from products.models import ProductVariant
+from .models import Cart, CartProduct
+
+
+def reservation_expiry():
+    """Expiry for a hold placed now."""
+    return timezone.now() + timedelta(seconds=settings.CART_RESERVATION_TTL)
+
+
+def held_quantity(exclude_cart=None):
+    """
+    Subquery expression: units of OuterRef("pk") variant held by active cart
+    reservations (optionally ignoring one cart's own holds). Served by the
+    partial (product_variant, reserved_until) index.
+    """
+    holds = CartProduct.objects.filter(
+        product_variant=OuterRef("pk"), reserved_until__gt=timezone.now()
+    )
+    if exclude_cart is not None:
+        holds = holds.exclude(cart=exclude_cart)
+    total = (
+        holds.order_by()
+        .values("product_variant")
+        .annotate(total=Sum("quantity"))
+        .values("total")
+    )
+    return Coalesce(Subquery(total), 0)
+
+
+def with_available_stock(queryset, exclude_cart=None):
+    """Annotates variants with available_stock = stock - active holds."""
+    return queryset.annotate(
+        available_stock=F("stock") - held_quantity(exclude_cart=exclude_cart)
+    )
+
+
+ADD_TO_CART_SQL = """
+INSERT INTO {line} (cart_id, product_variant_id, quantity, reserved_until, updated_at)
+SELECT %(cart)s, v.id, %(quantity)s, %(until)s, %(now)s
+FROM {variant} v
+WHERE v.id = %(variant)s
+  AND v.stock - {held} >= %(quantity)s
+ON CONFLICT (cart_id, product_variant_id) DO UPDATE
+SET quantity = {line}.quantity + EXCLUDED.quantity,
+    reserved_until = EXCLUDED.reserved_until,
+    updated_at = EXCLUDED.updated_at
+WHERE {line}.quantity + EXCLUDED.quantity <= (
+    SELECT v.stock - {held} FROM {variant} v WHERE v.id = EXCLUDED.product_variant_id
+)
+RETURNING id
+"""
+
+HELD_BY_OTHER_CARTS_SQL = """COALESCE((
+    SELECT SUM(h.quantity) FROM {line} h
+    WHERE h.product_variant_id = v.id
+      AND h.reserved_until > %(now)s
+      AND h.cart_id <> %(cart)s
+), 0)"""
+
+
+def add_to_cart(user, variant_id, quantity):
+    """
+    Adds `quantity` units to the user's cart line and renews its hold in one
+    statement (INSERT ... ON CONFLICT DO UPDATE SET quantity = quantity +
+    excluded.quantity).
+    The stock check (stock minus other carts' holds) is part of the statement:
+    returns False when the variant does not exist or lacks stock.
+
+    The variant row is locked first: under READ COMMITTED two carts adding the
+    same variant would not see each other's new holds and could both pass the
+    check, so concurrent adds (and checkouts) of a variant take turns. The
+    cart row is only created once the variant is known to exist, and is rolled
+    back with the line when the stock check fails.
+    """
+    tables = {
+        "line": CartProduct._meta.db_table,
+        "variant": ProductVariant._meta.db_table,
+    }
+    sql = ADD_TO_CART_SQL.format(
+        held=HELD_BY_OTHER_CARTS_SQL.format(**tables), **tables
+    )
+    params = {
+        "variant": variant_id,
+        "quantity": quantity,
+        "until": connection.ops.adapt_datetimefield_value(reservation_expiry()),
+        "now": connection.ops.adapt_datetimefield_value(timezone.now()),
+    }
+    with transaction.atomic():
+        locked = ProductVariant.objects.select_for_update().filter(id=variant_id)
+        if not locked.values_list("id", flat=True):
+            return False
+        cart, _ = Cart.objects.get_or_create(user=user)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, {**params, "cart": cart.pk})
+            added = cursor.fetchone() is not None
+        if not added:
+            transaction.set_rollback(True)
+        return added
+
+
+def lock_variants(variant_ids):
+    """
+    Locks the variant rows (in id order, so concurrent callers can't deadlock)
+    before availability is read; see add_to_cart. Call inside atomic().
+    """
+    list(
+        ProductVariant.objects.select_for_update()
+        .filter(id__in=variant_ids)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+
+
+def sync_cart(user, desired):
+    """
+    Makes the user's cart contain exactly {variant_id: quantity}. The variants
+    are locked, stock for all of them is validated with one query and the diff
+    is applied in the same transaction (one DELETE for dropped lines, one bulk
+    upsert for the rest). Returns a list of {product_variant_id, error}
+    problems; nothing is written (not even the cart) when it is not empty.
+    """
+    with transaction.atomic():
+        lock_variants(desired)
+        cart, _ = Cart.objects.get_or_create(user=user)
+        available = dict(
+            with_available_stock(
+                ProductVariant.objects.filter(id__in=desired), exclude_cart=cart
+            ).values_list("id", "available_stock")
+        )
+        problems = [
+            {
+                "product_variant_id": variant_id,
+                "error": (
+                    "Product variant not found"
+                    if variant_id not in available
+                    else "Not enough stock"
+                ),
+            }
+            for variant_id, quantity in desired.items()
+            if available.get(variant_id, -1) < quantity
+        ]
+        if problems:
+            transaction.set_rollback(True)
+            return problems
+
+        until = reservation_expiry()
+        CartProduct.objects.filter(cart=cart).exclude(
+            product_variant_id__in=desired
+        ).delete()
+        CartProduct.objects.bulk_create(
+            [
+                CartProduct(
+                    cart=cart,
+                    product_variant_id=variant_id,
+                    quantity=quantity,
+                    reserved_until=until,
+                )
+                for variant_id, quantity in desired.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["cart", "product_variant"],
+            update_fields=["quantity", "reserved_until", "updated_at"],
+        )
+    return []
+
+
+def fill_cart(cart, quantities):
+    """
+    Adds {variant_id: quantity} on top of the cart's existing lines, capped at
+    what each variant has available. Availability and current line quantities
+    come from one query, read after the variants are locked (call inside the
+    caller's atomic()); all lines are written with one bulk upsert that
+    renews their holds. Returns {variant_id: units that could not be added}.
+    """
+    lock_variants(quantities)
+    in_cart = CartProduct.objects.filter(
+        cart=cart, product_variant=OuterRef("pk")
+    ).values("quantity")[:1]
+    variants = with_available_stock(
+        ProductVariant.objects.filter(id__in=quantities), exclude_cart=cart
+    ).annotate(in_cart=Coalesce(Subquery(in_cart), 0))
+
+    until = reservation_expiry()
+    lines, shortages, found = [], {}, set()
+    for variant_id, available, current in variants.values_list(
+        "id", "available_stock", "in_cart"
+    ):
+        found.add(variant_id)
+        wanted = current + quantities[variant_id]
+        quantity = max(min(wanted, available), current)
+        if quantity < wanted:
+            shortages[variant_id] = wanted - quantity
+        if quantity > current:
+            lines.append(
+                CartProduct(
+                    cart=cart,
+                    product_variant_id=variant_id,
+                    quantity=quantity,
+                    reserved_until=until,
+                )
+            )
+    for variant_id in quantities.keys() - found:
+        shortages[variant_id] = quantities[variant_id]
+
+    CartProduct.objects.bulk_create(
+        lines,
+        update_conflicts=True,
+        unique_fields=["cart", "product_variant"],
+        update_fields=["quantity", "reserved_until", "updated_at"],
+        batch_size=500,
+    )
+    return shortages
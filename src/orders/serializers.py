@@ -1,50 +1,129 @@
 from rest_framework import serializers
 from products.models import ProductVariant
-from products.serializers import ProductVariantSerializer
-from .models import Cart, CartProduct, Order, OrderProduct
+from .models import Cart, CartProduct, CheckoutTicket, Order, OrderProduct
+from .queue import queue_position
+
+
+class CartVariantSerializer(serializers.ModelSerializer):
+    """Compact variant representation for cart lines."""
+
+    product_name = serializers.ReadOnlyField(source="product.name")
+    product_slug = serializers.ReadOnlyField(source="product.slug")
+    attribute_values_display = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ProductVariant
+        fields = [
+            "id",
+            "name",
+            "sku",
+            "price",
+            "stock",
+            "product_name",
+            "product_slug",
+            "attribute_values_display",
+        ]
+
+    def get_attribute_values_display(self, obj):
+        return {av.attribute.name: av.value for av in obj.attribute_values.all()}
 
 
 class CartItemSerializer(serializers.ModelSerializer):
-    product_variant = ProductVariantSerializer(read_only=True)
+    product_variant = CartVariantSerializer(read_only=True)
     product_variant_id = serializers.PrimaryKeyRelatedField(
         queryset=ProductVariant.objects.all(), source="product_variant", write_only=True
     )
-    subtotal = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    # Annotated by Cart.objects.with_details()
+    subtotal = serializers.DecimalField(
+        max_digits=10, decimal_places=2, read_only=True, coerce_to_string=False
+    )
 
     class Meta:
         model = CartProduct
         fields = ["id", "product_variant", "product_variant_id", "quantity", "subtotal"]
 
-    def get_subtotal(self, obj):
-        return obj.product_variant.price * obj.quantity
-
 
 class CartSerializer(serializers.ModelSerializer):
+    """
+    Reads lines and totals from Cart.objects.with_details(); a plain Cart is
+    reloaded through that read model so the totals are never dropped.
+    """
+
     items = CartItemSerializer(many=True, read_only=True)
-    total_price = serializers.SerializerMethodField()
-    total_items = serializers.SerializerMethodField()
+    total_price = serializers.DecimalField(
+        max_digits=12, decimal_places=2, read_only=True, coerce_to_string=False
+    )
+    total_items = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Cart
         fields = ["id", "user", "items", "total_price", "total_items"]
         read_only_fields = ["user"]
 
-    def get_total_price(self, obj):
-        return sum(
-            item.product_variant.price * item.quantity for item in obj.items.all()
-        )
+    def to_representation(self, instance):
+        if not hasattr(instance, "total_items"):
+            instance = Cart.objects.with_details().get(pk=instance.pk)
+        return super().to_representation(instance)
+
+
+class VariantRefSerializer(serializers.Serializer):
+    product_variant_id = serializers.IntegerField()
+
+
+class AddCartItemSerializer(VariantRefSerializer):
+    quantity = serializers.IntegerField(min_value=1, default=1)
+
+
+class CartLineSerializer(serializers.Serializer):
+    product_variant_id = serializers.IntegerField(min_value=1)
+    quantity = serializers.IntegerField(min_value=0)
+
+
+class CartSyncSerializer(serializers.Serializer):
+    """Desired final cart contents; lines with quantity 0 (or missing) are removed."""
+
+    items = CartLineSerializer(many=True, allow_empty=True)
 
-    def get_total_items(self, obj):
-        return sum(item.quantity for item in obj.items.all())
+    def validate_items(self, value):
+        ids = [line["product_variant_id"] for line in value]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("Duplicate product_variant_id.")
+        return value
+
+
+class GuestCartItemSerializer(serializers.Serializer):
+    product_variant = CartVariantSerializer(read_only=True)
+    quantity = serializers.IntegerField(read_only=True)
+    subtotal = serializers.DecimalField(
+        max_digits=10, decimal_places=2, read_only=True, coerce_to_string=False
+    )
+
+
+class GuestCartSerializer(serializers.Serializer):
+    """Read-only representation of a token-backed guest cart."""
+
+    cart_key = serializers.CharField(read_only=True, allow_null=True)
+    items = GuestCartItemSerializer(many=True, read_only=True)
+    total_price = serializers.DecimalField(
+        max_digits=12, decimal_places=2, read_only=True, coerce_to_string=False
+    )
+    total_items = serializers.IntegerField(read_only=True)
 
 
 class OrderProductSerializer(serializers.ModelSerializer):
-    product_name = serializers.ReadOnlyField(source="product_variant.product.name")
-    variant_name = serializers.ReadOnlyField(source="product_variant.name")
+    """Reads the purchase-time snapshot only; no catalog joins."""
 
     class Meta:
         model = OrderProduct
-        fields = ["id", "product_name", "variant_name", "quantity", "price_at_purchase"]
+        fields = [
+            "id",
+            "product_name",
+            "variant_name",
+            "sku",
+            "attributes",
+            "quantity",
+            "price_at_purchase",
+        ]
 
 
 class OrderSerializer(serializers.ModelSerializer):
@@ -65,6 +144,19 @@ class OrderSerializer(serializers.ModelSerializer):
         ]
 
 
+class CheckoutTicketSerializer(serializers.ModelSerializer):
+    position = serializers.SerializerMethodField()
+    order = OrderSerializer(read_only=True)
+
+    class Meta:
+        model = CheckoutTicket
+        fields = ["id", "status", "position", "order", "error", "created_at"]
+
+    def get_position(self, obj):
+        # Only a QUEUED ticket costs a COUNT; a user has at most one of those
+        return queue_position(obj)
+
+
 class CheckoutSerializer(serializers.Serializer):
     shipping_address = serializers.CharField(required=True)
     billing_address = serializers.CharField(required=False)
@@ -73,3 +165,21 @@ class CheckoutSerializer(serializers.Serializer):
         if not data.get("billing_address"):
             data["billing_address"] = data["shipping_address"]
         return data
+
+
+class BulkStatusSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=1000
+    )
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES)
+
+
+class TrackingImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+
+
+class OrderExportSerializer(serializers.Serializer):
+    # "output" rather than "format": DRF reserves ?format= for renderer selection
+    output = serializers.ChoiceField(choices=["csv", "ndjson"], default="csv")
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
@@ -0,0 +1,12 @@
+from django.dispatch import Signal
+
+# Sent inside the checkout transaction once the order and its lines exist.
+# Receivers that write elsewhere should defer with transaction.on_commit.
+order_placed = Signal()  # kwargs: order
+
+# Sent inside the transition transaction with the ids that became CANCELLED.
+orders_cancelled = Signal()  # kwargs: order_ids
+
+# Sent inside the transaction of any status change (admin, bulk API, tracking
+# import) with the ids that moved to `status`.
+order_status_changed = Signal()  # kwargs: order_ids, status
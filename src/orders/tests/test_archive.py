@@ -0,0 +1,110 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from orders.models import ArchivedOrder, ArchivedOrderProduct, Order, OrderProduct
+
+# All common fixtures (authenticated_client, user, variant)
+# are available from utils.test_helpers via conftest.py
+
+
+def make_order(user, variant, order_status, days_ago):
+    order = Order.objects.create(
+        user=user,
+        status=order_status,
+        total_price=100,
+        shipping_address="Addr",
+        billing_address="Addr",
+    )
+    OrderProduct.objects.create(
+        order=order, product_variant=variant, quantity=1, price_at_purchase=100
+    )
+    created = timezone.now() - timedelta(days=days_ago)
+    Order.objects.filter(pk=order.pk).update(created_at=created)
+    return order
+
+
+@pytest.fixture
+def history(user, variant):
+    """Newest first: hot, archivable, old but still open, archivable."""
+    return [
+        make_order(user, variant, "DELIVERED", 10),
+        make_order(user, variant, "CANCELLED", 400),
+        make_order(user, variant, "PAID", 500),
+        make_order(user, variant, "DELIVERED", 600),
+    ]
+
+
+@pytest.mark.django_db
+class TestArchiveOrders:
+    def test_moves_old_closed_orders_in_batches(self, history):
+        call_command("archive_orders", days=365, batch_size=1)
+
+        archived_ids = {history[1].id, history[3].id}
+        assert set(ArchivedOrder.objects.values_list("id", flat=True)) == archived_ids
+        assert set(Order.objects.values_list("id", flat=True)) == {
+            history[0].id,
+            history[2].id,
+        }
+        line = ArchivedOrderProduct.objects.get(order_id=history[1].id)
+        assert line.product_name and line.quantity == 1
+        assert not OrderProduct.objects.filter(order_id__in=archived_ids).exists()
+
+    def test_archived_order_keeps_its_data(self, history):
+        original = Order.objects.get(pk=history[3].pk)
+        call_command("archive_orders", days=365)
+
+        archived = ArchivedOrder.objects.get(pk=original.pk)
+        assert archived.created_at == original.created_at
+        assert archived.total_price == original.total_price
+        assert archived.user_id == original.user_id
+
+
+@pytest.mark.django_db
+class TestHistoryReadsArchive:
+    url = reverse("orders-list")
+
+    def test_list_merges_hot_and_archived_orders(self, authenticated_client, history):
+        call_command("archive_orders", days=365)
+
+        response = authenticated_client.get(self.url, {"page_size": 1})
+        seen = [o["id"] for o in response.data["results"]]
+        while response.data["next"]:
+            response = authenticated_client.get(response.data["next"])
+            seen += [o["id"] for o in response.data["results"]]
+
+        assert seen == [o.id for o in history]
+
+    def test_filters_apply_to_archived_orders(self, authenticated_client, history):
+        call_command("archive_orders", days=365)
+
+        response = authenticated_client.get(self.url, {"status": "CANCELLED"})
+        assert [o["id"] for o in response.data["results"]] == [history[1].id]
+        assert response.data["results"][0]["products"][0]["quantity"] == 1
+
+    def test_retrieve_falls_back_to_archive(self, authenticated_client, history):
+        call_command("archive_orders", days=365)
+
+        response = authenticated_client.get(
+            reverse("orders-detail", args=[history[3].id])
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["status"] == "DELIVERED"
+
+    def test_retrieve_other_users_archived_order_is_404(
+        self, authenticated_client, history, admin_user
+    ):
+        call_command("archive_orders", days=365)
+        ArchivedOrder.objects.filter(pk=history[3].pk).update(user=admin_user)
+
+        response = authenticated_client.get(
+            reverse("orders-detail", args=[history[3].id])
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_invalid_cursor_is_404(self, authenticated_client):
+        response = authenticated_client.get(self.url, {"cursor": "not-a-cursor"})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
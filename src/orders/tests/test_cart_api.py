@@ -13,14 +13,45 @@ User = get_user_model()
 
 @pytest.mark.django_db
 class TestCartAPI:
-    def test_get_cart_creates_if_not_exists(self, authenticated_client, user):
+    def test_get_cart_returns_empty_cart_without_creating_it(
+        self, authenticated_client, user
+    ):
         url = reverse("cart-list")
         response = authenticated_client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert Cart.objects.filter(user=user).exists()
+        assert not Cart.objects.filter(user=user).exists()
+        assert response.data["id"] is None
         assert response.data["user"] == user.id
+        assert response.data["items"] == []
         assert response.data["total_price"] == 0
 
+    def test_cart_is_created_on_first_write(self, authenticated_client, user, variant):
+        authenticated_client.post(reverse("cart-clear"))
+        authenticated_client.post(reverse("cart-remove-item"), {"item_id": 1})
+        assert not Cart.objects.filter(user=user).exists()
+
+        response = authenticated_client.post(
+            reverse("cart-add-item"), {"product_variant_id": variant.id}
+        )
+        assert response.data["id"] == Cart.objects.get(user=user).id
+
+    def test_cart_has_no_detail_routes(self, authenticated_client, user):
+        cart = Cart.objects.create(user=user)
+        url = reverse("cart-list") + f"{cart.id}/"
+
+        assert authenticated_client.get(url).status_code == 404
+        assert authenticated_client.delete(url).status_code == 404
+        assert authenticated_client.post(reverse("cart-list")).status_code == 405
+
+    def test_failed_add_does_not_create_cart(self, authenticated_client, user, variant):
+        url = reverse("cart-add-item")
+        authenticated_client.post(url, {"product_variant_id": 999999})
+        authenticated_client.post(
+            url, {"product_variant_id": variant.id, "quantity": 11}
+        )
+
+        assert not Cart.objects.filter(user=user).exists()
+
     def test_add_item_to_cart(self, authenticated_client, variant):
         url = reverse("cart-add-item")
         data = {"product_variant_id": variant.id, "quantity": 2}
@@ -78,3 +109,197 @@ class TestCartAPI:
         assert response.status_code == status.HTTP_200_OK
         assert response.data["total_items"] == 0
         assert cart.items.count() == 0
+
+
+@pytest.mark.django_db
+class TestCartReadModel:
+    # cart lookup + cart with totals + items (variant, product) + attribute values
+    QUERY_BUDGET = 4
+
+    def test_cart_read_query_count_is_constant(
+        self, authenticated_client, user, category, django_assert_max_num_queries
+    ):
+        from products.models import Attribute, AttributeValue, Product
+
+        cart = Cart.objects.create(user=user)
+        color = Attribute.objects.create(name="Color")
+        for i in range(10):
+            variant = Product.objects.create(
+                name=f"P{i}", base_sku=f"P{i}", category=category, default_price=3
+            ).variants.get()
+            variant.attribute_values.add(
+                AttributeValue.objects.create(attribute=color, value=f"C{i}")
+            )
+            CartProduct.objects.create(cart=cart, product_variant=variant, quantity=2)
+
+        with django_assert_max_num_queries(self.QUERY_BUDGET):
+            response = authenticated_client.get(reverse("cart-list"))
+
+        assert response.data["total_items"] == 20
+        assert response.data["total_price"] == 60
+        item = response.data["items"][0]
+        assert item["subtotal"] == 6
+        assert item["product_variant"]["product_name"] == "P0"
+        assert item["product_variant"]["attribute_values_display"] == {"Color": "C0"}
+
+    def test_plain_cart_serializes_with_totals(self, user, variant):
+        from orders.serializers import CartSerializer
+
+        cart = Cart.objects.create(user=user)
+        CartProduct.objects.create(cart=cart, product_variant=variant, quantity=2)
+
+        data = CartSerializer(cart).data
+
+        assert (data["total_items"], data["total_price"]) == (2, 200)
+        assert data["items"][0]["subtotal"] == 200
+
+
+@pytest.mark.django_db
+class TestCartUpsert:
+    def test_add_item_is_one_write_statement(self, authenticated_client, user, variant):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        Cart.objects.create(user=user)
+        url = reverse("cart-add-item")
+
+        with CaptureQueriesContext(connection) as ctx:
+            authenticated_client.post(url, {"product_variant_id": variant.id})
+
+        statements = [
+            q["sql"].lstrip().split()[0].upper() for q in ctx.captured_queries
+        ]
+        assert statements.count("INSERT") == 1
+        assert "UPDATE" not in statements
+        # cart lookup + savepoint, variant lock, upsert, release + cart read
+        # model (3 queries)
+        assert len(statements) == 8
+        assert (
+            any("FOR UPDATE" in q["sql"] for q in ctx.captured_queries)
+            or connection.vendor == "sqlite"
+        )
+
+    @pytest.mark.parametrize("quantity", [0, -1])
+    def test_add_item_rejects_non_positive_quantity(
+        self, authenticated_client, variant, quantity
+    ):
+        response = authenticated_client.post(
+            reverse("cart-add-item"),
+            {"product_variant_id": variant.id, "quantity": quantity},
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "quantity" in response.data
+        assert not CartProduct.objects.exists()
+
+    def test_repeated_adds_respect_stock(self, authenticated_client, variant):
+        url = reverse("cart-add-item")
+        data = {"product_variant_id": variant.id, "quantity": 6}
+
+        assert authenticated_client.post(url, data).status_code == 201
+        response = authenticated_client.post(url, data)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert CartProduct.objects.get(product_variant=variant).quantity == 6
+
+    def test_cart_lines_are_unique_per_variant(self, cart, variant):
+        from django.db import IntegrityError
+
+        CartProduct.objects.create(cart=cart, product_variant=variant, quantity=1)
+        with pytest.raises(IntegrityError):
+            CartProduct.objects.create(cart=cart, product_variant=variant, quantity=1)
+
+
+@pytest.mark.django_db
+class TestCartSync:
+    url = reverse("cart-sync")
+
+    def make_variants(self, category, count):
+        from products.models import Product
+
+        return [
+            Product.objects.create(
+                name=f"S{i}",
+                base_sku=f"S{i}",
+                category=category,
+                default_price=1,
+                default_stock=5,
+            ).variants.get()
+            for i in range(count)
+        ]
+
+    def test_sync_applies_final_state(self, authenticated_client, user, category):
+        keep, drop, change, new = self.make_variants(category, 4)
+        cart = Cart.objects.create(user=user)
+        for v in (keep, drop, change):
+            CartProduct.objects.create(cart=cart, product_variant=v, quantity=1)
+
+        response = authenticated_client.post(
+            self.url,
+            {
+                "items": [
+                    {"product_variant_id": keep.id, "quantity": 1},
+                    {"product_variant_id": change.id, "quantity": 4},
+                    {"product_variant_id": new.id, "quantity": 2},
+                    {"product_variant_id": drop.id, "quantity": 0},
+                ]
+            },
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["total_items"] == 7
+        assert dict(cart.items.values_list("product_variant_id", "quantity")) == {
+            keep.id: 1,
+            change.id: 4,
+            new.id: 2,
+        }
+        assert not cart.items.filter(reserved_until__isnull=True).exists()
+
+    def test_sync_is_all_or_nothing(self, authenticated_client, user, category):
+        ok, scarce = self.make_variants(category, 2)
+        cart = Cart.objects.create(user=user)
+        CartProduct.objects.create(cart=cart, product_variant=ok, quantity=1)
+
+        response = authenticated_client.post(
+            self.url,
+            {
+                "items": [
+                    {"product_variant_id": scarce.id, "quantity": 6},
+                    {"product_variant_id": 999999, "quantity": 1},
+                ]
+            },
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        errors = {p["product_variant_id"]: p["error"] for p in response.data["items"]}
+        assert errors == {
+            scarce.id: "Not enough stock",
+            999999: "Product variant not found",
+        }
+        assert list(cart.items.values_list("product_variant_id", flat=True)) == [ok.id]
+
+    def test_failed_sync_does_not_create_cart(self, authenticated_client, user):
+        response = authenticated_client.post(
+            self.url,
+            {"items": [{"product_variant_id": 999999, "quantity": 1}]},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not Cart.objects.filter(user=user).exists()
+
+    def test_sync_query_count_is_constant(
+        self, authenticated_client, category, django_assert_max_num_queries
+    ):
+        variants = self.make_variants(category, 8)
+        items = [{"product_variant_id": v.id, "quantity": 1} for v in variants]
+
+        # variant lock + cart get_or_create (4) + stock check + delete/upsert
+        # (4) + cart read model (3), independent of the number of lines
+        with django_assert_max_num_queries(13):
+            response = authenticated_client.post(
+                self.url, {"items": items}, format="json"
+            )
+        assert response.data["total_items"] == 8
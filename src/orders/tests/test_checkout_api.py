@@ -1,10 +1,15 @@
 import pytest
+from datetime import timedelta
 from decimal import Decimal
 
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
-from orders.models import Cart, CartProduct, Order, OrderProduct
+from orders.models import Cart, CartProduct, IdempotencyKey, Order, OrderProduct
+from products.models import Attribute, AttributeValue, StockMovement
+from products.stock_ledger import ledger_stock
 
 User = get_user_model()
 
@@ -92,3 +97,134 @@ class TestCheckoutFlow:
         # Verify order price is still the same (SNAPSHOT)
         order_product = OrderProduct.objects.get(product_variant=variant)
         assert order_product.price_at_purchase == Decimal("100.00")
+
+
+@pytest.mark.django_db
+class TestCheckoutStockLedger:
+    def test_checkout_records_sale_movements(self, auth_client, user, variant):
+        cart, _ = Cart.objects.get_or_create(user=user)
+        CartProduct.objects.create(cart=cart, product_variant=variant, quantity=4)
+
+        response = auth_client.post(
+            reverse("orders-checkout"), {"shipping_address": "Addr"}
+        )
+
+        sale = StockMovement.objects.get(kind=StockMovement.SALE)
+        assert (sale.quantity, sale.order_id) == (-4, response.data["id"])
+        assert ledger_stock([variant.id]) == {variant.id: 6}
+
+    def test_failed_checkout_leaves_no_movements(self, auth_client, user, variant):
+        cart, _ = Cart.objects.get_or_create(user=user)
+        CartProduct.objects.create(cart=cart, product_variant=variant, quantity=40)
+
+        response = auth_client.post(
+            reverse("orders-checkout"), {"shipping_address": "Addr"}
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not StockMovement.objects.filter(kind=StockMovement.SALE).exists()
+        assert not Order.objects.exists()
+
+
+@pytest.mark.django_db
+class TestCheckoutSnapshots:
+    def test_lines_snapshot_catalog_data(self, auth_client, user, variant):
+        size = Attribute.objects.create(name="Talla")
+        variant.attribute_values.add(
+            AttributeValue.objects.create(attribute=size, value="M")
+        )
+        cart, _ = Cart.objects.get_or_create(user=user)
+        CartProduct.objects.create(cart=cart, product_variant=variant, quantity=1)
+
+        response = auth_client.post(
+            reverse("orders-checkout"), {"shipping_address": "Addr"}
+        )
+
+        line = response.data["products"][0]
+        assert line["product_name"] == variant.product.name
+        assert line["variant_name"] == variant.name
+        assert line["sku"] == variant.sku
+        assert line["attributes"] == {"Talla": "M"}
+
+
+@pytest.mark.django_db
+class TestCheckoutIdempotency:
+    url = reverse("orders-checkout")
+    data = {"shipping_address": "Calle Falsa 123, Lima"}
+
+    def fill_cart(self, user, variant, quantity=2):
+        cart, _ = Cart.objects.get_or_create(user=user)
+        CartProduct.objects.create(
+            cart=cart, product_variant=variant, quantity=quantity
+        )
+
+    def test_retry_replays_original_order(
+        self, auth_client, user, variant, django_assert_num_queries
+    ):
+        self.fill_cart(user, variant)
+        first = auth_client.post(self.url, self.data, HTTP_IDEMPOTENCY_KEY="abc-1")
+
+        with django_assert_num_queries(1):
+            retry = auth_client.post(self.url, self.data, HTTP_IDEMPOTENCY_KEY="abc-1")
+
+        assert first.status_code == retry.status_code == status.HTTP_201_CREATED
+        assert retry.json() == first.json()
+        assert retry["Idempotent-Replayed"] == "true"
+        assert Order.objects.filter(user=user).count() == 1
+        variant.refresh_from_db()
+        assert variant.stock == 8
+
+    def test_expired_key_runs_checkout_again(self, auth_client, user, variant):
+        self.fill_cart(user, variant)
+        auth_client.post(self.url, self.data, HTTP_IDEMPOTENCY_KEY="abc-1")
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(days=2))
+        self.fill_cart(user, variant, quantity=1)
+
+        response = auth_client.post(self.url, self.data, HTTP_IDEMPOTENCY_KEY="abc-1")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert "Idempotent-Replayed" not in response
+        assert Order.objects.filter(user=user).count() == 2
+        assert IdempotencyKey.objects.get().created_at > timezone.now() - timedelta(
+            minutes=1
+        )
+
+    def test_purge_deletes_only_expired_keys(self, user):
+        IdempotencyKey.objects.create(user=user, key="old")
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(days=2))
+        IdempotencyKey.objects.create(user=user, key="fresh")
+
+        call_command("purge_idempotency_keys", "--batch-size", "1")
+
+        assert list(IdempotencyKey.objects.values_list("key", flat=True)) == ["fresh"]
+
+    def test_new_key_runs_checkout_again(self, auth_client, user, variant):
+        self.fill_cart(user, variant)
+        auth_client.post(self.url, self.data, HTTP_IDEMPOTENCY_KEY="abc-1")
+        response = auth_client.post(self.url, self.data, HTTP_IDEMPOTENCY_KEY="abc-2")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["error"] == "El carrito está vacío"
+
+    def test_failed_checkout_does_not_consume_key(self, auth_client, user, variant):
+        response = auth_client.post(self.url, self.data, HTTP_IDEMPOTENCY_KEY="abc-1")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        self.fill_cart(user, variant)
+        response = auth_client.post(self.url, self.data, HTTP_IDEMPOTENCY_KEY="abc-1")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert "Idempotent-Replayed" not in response
+
+    def test_keys_are_scoped_per_user(self, auth_client, user, variant):
+        other = User.objects.create_user(email="other@example.com", password="pw")
+        self.fill_cart(user, variant)
+        auth_client.post(self.url, self.data, HTTP_IDEMPOTENCY_KEY="abc-1")
+
+        auth_client.force_authenticate(user=other)
+        response = auth_client.post(self.url, self.data, HTTP_IDEMPOTENCY_KEY="abc-1")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_rejects_oversized_key(self, auth_client, user, variant):
+        self.fill_cart(user, variant)
+        response = auth_client.post(self.url, self.data, HTTP_IDEMPOTENCY_KEY="k" * 256)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not Order.objects.exists()
@@ -0,0 +1,152 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from orders import checkout
+from orders.models import Cart, CartProduct, Order, OrderProduct
+from products.models import ProductVariant
+
+User = get_user_model()
+
+# All common fixtures (api_client, user, variant)
+# are now available from utils.test_helpers via conftest.py
+
+
+def make_buyer(index, variant, quantity):
+    buyer = User.objects.create_user(email=f"buyer{index}@example.com", password="pw")
+    cart = Cart.objects.create(user=buyer)
+    CartProduct.objects.create(cart=cart, product_variant=variant, quantity=quantity)
+    return buyer
+
+
+def checkout_as(buyer):
+    client = APIClient()
+    client.force_authenticate(user=buyer)
+    return client.post(reverse("orders-checkout"), {"shipping_address": "Addr"})
+
+
+@pytest.mark.django_db
+class TestCheckoutStockDecrement:
+    def test_stale_read_cannot_oversell(self, variant):
+        """
+        Another checkout sells stock after our cart was read: the conditional
+        UPDATE re-checks stock in the database and refuses the sale.
+        """
+        buyer = make_buyer(1, variant, 6)
+        real_load = checkout.load_cart_items
+
+        def load_then_concurrent_sale(user):
+            items = real_load(user)
+            ProductVariant.objects.filter(pk=variant.pk).update(stock=5)
+            return items
+
+        with patch("orders.checkout.load_cart_items", load_then_concurrent_sale):
+            response = checkout_as(buyer)
+
+        # The old read-check-save flow would have stored 10 - 6 = 4 here
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "insuficiente" in response.data["error"]
+        assert not Order.objects.exists()
+
+    def test_second_buyer_rejected_when_stock_runs_out(self, variant):
+        first, second = make_buyer(1, variant, 6), make_buyer(2, variant, 6)
+
+        assert checkout_as(first).status_code == status.HTTP_201_CREATED
+        assert checkout_as(second).status_code == status.HTTP_400_BAD_REQUEST
+
+        variant.refresh_from_db()
+        assert variant.stock == 4
+
+    def test_multi_line_checkout_is_all_or_nothing(self, user, variant, category):
+        from products.models import Product
+
+        scarce = Product.objects.create(
+            name="Scarce", base_sku="SCARCE", category=category, default_price=5
+        ).variants.get()
+        cart = Cart.objects.create(user=user)
+        CartProduct.objects.create(cart=cart, product_variant=variant, quantity=2)
+        CartProduct.objects.create(cart=cart, product_variant=scarce, quantity=1)
+
+        response = checkout_as(user)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "Scarce" in response.data["error"]
+        variant.refresh_from_db()
+        assert variant.stock == 10
+
+    def test_order_lines_are_bulk_created(
+        self, user, variant, django_assert_max_num_queries
+    ):
+        from products.models import Product
+
+        cart = Cart.objects.create(user=user)
+        for i in range(5):
+            v = Product.objects.create(
+                name=f"Bulk {i}", base_sku=f"BULK{i}", default_price=1, default_stock=5
+            ).variants.get()
+            CartProduct.objects.create(cart=cart, product_variant=v, quantity=1)
+
+        # Constant in the number of lines (includes the outbox SELECT + INSERT)
+        with django_assert_max_num_queries(14):
+            assert checkout_as(user).status_code == status.HTTP_201_CREATED
+        assert OrderProduct.objects.count() == 5
+
+
+@pytest.mark.skipif(
+    connection.vendor == "sqlite", reason="needs row-level locking (PostgreSQL)"
+)
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_checkouts_do_not_oversell(variant):
+    buyers = [make_buyer(i, variant, 3) for i in range(8)]
+    results = []
+
+    def run(buyer):
+        try:
+            results.append(checkout_as(buyer).status_code)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=run, args=(buyer,)) for buyer in buyers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    variant.refresh_from_db()
+    # 10 units, 3 per order: exactly three orders fit
+    assert results.count(status.HTTP_201_CREATED) == 3
+    assert variant.stock == 1
+
+
+@pytest.mark.skipif(
+    connection.vendor == "sqlite", reason="needs row-level locking (PostgreSQL)"
+)
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_cart_fills_do_not_over_reserve(variant):
+    buyers = [
+        User.objects.create_user(email=f"filler{i}@example.com", password="pw")
+        for i in range(8)
+    ]
+
+    def run(buyer):
+        try:
+            Cart.objects.create_from_products(
+                buyer, [{"product_variant_id": variant.id, "quantity": 3}]
+            )
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=run, args=(buyer,)) for buyer in buyers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 10 units: the holds never exceed the stock
+    held = CartProduct.objects.filter(product_variant=variant)
+    assert sum(held.values_list("quantity", flat=True)) == 10
@@ -0,0 +1,194 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from orders.models import Cart, CartProduct, CheckoutTicket, Order
+from orders.queue import (
+    claim_tickets,
+    process_queue,
+    process_ticket,
+    queue_position,
+    requeue_stale,
+)
+
+User = get_user_model()
+
+# All common fixtures (authenticated_client, user, variant)
+# are available from utils.test_helpers via conftest.py
+
+checkout_url = reverse("orders-checkout")
+
+
+def client_with_cart(email, variant, quantity):
+    user = User.objects.create_user(email=email, password="pw")
+    cart = Cart.objects.create(user=user)
+    CartProduct.objects.create(cart=cart, product_variant=variant, quantity=quantity)
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def queue_enabled(settings):
+    settings.CHECKOUT_QUEUE_ENABLED = True
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("queue_enabled")
+class TestQueuedCheckout:
+    def test_checkout_is_accepted_with_a_ticket(self, variant):
+        client = client_with_cart("a@example.com", variant, 2)
+
+        response = client.post(checkout_url, {"shipping_address": "Addr"})
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.data["status"] == "QUEUED"
+        assert response.data["position"] == 0
+        assert response["Location"].endswith(
+            reverse("checkout-ticket-detail", args=[response.data["id"]])
+        )
+        assert not Order.objects.exists()
+        variant.refresh_from_db()
+        assert variant.stock == 10
+
+    def test_requeueing_returns_the_active_ticket(self, variant):
+        client = client_with_cart("a@example.com", variant, 2)
+        first = client.post(checkout_url, {"shipping_address": "Addr"})
+        second = client.post(checkout_url, {"shipping_address": "Addr"})
+        assert first.data["id"] == second.data["id"]
+        assert CheckoutTicket.objects.count() == 1
+
+    def test_empty_cart_is_rejected_without_a_ticket(self, authenticated_client):
+        response = authenticated_client.post(checkout_url, {"shipping_address": "A"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not CheckoutTicket.objects.exists()
+
+    def test_worker_serves_first_come_first_served(self, variant):
+        early = client_with_cart("early@example.com", variant, 6)
+        late = client_with_cart("late@example.com", variant, 6)
+        early_ticket = early.post(checkout_url, {"shipping_address": "A"}).data
+        late_ticket = late.post(checkout_url, {"shipping_address": "A"}).data
+        assert late_ticket["position"] == 1
+
+        call_command("process_checkout_queue", "--once")
+
+        done = early.get(reverse("checkout-ticket-detail", args=[early_ticket["id"]]))
+        assert done.data["status"] == "DONE"
+        assert done.data["order"]["products"][0]["quantity"] == 6
+
+        failed = late.get(reverse("checkout-ticket-detail", args=[late_ticket["id"]]))
+        assert failed.data["status"] == "FAILED"
+        assert failed.data["error"].startswith("Stock insuficiente")
+        variant.refresh_from_db()
+        assert variant.stock == 4
+
+    def test_tickets_are_private(self, variant, authenticated_client):
+        owner = client_with_cart("a@example.com", variant, 1)
+        ticket = owner.post(checkout_url, {"shipping_address": "A"}).data
+
+        response = authenticated_client.get(
+            reverse("checkout-ticket-detail", args=[ticket["id"]])
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_stale_claims_are_requeued(self, variant):
+        client = client_with_cart("a@example.com", variant, 1)
+        client.post(checkout_url, {"shipping_address": "A"})
+        CheckoutTicket.objects.update(
+            status=CheckoutTicket.PROCESSING,
+            claimed_at=timezone.now() - timedelta(minutes=10),
+        )
+
+        assert requeue_stale(lease_seconds=300) == 1
+        assert CheckoutTicket.objects.get().status == CheckoutTicket.QUEUED
+
+    def test_requeued_claim_is_not_processed_twice(self, variant):
+        client = client_with_cart("a@example.com", variant, 1)
+        client.post(checkout_url, {"shipping_address": "A"})
+        (ticket_id,), stale_claim = claim_tickets(10)
+
+        # The lease expires, another worker takes the ticket and finishes it
+        CheckoutTicket.objects.update(claimed_at=stale_claim - timedelta(hours=1))
+        requeue_stale(lease_seconds=300)
+        (_,), claim = claim_tickets(10)
+        assert process_ticket(ticket_id, claim).status == CheckoutTicket.DONE
+
+        # The first worker resumes: its claim is gone, the DONE ticket is kept
+        assert process_ticket(ticket_id, stale_claim) is None
+        ticket = CheckoutTicket.objects.get()
+        assert ticket.status == CheckoutTicket.DONE
+        assert ticket.order is not None
+        assert Order.objects.count() == 1
+
+    def test_ticket_with_busy_sku_keeps_its_place(self, variant):
+        client = client_with_cart("a@example.com", variant, 1)
+        client.post(checkout_url, {"shipping_address": "A"})
+        (ticket_id,), claim = claim_tickets(10)
+
+        with mock.patch("orders.queue.lock_skus", return_value=False):
+            assert process_ticket(ticket_id, claim) is None
+
+        ticket = CheckoutTicket.objects.get()
+        assert (ticket.status, ticket.claimed_at) == (CheckoutTicket.QUEUED, None)
+        assert queue_position(ticket) == 0
+        assert not Order.objects.exists()
+
+    def test_unprocessable_ticket_fails_without_stopping_the_batch(self, variant):
+        for email in ("a@example.com", "b@example.com"):
+            client_with_cart(email, variant, 1).post(
+                checkout_url, {"shipping_address": "A"}
+            )
+        first, second = CheckoutTicket.objects.order_by("id")
+        real_process = process_ticket
+
+        def crash_on_first(ticket_id, claimed_at):
+            if ticket_id == first.id:
+                raise DatabaseError("value too long")
+            return real_process(ticket_id, claimed_at)
+
+        with mock.patch("orders.queue.process_ticket", crash_on_first):
+            assert process_queue() == [first.id, second.id]
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        assert (first.status, first.error) == (
+            CheckoutTicket.FAILED,
+            "Error al procesar el pedido",
+        )
+        assert second.status == CheckoutTicket.DONE
+        assert requeue_stale(lease_seconds=0) == 0
+
+    def test_ticket_list_is_paginated(
+        self, authenticated_client, user, django_assert_max_num_queries
+    ):
+        CheckoutTicket.objects.bulk_create(
+            CheckoutTicket(
+                user=user, status=CheckoutTicket.FAILED, shipping_address="A"
+            )
+            for _ in range(30)
+        )
+        CheckoutTicket.objects.create(user=user, shipping_address="A")
+
+        # user + page + order prefetch + one position COUNT (the QUEUED ticket)
+        with django_assert_max_num_queries(4):
+            response = authenticated_client.get(reverse("checkout-ticket-list"))
+
+        assert len(response.data["results"]) == 20
+        assert response.data["results"][0]["position"] == 0
+        assert response.data["next"]
+
+
+@pytest.mark.django_db
+def test_checkout_is_synchronous_by_default(authenticated_client, user, variant):
+    cart = Cart.objects.create(user=user)
+    CartProduct.objects.create(cart=cart, product_variant=variant, quantity=1)
+    response = authenticated_client.post(checkout_url, {"shipping_address": "A"})
+    assert response.status_code == status.HTTP_201_CREATED
+    assert not CheckoutTicket.objects.exists()
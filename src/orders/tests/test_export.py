@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone as dt_timezone
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from orders.admin import export_csv
+from orders.archive import archive_orders
+from orders.models import ArchivedOrder, Order, OrderProduct
+
+# All common fixtures (admin_client, authenticated_client, user, variant)
+# are available from utils.test_helpers via conftest.py
+
+
+@pytest.fixture
+def orders(user, variant):
+    placed = []
+    for day in (1, 15, 28):
+        order = Order.objects.create(
+            user=user, total_price=200, shipping_address="A", billing_address="A"
+        )
+        OrderProduct.objects.create(
+            order=order, product_variant=variant, quantity=2, price_at_purchase=100
+        )
+        created = datetime(2026, 2, day, 23, 30, tzinfo=dt_timezone.utc)
+        Order.objects.filter(pk=order.pk).update(created_at=created)
+        placed.append(order)
+    return placed
+
+
+def read_csv(content):
+    return list(csv.DictReader(io.StringIO(content)))
+
+
+@pytest.mark.django_db
+class TestOrderExport:
+    url = reverse("orders-export")
+
+    def test_requires_staff(self, authenticated_client):
+        response = authenticated_client.get(self.url)
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_streams_csv_for_date_range(
+        self, admin_client, orders, variant, user, django_assert_num_queries
+    ):
+        response = admin_client.get(
+            self.url, {"start": "2026-02-15", "end": "2026-02-28"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response["Content-Type"] == "text/csv"
+
+        # The body is produced while streaming, from a single chunked query
+        with django_assert_num_queries(1):
+            content = b"".join(response.streaming_content).decode()
+
+        rows = read_csv(content)
+        assert [int(r["order_id"]) for r in rows] == [orders[1].id, orders[2].id]
+        assert rows[0]["sku"] == variant.sku
+        assert rows[0]["customer_email"] == user.email
+        assert rows[0]["quantity"] == "2"
+
+    def test_streams_ndjson(self, admin_client, orders):
+        response = admin_client.get(self.url, {"output": "ndjson"})
+        assert response["Content-Type"] == "application/x-ndjson"
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).decode().splitlines()
+        ]
+        assert [r["order_id"] for r in rows] == [o.id for o in orders]
+        assert rows[0]["price_at_purchase"] == "100.00"
+
+    def test_rejects_unknown_output(self, admin_client):
+        response = admin_client.get(self.url, {"output": "xlsx"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_command_writes_file(self, orders, tmp_path):
+        path = tmp_path / "orders.csv"
+        call_command("export_orders", "--start", "2026-02-01", "--file", str(path))
+        assert len(read_csv(path.read_text())) == 3
+
+    def test_admin_action_exports_selected_orders(self, orders):
+        response = export_csv(None, None, Order.objects.filter(pk=orders[0].pk))
+        rows = read_csv(b"".join(response.streaming_content).decode())
+        assert [int(r["order_id"]) for r in rows] == [orders[0].id]
+
+    def test_includes_archived_orders(self, admin_client, orders, variant):
+        Order.objects.filter(pk=orders[0].pk).update(status="DELIVERED")
+        archive_orders(datetime(2026, 2, 10, tzinfo=dt_timezone.utc), batch_size=10)
+        assert ArchivedOrder.objects.filter(pk=orders[0].pk).exists()
+
+        response = admin_client.get(
+            self.url, {"start": "2026-02-01", "end": "2026-02-28"}
+        )
+
+        rows = read_csv(b"".join(response.streaming_content).decode())
+        assert [int(r["order_id"]) for r in rows] == [o.id for o in orders]
+        assert (rows[0]["order_status"], rows[0]["sku"]) == ("DELIVERED", variant.sku)
+
+    def test_admin_action_exports_archived_orders(self, orders):
+        Order.objects.filter(pk=orders[0].pk).update(status="DELIVERED")
+        archive_orders(datetime(2026, 2, 10, tzinfo=dt_timezone.utc), batch_size=10)
+
+        response = export_csv(None, None, ArchivedOrder.objects.all())
+        rows = read_csv(b"".join(response.streaming_content).decode())
+        assert [int(r["order_id"]) for r in rows] == [orders[0].id]
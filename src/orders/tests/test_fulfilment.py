@@ -0,0 +1,139 @@
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from orders.models import Order, OrderProduct
+from products.models import StockMovement
+
+# All common fixtures (admin_client, authenticated_client, user)
+# are available from utils.test_helpers via conftest.py
+
+
+def make_orders(user, *statuses):
+    return [
+        Order.objects.create(
+            user=user,
+            status=order_status,
+            total_price=10,
+            shipping_address="Addr",
+            billing_address="Addr",
+        )
+        for order_status in statuses
+    ]
+
+
+@pytest.mark.django_db
+class TestStatusTransitions:
+    def test_transition_only_moves_allowed_orders(
+        self, user, django_assert_num_queries
+    ):
+        pending, paid, delivered = make_orders(user, "PENDING", "PAID", "DELIVERED")
+
+        # savepoint, SELECT, UPDATE, outbox SELECT + INSERT,
+        # restock lookup (no lines), release
+        with django_assert_num_queries(7):
+            ids = Order.objects.all().transition_to("CANCELLED")
+
+        assert sorted(ids) == [pending.id, paid.id]
+        assert dict(Order.objects.values_list("id", "status")) == {
+            pending.id: "CANCELLED",
+            paid.id: "CANCELLED",
+            delivered.id: "DELIVERED",
+        }
+
+    def test_cancellation_restocks_and_records_movements(self, user, variant):
+        (order,) = make_orders(user, "PAID")
+        OrderProduct.objects.create(
+            order=order, product_variant=variant, quantity=3, price_at_purchase=100
+        )
+
+        Order.objects.filter(pk=order.pk).transition_to("CANCELLED")
+
+        variant.refresh_from_db()
+        assert variant.stock == 13
+        movement = StockMovement.objects.filter(product_variant=variant).last()
+        assert (movement.kind, movement.quantity, movement.order_id) == (
+            "CANCELLATION",
+            3,
+            order.id,
+        )
+
+    def test_unknown_status_is_rejected(self, user):
+        with pytest.raises(ValueError):
+            Order.objects.all().transition_to("LOST")
+
+    def test_can_transition_to(self, user):
+        (order,) = make_orders(user, "PAID")
+        assert order.can_transition_to("SHIPPED")
+        assert not order.can_transition_to("PENDING")
+
+
+@pytest.mark.django_db
+class TestBulkStatusApi:
+    url = reverse("orders-bulk-status")
+
+    def test_requires_admin(self, authenticated_client):
+        response = authenticated_client.post(
+            self.url, {"ids": [1], "status": "PAID"}, format="json"
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_reports_updated_and_skipped(self, admin_client, user):
+        paid, shipped = make_orders(user, "PAID", "SHIPPED")
+
+        response = admin_client.post(
+            self.url,
+            {"ids": [paid.id, shipped.id, 999999], "status": "SHIPPED"},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {"updated": [paid.id], "skipped": [shipped.id, 999999]}
+
+
+@pytest.mark.django_db
+class TestTrackingImport:
+    url = reverse("orders-import-tracking")
+
+    def csv_for(self, *rows):
+        lines = ["order_id,tracking_number"] + [f"{a},{b}" for a, b in rows]
+        return "\n".join(lines) + "\n"
+
+    def test_api_import_ships_paid_orders(self, admin_client, user):
+        paid, shipped, pending = make_orders(user, "PAID", "SHIPPED", "PENDING")
+        content = self.csv_for(
+            (paid.id, "TRK-1"),
+            (shipped.id, "TRK-2"),
+            (pending.id, "TRK-3"),
+            ("abc", "TRK-4"),
+            (999999, "TRK-5"),
+        )
+        upload = SimpleUploadedFile("tracking.csv", content.encode(), "text/csv")
+
+        response = admin_client.post(self.url, {"file": upload}, format="multipart")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["updated"] == 2
+        assert [e["line"] for e in response.data["errors"]] == [4, 5, 6]
+        paid.refresh_from_db()
+        pending.refresh_from_db()
+        assert (paid.status, paid.tracking_number) == ("SHIPPED", "TRK-1")
+        assert (pending.status, pending.tracking_number) == ("PENDING", None)
+
+    def test_api_rejects_csv_without_columns(self, admin_client):
+        upload = SimpleUploadedFile("tracking.csv", b"id,code\n1,X\n", "text/csv")
+        response = admin_client.post(self.url, {"file": upload}, format="multipart")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_command_imports_in_batches(self, user, tmp_path):
+        orders = make_orders(user, "PAID", "PAID", "PAID")
+        path = tmp_path / "tracking.csv"
+        path.write_text(self.csv_for(*((o.id, f"T{o.id}") for o in orders)))
+
+        call_command("import_tracking_numbers", str(path), batch_size=2)
+
+        assert set(Order.objects.values_list("status", flat=True)) == {"SHIPPED"}
+        assert sorted(
+            Order.objects.values_list("tracking_number", flat=True)
+        ) == sorted(f"T{o.id}" for o in orders)
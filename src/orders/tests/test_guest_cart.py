@@ -0,0 +1,141 @@
+import pytest
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from orders.models import Cart, CartProduct
+from orders.reservations import reservation_expiry
+
+User = get_user_model()
+
+# All common fixtures (api_client, user, variant)
+# are now available from utils.test_helpers via conftest.py
+
+
+def add_as_guest(api_client, variant, quantity, cart_key=None):
+    headers = {"X-Cart-Key": cart_key} if cart_key else {}
+    return api_client.post(
+        reverse("guest-cart-add-item"),
+        {"product_variant_id": variant.id, "quantity": quantity},
+        headers=headers,
+    )
+
+
+@pytest.mark.django_db
+class TestGuestCart:
+    def test_guest_cart_lives_in_the_token(self, api_client, variant):
+        response = add_as_guest(api_client, variant, 2)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        cart_key = response.data["cart_key"]
+        assert response["X-Cart-Key"] == cart_key
+        assert response.data["total_items"] == 2
+        assert not Cart.objects.exists()
+
+        # Nothing server-side: another worker (empty cache) reads the same cart
+        cache.clear()
+
+        response = api_client.get(
+            reverse("guest-cart-list"), headers={"X-Cart-Key": cart_key}
+        )
+        assert response.data["items"][0]["product_variant"]["id"] == variant.id
+        assert response.data["total_price"] == 200
+
+    def test_reading_without_key_stores_nothing(self, api_client):
+        response = api_client.get(reverse("guest-cart-list"))
+        assert response.data["cart_key"] is None
+        assert response.data["items"] == []
+
+    def test_tampered_key_is_an_empty_cart(self, api_client, variant):
+        cart_key = add_as_guest(api_client, variant, 2).data["cart_key"]
+        response = api_client.get(
+            reverse("guest-cart-list"), headers={"X-Cart-Key": cart_key + "x"}
+        )
+        assert response.data["items"] == []
+
+    def test_guest_cart_checks_stock(self, api_client, variant):
+        response = add_as_guest(api_client, variant, 11)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_update_and_remove(self, api_client, variant):
+        cart_key = add_as_guest(api_client, variant, 1).data["cart_key"]
+
+        response = api_client.post(
+            reverse("guest-cart-update-quantity"),
+            {"product_variant_id": variant.id, "quantity": 4},
+            headers={"X-Cart-Key": cart_key},
+        )
+        assert response.data["total_items"] == 4
+        headers = {"X-Cart-Key": response.data["cart_key"]}
+
+        response = api_client.post(
+            reverse("guest-cart-remove-item"),
+            {"product_variant_id": variant.id},
+            headers=headers,
+        )
+        assert response.data["items"] == []
+
+    def test_login_merges_guest_cart(self, api_client, user, variant):
+        cart_key = add_as_guest(api_client, variant, 3).data["cart_key"]
+        cart = Cart.objects.create(user=user)
+        CartProduct.objects.create(cart=cart, product_variant=variant, quantity=2)
+
+        response = api_client.post(
+            reverse("token_obtain_pair"),
+            {"email": "test@example.com", "password": "password123"},
+            headers={"X-Cart-Key": cart_key},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "access" in response.data
+        assert CartProduct.objects.get(cart=cart).quantity == 5
+
+        # Replaying the same token on a later login does not merge it again
+        api_client.post(
+            reverse("token_obtain_pair"),
+            {"email": "test@example.com", "password": "password123"},
+            headers={"X-Cart-Key": cart_key},
+        )
+        assert CartProduct.objects.get(cart=cart).quantity == 5
+
+    def test_merge_caps_quantity_at_stock(self, api_client, user, variant):
+        cart_key = add_as_guest(api_client, variant, 8).data["cart_key"]
+        cart = Cart.objects.create(user=user)
+        CartProduct.objects.create(cart=cart, product_variant=variant, quantity=5)
+
+        api_client.post(
+            reverse("token_obtain_pair"),
+            {"email": "test@example.com", "password": "password123"},
+            headers={"X-Cart-Key": cart_key},
+        )
+
+        assert CartProduct.objects.get(cart=cart).quantity == 10
+
+    def test_merge_respects_other_holds_and_reserves(self, api_client, user, variant):
+        cart_key = add_as_guest(api_client, variant, 5).data["cart_key"]
+        other = User.objects.create_user(email="other@example.com", password="pw")
+        CartProduct.objects.create(
+            cart=Cart.objects.create(user=other),
+            product_variant=variant,
+            quantity=8,
+            reserved_until=reservation_expiry(),
+        )
+
+        api_client.post(
+            reverse("token_obtain_pair"),
+            {"email": "test@example.com", "password": "password123"},
+            headers={"X-Cart-Key": cart_key},
+        )
+
+        line = CartProduct.objects.get(cart__user=user)
+        assert line.quantity == 2
+        assert line.reserved_until is not None
+
+    def test_guest_cart_is_in_the_api_schema(self):
+        from drf_spectacular.generators import SchemaGenerator
+
+        paths = SchemaGenerator().get_schema(request=None, public=True)["paths"]
+        add_item = paths["/api/orders/guest-cart/add_item/"]["post"]
+        assert "requestBody" in add_item
+        assert any(p["name"] == "X-Cart-Key" for p in add_item["parameters"])
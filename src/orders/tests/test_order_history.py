@@ -0,0 +1,82 @@
+from datetime import datetime, timezone as dt_timezone
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from orders.models import Order, OrderProduct
+
+User = get_user_model()
+
+# All common fixtures (authenticated_client, user) are available from
+# utils.test_helpers via conftest.py
+
+
+def make_order(user, day, order_status="PENDING"):
+    order = Order.objects.create(
+        user=user,
+        status=order_status,
+        total_price=10,
+        shipping_address="Calle Falsa 123",
+        billing_address="Calle Falsa 123",
+    )
+    created = datetime(2026, 1, day, 12, tzinfo=dt_timezone.utc)
+    Order.objects.filter(pk=order.pk).update(created_at=created)
+    return order
+
+
+@pytest.mark.django_db
+class TestOrderHistory:
+    url = reverse("orders-list")
+
+    def test_pages_newest_first_with_cursor(self, authenticated_client, user):
+        orders = [make_order(user, day) for day in range(1, 6)]
+        make_order(User.objects.create_user(email="x@example.com", password="pw"), 3)
+
+        response = authenticated_client.get(self.url, {"page_size": 2})
+        assert response.status_code == status.HTTP_200_OK
+        seen = [o["id"] for o in response.data["results"]]
+        while response.data["next"]:
+            response = authenticated_client.get(response.data["next"])
+            seen += [o["id"] for o in response.data["results"]]
+
+        assert seen == [o.id for o in reversed(orders)]
+
+    def test_filters_by_status_and_date_range(self, authenticated_client, user):
+        make_order(user, 1, "PAID")
+        in_range = make_order(user, 10, "PAID")
+        make_order(user, 10, "PENDING")
+        make_order(user, 20, "PAID")
+
+        response = authenticated_client.get(
+            self.url,
+            {
+                "status": "PAID",
+                "created_after": "2026-01-05",
+                "created_before": "2026-01-10",
+            },
+        )
+
+        assert [o["id"] for o in response.data["results"]] == [in_range.id]
+
+    def test_reads_only_order_tables(
+        self, authenticated_client, user, variant, django_assert_num_queries
+    ):
+        for day in range(1, 4):
+            OrderProduct.objects.create(
+                order=make_order(user, day),
+                product_variant=variant,
+                quantity=1,
+                price_at_purchase=10,
+            )
+
+        # hot page + its lines prefetch + archived page, whatever the number of lines
+        with django_assert_num_queries(3) as captured:
+            response = authenticated_client.get(self.url)
+
+        assert response.data["results"][0]["products"][0]["sku"] == variant.sku
+        assert not any("products_" in q["sql"] for q in captured.captured_queries)
+
+    def test_rejects_unknown_status(self, authenticated_client):
+        response = authenticated_client.get(self.url, {"status": "LOST"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
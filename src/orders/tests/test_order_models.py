@@ -40,3 +40,48 @@ class TestOrderModels:
         assert cart.items.count() == 1
         assert cart.items.first().quantity == 3
         assert cart.items.first().product_variant == variant
+
+    def test_order_product_snapshot_survives_catalog_edits(self, user, variant):
+        order = Order.objects.create(
+            user=user, total_price=100, shipping_address="Addr", billing_address="Addr"
+        )
+        op = OrderProduct.objects.create(
+            order=order, product_variant=variant, quantity=1, price_at_purchase=100
+        )
+        original_name = variant.product.name
+        variant.product.name = "Renamed"
+        variant.product.save()
+        variant.name = "Renamed variant"
+        variant.save()
+
+        op.refresh_from_db()
+        assert op.product_name == original_name
+        assert op.variant_name == "Default"
+        assert op.sku == variant.sku
+        assert str(op) == f"1 x {original_name} (Default)"
+
+    def test_create_from_products_merges_into_existing_cart(
+        self, user, variant, django_assert_max_num_queries
+    ):
+        cart = Cart.objects.create(user=user)
+        cart.items.create(product_variant=variant, quantity=2)
+        lines = [
+            {"product_variant_id": variant.id, "quantity": 5},
+            {"product_variant_id": variant, "quantity": 1},
+            {"product_variant_id": 999999, "quantity": 4},
+        ]
+
+        # cart lookup + availability + upsert (+ savepoints), for any line count
+        with django_assert_max_num_queries(6):
+            result = Cart.objects.create_from_products(user, lines)
+
+        assert result.pk == cart.pk
+        assert list(cart.items.values_list("quantity", flat=True)) == [8]
+        assert result.unavailable == {999999: 4}
+
+    def test_create_from_products_caps_at_available_stock(self, user, variant):
+        cart = Cart.objects.create_from_products(
+            user, [{"product_variant_id": variant.id, "quantity": 15}]
+        )
+        assert cart.items.get().quantity == 10
+        assert cart.unavailable == {variant.id: 5}
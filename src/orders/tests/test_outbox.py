@@ -0,0 +1,165 @@
+import json
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from orders.fulfilment import import_tracking_numbers
+from orders.models import Cart, CartProduct, Order, OutboxEvent
+from orders.outbox import WebhookSink, dispatch_batch, load_sinks
+
+# All common fixtures (authenticated_client, user, variant)
+# are available from utils.test_helpers via conftest.py
+
+checkout_url = reverse("orders-checkout")
+
+
+class BrokenSink:
+    def send(self, events):
+        raise OSError("ERP down")
+
+
+@pytest.fixture
+def file_sink(settings, tmp_path):
+    path = tmp_path / "events.ndjson"
+    settings.OUTBOX_SINKS = [
+        {"BACKEND": "orders.outbox.FileSink", "OPTIONS": {"path": str(path)}}
+    ]
+    return path
+
+
+def read_events(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def paid_order(user):
+    return Order.objects.create(
+        user=user,
+        status="PAID",
+        total_price=10,
+        shipping_address="Addr",
+        billing_address="Addr",
+    )
+
+
+@pytest.mark.django_db
+class TestOutboxWrites:
+    def test_checkout_writes_order_placed(self, authenticated_client, user, variant):
+        cart = Cart.objects.create(user=user)
+        CartProduct.objects.create(cart=cart, product_variant=variant, quantity=2)
+
+        response = authenticated_client.post(checkout_url, {"shipping_address": "A"})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        event = OutboxEvent.objects.get()
+        assert (event.event_type, event.order_id) == (
+            "order.placed",
+            response.data["id"],
+        )
+        assert event.payload["customer_email"] == user.email
+        assert event.payload["lines"] == [
+            {"sku": variant.sku, "quantity": 2, "price": str(variant.price)}
+        ]
+
+    def test_failed_checkout_writes_nothing(self, authenticated_client, user, variant):
+        cart = Cart.objects.create(user=user)
+        CartProduct.objects.create(cart=cart, product_variant=variant, quantity=50)
+
+        response = authenticated_client.post(checkout_url, {"shipping_address": "A"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not OutboxEvent.objects.exists()
+
+    def test_transitions_write_one_event_per_moved_order(self, user):
+        orders = [paid_order(user), paid_order(user)]
+        Order.objects.create(user=user, status="PENDING", total_price=1)
+
+        Order.objects.all().transition_to("SHIPPED")
+
+        events = OutboxEvent.objects.order_by("order_id")
+        assert [(e.event_type, e.order_id) for e in events] == [
+            ("order.shipped", order.id) for order in orders
+        ]
+
+    def test_tracking_import_writes_shipped_once(self, user):
+        order = paid_order(user)
+        lines = ["order_id,tracking_number", f"{order.id},TRK-1"]
+
+        import_tracking_numbers(lines)
+        import_tracking_numbers(["order_id,tracking_number", f"{order.id},TRK-2"])
+
+        event = OutboxEvent.objects.get()
+        assert event.event_type == "order.shipped"
+        assert event.payload["tracking_number"] == "TRK-1"
+
+
+@pytest.mark.django_db
+class TestOutboxDispatch:
+    def test_delivers_batches_to_file_sink(self, user, file_sink):
+        orders = [paid_order(user) for _ in range(3)]
+        Order.objects.all().transition_to("SHIPPED")
+
+        call_command("dispatch_outbox", "--once", "--batch-size", "2")
+
+        delivered = read_events(file_sink)
+        assert [e["order_id"] for e in delivered] == [o.id for o in orders]
+        assert {e["type"] for e in delivered} == {"order.shipped"}
+        assert not OutboxEvent.objects.exclude(status=OutboxEvent.DELIVERED).exists()
+
+        # Delivered events are not sent again
+        call_command("dispatch_outbox", "--once")
+        assert len(read_events(file_sink)) == 3
+
+    def test_failed_batch_backs_off_then_gives_up(self, user, settings):
+        settings.OUTBOX_MAX_ATTEMPTS = 2
+        settings.OUTBOX_RETRY_BACKOFF = 30
+        paid_order(user)
+        Order.objects.all().transition_to("SHIPPED")
+
+        assert dispatch_batch([BrokenSink()]) == (1, "OSError: ERP down")
+        event = OutboxEvent.objects.get()
+        assert (event.status, event.attempts) == (OutboxEvent.PENDING, 1)
+        assert event.next_attempt_at > timezone.now()
+
+        # Not due yet: nothing is claimed
+        assert dispatch_batch([BrokenSink()]) == (0, None)
+
+        OutboxEvent.objects.update(next_attempt_at=timezone.now())
+        dispatch_batch([BrokenSink()])
+        event.refresh_from_db()
+        assert (event.status, event.attempts) == (OutboxEvent.FAILED, 2)
+        assert event.last_error == "OSError: ERP down"
+
+    def test_command_requires_a_sink(self, settings):
+        settings.OUTBOX_SINKS = []
+        with pytest.raises(CommandError):
+            call_command("dispatch_outbox", "--once")
+
+
+@pytest.mark.django_db
+class TestWebhookSink:
+    def test_posts_signed_batch(self, user):
+        paid_order(user)
+        Order.objects.all().transition_to("SHIPPED")
+        sink = load_sinks(
+            [
+                {
+                    "BACKEND": "orders.outbox.WebhookSink",
+                    "OPTIONS": {"url": "http://erp.test/hook", "secret": "s3cret"},
+                }
+            ]
+        )[0]
+        assert isinstance(sink, WebhookSink)
+
+        with mock.patch("urllib.request.urlopen") as urlopen:
+            urlopen.return_value.__enter__.return_value.status = 204
+            assert dispatch_batch([sink]) == (1, None)
+
+        request = urlopen.call_args.args[0]
+        assert request.full_url == "http://erp.test/hook"
+        body = json.loads(request.data)
+        assert body["events"][0]["type"] == "order.shipped"
+        assert request.get_header("X-outbox-signature")
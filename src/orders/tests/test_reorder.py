@@ -0,0 +1,64 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from orders.models import Cart, CartProduct, Order, OrderProduct
+
+# All common fixtures (authenticated_client, user, variant, admin_user)
+# are available from utils.test_helpers via conftest.py
+
+
+@pytest.fixture
+def past_order(user, variant):
+    order = Order.objects.create(
+        user=user,
+        status="DELIVERED",
+        total_price=300,
+        shipping_address="Addr",
+        billing_address="Addr",
+    )
+    OrderProduct.objects.create(
+        order=order, product_variant=variant, quantity=3, price_at_purchase=100
+    )
+    return order
+
+
+@pytest.mark.django_db
+class TestReorder:
+    def url(self, order):
+        return reverse("orders-reorder", args=[order.id])
+
+    def test_reorder_adds_lines_to_cart(self, authenticated_client, user, past_order):
+        response = authenticated_client.post(self.url(past_order))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["cart"]["total_items"] == 3
+        assert response.data["unavailable"] == []
+        assert CartProduct.objects.get(cart__user=user).reserved_until is not None
+
+    def test_reorder_reports_missing_stock(
+        self, authenticated_client, user, variant, past_order
+    ):
+        cart = Cart.objects.create(user=user)
+        cart.items.create(product_variant=variant, quantity=9)
+
+        response = authenticated_client.post(self.url(past_order))
+
+        assert response.data["cart"]["total_items"] == 10
+        assert response.data["unavailable"] == [
+            {"product_variant_id": variant.id, "quantity": 2}
+        ]
+
+    def test_reorder_archived_order(self, authenticated_client, past_order):
+        call_command("archive_orders", days=-1)
+
+        response = authenticated_client.post(self.url(past_order))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["cart"]["total_items"] == 3
+
+    def test_cannot_reorder_someone_elses_order(
+        self, authenticated_client, past_order, admin_user
+    ):
+        Order.objects.filter(pk=past_order.pk).update(user=admin_user)
+        response = authenticated_client.post(self.url(past_order))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,153 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from orders.models import Cart, CartProduct
+from orders.reservations import with_available_stock
+from products.models import ProductVariant
+
+User = get_user_model()
+
+# All common fixtures (authenticated_client, user, variant)
+# are now available from utils.test_helpers via conftest.py
+
+
+@pytest.fixture
+def other_client(db):
+    client = APIClient()
+    client.force_authenticate(
+        user=User.objects.create_user(email="other@example.com", password="pw")
+    )
+    return client
+
+
+def available(variant):
+    return with_available_stock(ProductVariant.objects.filter(pk=variant.pk)).get()
+
+
+@pytest.mark.django_db
+class TestCartReservations:
+    def test_add_item_places_hold(self, authenticated_client, variant, settings):
+        settings.CART_RESERVATION_TTL = 600
+        authenticated_client.post(
+            reverse("cart-add-item"), {"product_variant_id": variant.id, "quantity": 8}
+        )
+
+        item = CartProduct.objects.get(product_variant=variant)
+        assert item.reserved_until > timezone.now() + timedelta(seconds=590)
+        assert available(variant).available_stock == 2
+
+    def test_holds_block_other_carts(self, authenticated_client, other_client, variant):
+        url = reverse("cart-add-item")
+        authenticated_client.post(
+            url, {"product_variant_id": variant.id, "quantity": 8}
+        )
+
+        response = other_client.post(
+            url, {"product_variant_id": variant.id, "quantity": 3}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = other_client.post(
+            url, {"product_variant_id": variant.id, "quantity": 2}
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_expired_holds_do_not_count(self, user, variant):
+        cart = Cart.objects.create(user=user)
+        CartProduct.objects.create(
+            cart=cart,
+            product_variant=variant,
+            quantity=8,
+            reserved_until=timezone.now() - timedelta(seconds=1),
+        )
+        assert available(variant).available_stock == 10
+
+    def test_checkout_respects_other_holds(
+        self, authenticated_client, other_client, user, variant
+    ):
+        other_client.post(
+            reverse("cart-add-item"), {"product_variant_id": variant.id, "quantity": 8}
+        )
+        # A line without a hold (e.g. it expired) competes for the free stock only
+        CartProduct.objects.create(
+            cart=Cart.objects.create(user=user), product_variant=variant, quantity=3
+        )
+
+        response = authenticated_client.post(
+            reverse("orders-checkout"), {"shipping_address": "Addr"}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = other_client.post(
+            reverse("orders-checkout"), {"shipping_address": "Addr"}
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        variant.refresh_from_db()
+        assert variant.stock == 2
+        assert available(variant).available_stock == 2
+
+    def test_sweeper_releases_expired_holds_in_batches(self, variant):
+        past = timezone.now() - timedelta(minutes=1)
+        for i in range(5):
+            cart = Cart.objects.create(
+                user=User.objects.create_user(email=f"u{i}@example.com", password="pw")
+            )
+            CartProduct.objects.create(
+                cart=cart, product_variant=variant, quantity=1, reserved_until=past
+            )
+
+        call_command("expire_cart_reservations", batch_size=2)
+
+        assert not CartProduct.objects.filter(reserved_until__isnull=False).exists()
+        assert CartProduct.objects.count() == 5
+
+
+@pytest.mark.django_db
+class TestPurgeAbandonedCarts:
+    def test_purges_only_stale_carts(self, variant):
+        old = timezone.now() - timedelta(days=45)
+        stale, idle, active, fresh = (
+            Cart.objects.create(
+                user=User.objects.create_user(email=f"p{i}@example.com", password="pw")
+            )
+            for i in range(4)
+        )
+        Cart.objects.filter(id__in=[stale.id, idle.id, active.id]).update(
+            created_at=old
+        )
+        CartProduct.objects.create(cart=stale, product_variant=variant, quantity=1)
+        CartProduct.objects.create(cart=active, product_variant=variant, quantity=1)
+        CartProduct.objects.filter(cart=stale).update(updated_at=old)
+
+        call_command("purge_abandoned_carts", days=30, batch_size=1)
+
+        assert set(Cart.objects.values_list("id", flat=True)) == {active.id, fresh.id}
+        assert list(CartProduct.objects.values_list("cart_id", flat=True)) == [
+            active.id
+        ]
+
+    def test_keeps_cart_that_gets_a_line_mid_purge(self, user, variant):
+        from django.db import transaction
+        from orders.management.commands import purge_abandoned_carts
+
+        cart = Cart.objects.create(user=user)
+        Cart.objects.update(created_at=timezone.now() - timedelta(days=45))
+
+        def add_line_then_atomic():
+            # The user adds a line after the batch was selected
+            CartProduct.objects.create(cart=cart, product_variant=variant, quantity=1)
+            return transaction.atomic()
+
+        with mock.patch.object(
+            purge_abandoned_carts, "transaction", mock.Mock(atomic=add_line_then_atomic)
+        ):
+            call_command("purge_abandoned_carts", days=30)
+
+        assert CartProduct.objects.filter(cart=cart).exists()
@@ -1,9 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CartViewSet, OrderViewSet
+from .views import CartViewSet, CheckoutTicketViewSet, GuestCartViewSet, OrderViewSet
 
 router = DefaultRouter()
 router.register(r"cart", CartViewSet, basename="cart")
+router.register(r"guest-cart", GuestCartViewSet, basename="guest-cart")
+router.register(r"checkout-tickets", CheckoutTicketViewSet, basename="checkout-ticket")
 router.register(r"", OrderViewSet, basename="orders")
 
 urlpatterns = [
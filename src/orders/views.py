@@ -1,187 +1,533 @@
+import io
 from decimal import Decimal
 
+from django.conf import settings
 from django.db import transaction
+from django.db.models import Prefetch
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django_filters.rest_framework import DjangoFilterBackend
+from django_filters.utils import translate_validation
+from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from .models import Cart, CartProduct, Order, OrderProduct
+from rest_framework.reverse import reverse
+from .checkout import CheckoutError, place_order
+from .export import export_lines, streaming_export_response
+from .filters import OrderFilter
+from .fulfilment import import_tracking_numbers
+from .guest_cart import GUEST_CART_HEADER, GuestCart
+from .idempotency import IDEMPOTENCY_HEADER, is_valid_key, run_idempotent
+from .models import ArchivedOrder, Cart, CartProduct, CheckoutTicket, Order
+from .pagination import OrderHistoryPagination
+from .queue import enqueue_checkout
+from .reservations import (
+    add_to_cart,
+    reservation_expiry,
+    sync_cart,
+    with_available_stock,
+)
 from .serializers import (
+    AddCartItemSerializer,
+    BulkStatusSerializer,
+    CartLineSerializer,
     CartSerializer,
-    OrderSerializer,
+    CartSyncSerializer,
     CheckoutSerializer,
+    CheckoutTicketSerializer,
+    GuestCartSerializer,
+    OrderExportSerializer,
+    OrderSerializer,
+    TrackingImportSerializer,
+    VariantRefSerializer,
 )
-from products.models import ProductVariant
+from products.models import AttributeValue, ProductVariant
 
 
-class CartViewSet(viewsets.ModelViewSet):
+class CartViewSet(viewsets.GenericViewSet):
+    """
+    The current user's cart. Only `list` and the actions are routed: a user has
+    one cart (OneToOneField), so there is no detail route, and reads never
+    create the cart row.
+    """
+
     serializer_class = CartSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        # A user only has one cart (OneToOneField)
         return Cart.objects.filter(user=self.request.user)
 
-    def get_object(self):
-        cart, created = Cart.objects.get_or_create(user=self.request.user)
-        return cart
+    def cart_data(self):
+        """
+        Serializes the cart through the prefetch/aggregate read model. Users
+        without a cart row get an empty virtual cart instead of a new row.
+        """
+        cart = Cart.objects.with_details().filter(user=self.request.user).first()
+        if cart is None:
+            return {
+                "id": None,
+                "user": self.request.user.pk,
+                "items": [],
+                "total_price": Decimal("0.00"),
+                "total_items": 0,
+            }
+        return CartSerializer(cart).data
 
     def list(self, request, *args, **kwargs):
         """Returns the current user's cart."""
-        cart = self.get_object()
-        serializer = self.get_serializer(cart)
-        return Response(serializer.data)
+        return Response(self.cart_data())
 
     @action(detail=False, methods=["post"])
     def add_item(self, request):
-        """Adds a product variant to the cart."""
-        cart = self.get_object()
-        variant_id = request.data.get("product_variant_id")
-        quantity = int(request.data.get("quantity", 1))
-
-        try:
-            variant = ProductVariant.objects.get(id=variant_id)
-        except ProductVariant.DoesNotExist:
-            return Response(
-                {"error": "Product variant not found"}, status=status.HTTP_404_NOT_FOUND
-            )
+        """Adds a product variant to the cart and reserves its stock."""
+        serializer = AddCartItemSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        variant_id = serializer.validated_data["product_variant_id"]
+        quantity = serializer.validated_data["quantity"]
 
-        if variant.stock < quantity:
+        if not add_to_cart(request.user, variant_id, quantity):
+            if not ProductVariant.objects.filter(id=variant_id).exists():
+                return Response(
+                    {"error": "Product variant not found"},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
             return Response(
                 {"error": "Not enough stock"}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        cart_item, created = CartProduct.objects.get_or_create(
-            cart=cart, product_variant=variant, defaults={"quantity": quantity}
-        )
-
-        if not created:
-            cart_item.quantity += quantity
-            cart_item.save()
-
-        return Response(CartSerializer(cart).data, status=status.HTTP_201_CREATED)
+        return Response(self.cart_data(), status=status.HTTP_201_CREATED)
 
     @action(detail=False, methods=["post"])
     def update_quantity(self, request):
-        """Updates the quantity of an item in the cart."""
-        cart = self.get_object()
+        """Updates the quantity of an item in the cart and renews its reservation."""
         item_id = request.data.get("item_id")
         quantity = int(request.data.get("quantity"))
 
-        try:
-            cart_item = CartProduct.objects.get(id=item_id, cart=cart)
-        except CartProduct.DoesNotExist:
-            return Response(
-                {"error": "Item not found in cart"}, status=status.HTTP_404_NOT_FOUND
-            )
+        with transaction.atomic():
+            try:
+                cart_item = CartProduct.objects.get(id=item_id, cart__user=request.user)
+            except CartProduct.DoesNotExist:
+                return Response(
+                    {"error": "Item not found in cart"},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
 
-        if quantity <= 0:
-            cart_item.delete()
-        else:
-            if cart_item.product_variant.stock < quantity:
+            if quantity <= 0:
+                cart_item.delete()
+                return Response(self.cart_data())
+
+            variant = with_available_stock(
+                ProductVariant.objects.select_for_update(),
+                exclude_cart=cart_item.cart_id,
+            ).get(id=cart_item.product_variant_id)
+            if variant.available_stock < quantity:
                 return Response(
                     {"error": "Not enough stock"}, status=status.HTTP_400_BAD_REQUEST
                 )
             cart_item.quantity = quantity
+            cart_item.reserved_until = reservation_expiry()
             cart_item.save()
 
-        return Response(CartSerializer(cart).data)
+        return Response(self.cart_data())
+
+    @action(detail=False, methods=["post"])
+    def sync(self, request):
+        """
+        Replaces the cart with the desired final lines in one request.
+        Expects: items = [{product_variant_id, quantity}, ...]
+        """
+        serializer = CartSyncSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        desired = {
+            line["product_variant_id"]: line["quantity"]
+            for line in serializer.validated_data["items"]
+            if line["quantity"] > 0
+        }
+
+        problems = sync_cart(request.user, desired)
+        if problems:
+            return Response(
+                {"error": "Some items are unavailable", "items": problems},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(self.cart_data())
 
     @action(detail=False, methods=["post"])
     def remove_item(self, request):
         """Removes an item from the cart."""
-        cart = self.get_object()
         item_id = request.data.get("item_id")
 
         try:
-            cart_item = CartProduct.objects.get(id=item_id, cart=cart)
+            cart_item = CartProduct.objects.get(id=item_id, cart__user=request.user)
             cart_item.delete()
         except CartProduct.DoesNotExist:
             return Response(
                 {"error": "Item not found in cart"}, status=status.HTTP_404_NOT_FOUND
             )
 
-        return Response(CartSerializer(cart).data)
+        return Response(self.cart_data())
 
     @action(detail=False, methods=["post"])
     def clear(self, request):
         """Clears the cart."""
-        cart = self.get_object()
-        cart.items.all().delete()
-        return Response(CartSerializer(cart).data)
+        CartProduct.objects.filter(cart__user=request.user).delete()
+        return Response(self.cart_data())
+
+
+GUEST_CART_KEY_PARAMETER = OpenApiParameter(
+    GUEST_CART_HEADER,
+    location=OpenApiParameter.HEADER,
+    required=False,
+    description="Guest cart token returned by the previous response",
+)
+
+
+@extend_schema_view(
+    list=extend_schema(parameters=[GUEST_CART_KEY_PARAMETER]),
+    add_item=extend_schema(
+        request=AddCartItemSerializer, parameters=[GUEST_CART_KEY_PARAMETER]
+    ),
+    update_quantity=extend_schema(
+        request=CartLineSerializer, parameters=[GUEST_CART_KEY_PARAMETER]
+    ),
+    remove_item=extend_schema(
+        request=VariantRefSerializer, parameters=[GUEST_CART_KEY_PARAMETER]
+    ),
+    clear=extend_schema(request=None, parameters=[GUEST_CART_KEY_PARAMETER]),
+)
+class GuestCartViewSet(viewsets.ViewSet):
+    """
+    Anonymous cart carried in the signed X-Cart-Key token; every response
+    returns the updated token. Merged into the persistent cart when the guest
+    obtains a JWT token.
+    """
+
+    permission_classes = [permissions.AllowAny]
+    serializer_class = GuestCartSerializer
+
+    def get_guest_cart(self):
+        return GuestCart(self.request.headers.get(GUEST_CART_HEADER))
+
+    def cart_response(self, guest, status_code=status.HTTP_200_OK):
+        variants = (
+            ProductVariant.objects.filter(id__in=guest.lines)
+            .select_related("product")
+            .prefetch_related(
+                Prefetch(
+                    "attribute_values",
+                    queryset=AttributeValue.objects.select_related("attribute"),
+                )
+            )
+        )
+        items = [
+            {
+                "product_variant": variant,
+                "quantity": guest.lines[variant.id],
+                "subtotal": variant.price * guest.lines[variant.id],
+            }
+            for variant in variants
+        ]
+        key = guest.key
+        data = GuestCartSerializer(
+            {
+                "cart_key": key,
+                "items": items,
+                "total_price": sum((i["subtotal"] for i in items), Decimal("0.00")),
+                "total_items": sum(i["quantity"] for i in items),
+            }
+        ).data
+        headers = {GUEST_CART_HEADER: key} if key else None
+        return Response(data, status=status_code, headers=headers)
+
+    def set_quantity(self, guest, variant_id, quantity):
+        """Validates stock and stores the new quantity; returns an error Response or None."""
+        variant = (
+            with_available_stock(ProductVariant.objects.all())
+            .filter(id=variant_id)
+            .first()
+        )
+        if variant is None:
+            return Response(
+                {"error": "Product variant not found"}, status=status.HTTP_404_NOT_FOUND
+            )
+        if variant.available_stock < quantity:
+            return Response(
+                {"error": "Not enough stock"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if guest.is_full_for(variant.id):
+            return Response(
+                {"error": "Guest cart is full"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        guest.set(variant.id, quantity)
+        return None
+
+    def list(self, request):
+        """Returns the guest cart (empty if the key is unknown or expired)."""
+        return self.cart_response(self.get_guest_cart())
+
+    @action(detail=False, methods=["post"])
+    def add_item(self, request):
+        """Adds a product variant to the guest cart."""
+        serializer = AddCartItemSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        variant_id = serializer.validated_data["product_variant_id"]
+        quantity = serializer.validated_data["quantity"]
+
+        guest = self.get_guest_cart()
+
+        error = self.set_quantity(
+            guest, variant_id, guest.lines.get(variant_id, 0) + quantity
+        )
+        return error or self.cart_response(guest, status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=["post"])
+    def update_quantity(self, request):
+        """Sets the quantity of a variant in the guest cart (0 removes it)."""
+        serializer = CartLineSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        variant_id = serializer.validated_data["product_variant_id"]
+        quantity = serializer.validated_data["quantity"]
+
+        guest = self.get_guest_cart()
+
+        if variant_id not in guest.lines:
+            return Response(
+                {"error": "Item not found in cart"}, status=status.HTTP_404_NOT_FOUND
+            )
+        if quantity <= 0:
+            guest.set(variant_id, 0)
+            return self.cart_response(guest)
+        return self.set_quantity(guest, variant_id, quantity) or self.cart_response(
+            guest
+        )
+
+    @action(detail=False, methods=["post"])
+    def remove_item(self, request):
+        """Removes a variant from the guest cart."""
+        serializer = VariantRefSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        variant_id = serializer.validated_data["product_variant_id"]
+
+        guest = self.get_guest_cart()
+        if variant_id not in guest.lines:
+            return Response(
+                {"error": "Item not found in cart"}, status=status.HTTP_404_NOT_FOUND
+            )
+        guest.set(variant_id, 0)
+        return self.cart_response(guest)
+
+    @action(detail=False, methods=["post"])
+    def clear(self, request):
+        """Clears the guest cart."""
+        guest = self.get_guest_cart()
+        guest.clear()
+        return self.cart_response(guest)
+
+
+class CheckoutTicketViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Queued checkouts of the current user; poll a ticket until DONE or FAILED.
+    The list is keyset-paginated (newest first) like the order history.
+    """
+
+    serializer_class = CheckoutTicketSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = OrderHistoryPagination
+
+    def get_queryset(self):
+        return (
+            CheckoutTicket.objects.filter(user=self.request.user)
+            .select_related("order")
+            .prefetch_related("order__products")
+            .order_by("-id")
+        )
 
 
 class OrderViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = OrderFilter
+    pagination_class = OrderHistoryPagination
+
+    def get_permissions(self):
+        """Fulfilment actions work across all users' orders: admin only."""
+        if self.action in ["bulk_status", "import_tracking", "export"]:
+            return [permissions.IsAdminUser()]
+        return super().get_permissions()
 
     def get_queryset(self):
-        return Order.objects.filter(user=self.request.user).prefetch_related(
-            "products__product_variant__product"
+        return Order.objects.filter(user=self.request.user).prefetch_related("products")
+
+    def get_archived_queryset(self):
+        return ArchivedOrder.objects.filter(user=self.request.user).prefetch_related(
+            "products"
         )
 
+    def filter_history(self, queryset):
+        filterset = OrderFilter(
+            self.request.query_params, queryset=queryset, request=self.request
+        )
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        return filterset.qs
+
+    def list(self, request, *args, **kwargs):
+        """Order history: hot and archived orders merged, newest first."""
+        page = self.paginator.paginate_querysets(
+            [
+                self.filter_history(self.get_queryset()),
+                self.filter_history(self.get_archived_queryset()),
+            ],
+            request,
+        )
+        serializer = self.get_serializer(page, many=True)
+        return self.paginator.get_paginated_response(serializer.data)
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            order = get_object_or_404(
+                self.get_archived_queryset(), pk=self.kwargs["pk"]
+            )
+            self.check_object_permissions(self.request, order)
+            return order
+
     @action(detail=False, methods=["post"])
     def checkout(self, request):
         """
         Converts the current user's cart into an Order.
         Expects: shipping_address (and optional billing_address)
+        An Idempotency-Key header makes retries replay the first successful response.
+        With CHECKOUT_QUEUE_ENABLED the order is placed by the queue worker:
+        responds 202 with a ticket to poll at /api/orders/checkout-tickets/<id>/.
         """
         serializer = CheckoutSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        cart_items = cart.items.select_related("product_variant").all()
-
-        if not cart_items:
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is not None and not is_valid_key(key):
             return Response(
-                {"error": "El carrito está vacío"}, status=status.HTTP_400_BAD_REQUEST
+                {"error": "Idempotency-Key inválida"},
+                status=status.HTTP_400_BAD_REQUEST,
             )
 
-        try:
-            with transaction.atomic():
-                # 1. Total and stock check
-                total_price = Decimal("0.00")
-                for item in cart_items:
-                    if item.product_variant.stock < item.quantity:
-                        raise ValueError(
-                            f"Stock insuficiente para {item.product_variant.product.name}"
-                        )
-                    total_price += item.product_variant.price * item.quantity
-
-                # 2. Create Order
-                order = Order.objects.create(
-                    user=request.user,
-                    status="PENDING",
-                    total_price=total_price,
+        def produce():
+            if settings.CHECKOUT_QUEUE_ENABLED:
+                ticket = enqueue_checkout(
+                    request.user,
                     shipping_address=serializer.validated_data["shipping_address"],
                     billing_address=serializer.validated_data["billing_address"],
                 )
+                data = CheckoutTicketSerializer(
+                    ticket, context={"request": request}
+                ).data
+                return status.HTTP_202_ACCEPTED, data
+            order = place_order(
+                request.user,
+                shipping_address=serializer.validated_data["shipping_address"],
+                billing_address=serializer.validated_data["billing_address"],
+            )
+            order = self.get_queryset().get(pk=order.pk)
+            data = OrderSerializer(order, context={"request": request}).data
+            return status.HTTP_201_CREATED, data
 
-                # 3. Create items, snap prices and decrement stock
-                for item in cart_items:
-                    OrderProduct.objects.create(
-                        order=order,
-                        product_variant=item.product_variant,
-                        quantity=item.quantity,
-                        price_at_purchase=item.product_variant.price,
-                    )
-                    # Decrement stock
-                    variant = item.product_variant
-                    variant.stock -= item.quantity
-                    variant.save()
-
-                # 4. Clear Cart
-                cart.items.all().delete()
-
-                return Response(
-                    OrderSerializer(order).context.update({"request": request})
-                    or OrderSerializer(order).data,
-                    status=status.HTTP_201_CREATED,
-                )
-
-        except ValueError as e:
+        try:
+            if key is None:
+                status_code, body = produce()
+                replayed = False
+            else:
+                status_code, body, replayed = run_idempotent(request.user, key, produce)
+        except CheckoutError as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception:
             return Response(
                 {"error": "Error al procesar el pedido"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
+
+        headers = {"Idempotent-Replayed": "true"} if replayed else {}
+        if status_code == status.HTTP_202_ACCEPTED:
+            headers["Location"] = reverse(
+                "checkout-ticket-detail", args=[body["id"]], request=request
+            )
+        return Response(body, status=status_code, headers=headers)
+
+    @action(detail=True, methods=["post"])
+    def reorder(self, request, pk=None):
+        """
+        Buy again: adds the order's lines (hot or archived) to the current cart,
+        capped at available stock. Reports the units that could not be added.
+        """
+        order = self.get_object()
+        cart = Cart.objects.create_from_products(
+            request.user,
+            [
+                {
+                    "product_variant_id": line.product_variant_id,
+                    "quantity": line.quantity,
+                }
+                for line in order.products.all()
+            ],
+        )
+        return Response(
+            {
+                "cart": CartSerializer(
+                    Cart.objects.with_details().get(pk=cart.pk)
+                ).data,
+                "unavailable": [
+                    {"product_variant_id": variant_id, "quantity": quantity}
+                    for variant_id, quantity in sorted(cart.unavailable.items())
+                ],
+            }
+        )
+
+    @action(detail=False, methods=["post"], url_path="bulk-status")
+    def bulk_status(self, request):
+        """
+        Moves many orders to a status in one UPDATE (admin only).
+        Expects: ids, status. Orders whose current status does not allow the
+        transition are reported as skipped.
+        """
+        serializer = BulkStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = set(serializer.validated_data["ids"])
+
+        updated = Order.objects.filter(id__in=ids).transition_to(
+            serializer.validated_data["status"]
+        )
+        return Response(
+            {"updated": sorted(updated), "skipped": sorted(ids - set(updated))}
+        )
+
+    @action(detail=False, methods=["post"], url_path="import-tracking")
+    def import_tracking(self, request):
+        """
+        Imports an order_id,tracking_number CSV upload (admin only); PAID orders
+        are marked SHIPPED.
+        """
+        serializer = TrackingImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        lines = io.TextIOWrapper(
+            serializer.validated_data["file"], encoding="utf-8-sig", newline=""
+        )
+        try:
+            result = import_tracking_numbers(lines)
+        except (UnicodeDecodeError, ValueError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """
+        Streams every order line in a date range (staff only).
+        Query params: output=csv|ndjson, start, end (YYYY-MM-DD, inclusive)
+        """
+        params = OrderExportSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        lines = export_lines(
+            start=params.validated_data.get("start"),
+            end=params.validated_data.get("end"),
+        )
+        return streaming_export_response(lines, params.validated_data["output"])
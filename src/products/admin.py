@@ -1,5 +1,12 @@
 from django.contrib import admin
-from .models import Product, ProductVariant, ProductImage, Category
+from .models import (
+    Category,
+    Product,
+    ProductImage,
+    ProductVariant,
+    StockMovement,
+    StockSnapshot,
+)
 
 
 class ProductImageInline(admin.TabularInline):
@@ -24,3 +31,39 @@ class ProductAdmin(admin.ModelAdmin):
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ("name", "parent")
     search_fields = ("name",)
+
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "product_variant", "kind", "quantity", "order_id")
+    list_filter = ("kind",)
+    search_fields = ("product_variant__sku",)
+    raw_id_fields = ("product_variant",)
+
+    # Read-only: movements are written by the variant and order flows only,
+    # so the ledger always matches ProductVariant.stock
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(StockSnapshot)
+class StockSnapshotAdmin(admin.ModelAdmin):
+    list_display = ("product_variant", "quantity", "updated_at")
+    search_fields = ("product_variant__sku",)
+    readonly_fields = ("product_variant", "quantity", "updated_at")
+
+    # Maintained by compact_stock_ledger only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
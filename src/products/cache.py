@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.cache import cache
+
+CATALOG_VERSION_KEY = "catalog:version"
+
+
+def catalog_version():
+    """Current catalog version; bumped on every catalog write."""
+    cache.add(CATALOG_VERSION_KEY, 1, timeout=None)
+    return cache.get(CATALOG_VERSION_KEY, 1)
+
+
+def catalog_cache_key(*parts):
+    """Builds a cache key that becomes stale as soon as the catalog changes."""
+    return ":".join(["catalog", str(catalog_version()), *map(str, parts)])
+
+
+def invalidate_catalog():
+    """Invalidates every catalog_cache_key() at once by bumping the version."""
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.set(CATALOG_VERSION_KEY, 2, timeout=None)
+
+
+def get_or_set_catalog(key, builder):
+    return cache.get_or_set(key, builder, timeout=settings.CATALOG_CACHE_TIMEOUT)
@@ -1,10 +1,56 @@
 from django_filters import rest_framework as filters
+from django_filters.constants import EMPTY_VALUES
 from .models import Product
 
+# Public ordering names -> model fields
+PRODUCT_ORDERINGS = {
+    "id": "id",
+    "price": "default_price",
+    "created": "created_at",
+    "name": "name",
+    "popularity": "units_sold",
+}
+
+
+def resolve_ordering(value, default="id"):
+    """
+    Translates a public ordering (e.g. "-price") into model fields with an id
+    tie-breaker, so results are stable. Returns None for unknown orderings.
+    """
+    value = value or default
+    descending = value.startswith("-")
+    field = PRODUCT_ORDERINGS.get(value.lstrip("-"))
+    if field is None:
+        return None
+    prefix = "-" if descending else ""
+    if field == "id":
+        return [f"{prefix}id"]
+    return [f"{prefix}{field}", f"{prefix}id"]
+
+
+class StableOrderingFilter(filters.OrderingFilter):
+    """
+    OrderingFilter that always ends with an id tie-breaker, so rows with equal
+    sort keys keep a fixed order and never repeat or vanish across pages.
+    """
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+
+        ordering = [self.get_ordering_value(param) for param in value]
+        if ordering[-1].lstrip("-") != "id":
+            ordering.append("-id" if ordering[-1].startswith("-") else "id")
+        return qs.order_by(*ordering)
+
 
 class ProductFilter(filters.FilterSet):
     category = filters.CharFilter(field_name="category__slug")
     tags = filters.CharFilter(method="filter_by_tags")
+    # ?ordering=price, -price, -created (newest), name, -popularity, ...
+    ordering = StableOrderingFilter(
+        fields=[(field, name) for name, field in PRODUCT_ORDERINGS.items()]
+    )
 
     class Meta:
         model = Product
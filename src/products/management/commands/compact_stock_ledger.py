@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from products.stock_ledger import compact_ledger
+
+
+class Command(BaseCommand):
+    help = "Folds stock movements older than --days into the per-variant snapshots."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=30)
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        folded = compact_ledger(
+            older_than_days=options["days"], batch_size=options["batch_size"]
+        )
+        self.stdout.write(f"Compacted {folded} stock movements")
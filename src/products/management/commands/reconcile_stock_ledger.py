@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from products.stock_ledger import reconcile_stock
+
+
+class Command(BaseCommand):
+    help = "Checks ProductVariant.stock against the stock ledger in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Append ADJUSTMENT movements so the ledger matches the stock column",
+        )
+
+    def handle(self, *args, **options):
+        mismatches = 0
+        for variant_id, stock, ledger in reconcile_stock(
+            batch_size=options["batch_size"], fix=options["fix"]
+        ):
+            mismatches += 1
+            self.stdout.write(f"Variant {variant_id}: stock={stock} ledger={ledger}")
+        action = "fixed" if options["fix"] else "found"
+        self.stdout.write(f"{mismatches} mismatches {action}")
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0002_deduplicated_media"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="productimage",
+            index=models.Index(
+                fields=["product", "position"], name="products_pr_product_78e37c_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:53
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0003_productimage_product_position_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="created_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="units_sold",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["category", "default_price", "id"],
+                name="products_pr_categor_b89e95_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["category", "created_at", "id"],
+                name="products_pr_categor_67fdd1_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["category", "name", "id"], name="products_pr_categor_d364a0_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["category", "units_sold", "id"],
+                name="products_pr_categor_e03098_idx",
+            ),
+        ),
+    ]
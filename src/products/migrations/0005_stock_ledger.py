@@ -0,0 +1,93 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def seed_snapshots(apps, schema_editor):
+    """Opens the ledger with the current stock of every variant."""
+    ProductVariant = apps.get_model("products", "ProductVariant")
+    StockSnapshot = apps.get_model("products", "StockSnapshot")
+    StockSnapshot.objects.bulk_create(
+        (
+            StockSnapshot(product_variant_id=variant_id, quantity=stock)
+            for variant_id, stock in ProductVariant.objects.values_list(
+                "id", "stock"
+            ).iterator(chunk_size=1000)
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0004_product_ordering"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StockSnapshot",
+            fields=[
+                (
+                    "product_variant",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stock_snapshot",
+                        serialize=False,
+                        to="products.productvariant",
+                    ),
+                ),
+                ("quantity", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="StockMovement",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("SALE", "Venta"),
+                            ("RESTOCK", "Reposición"),
+                            ("ADJUSTMENT", "Ajuste"),
+                            ("CANCELLATION", "Cancelación"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("quantity", models.IntegerField()),
+                ("order_id", models.BigIntegerField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                (
+                    "product_variant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_movements",
+                        to="products.productvariant",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["product_variant", "id"],
+                        include=("quantity",),
+                        name="stockmovement_variant_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(seed_snapshots, migrations.RunPython.noop),
+    ]
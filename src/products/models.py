@@ -1,5 +1,7 @@
 from django.db import models
+from django.utils import timezone
 from utils.slug_utils import unique_slugify
+from utils.storage import get_media_storage
 
 
 class Tag(models.Model):
@@ -67,9 +69,19 @@ class Product(models.Model):
     currency = models.CharField(max_length=3, default="PEN")
     default_price = models.DecimalField(max_digits=10, decimal_places=2)
     default_stock = models.PositiveIntegerField(default=0, blank=True, null=True)
+    units_sold = models.PositiveIntegerField(default=0, editable=False)
+    # default (not auto_now_add) so fixtures without the field still load
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ["id"]
+        # One index per public ordering, led by category for ?category= listings
+        indexes = [
+            models.Index(fields=["category", "default_price", "id"]),
+            models.Index(fields=["category", "created_at", "id"]),
+            models.Index(fields=["category", "name", "id"]),
+            models.Index(fields=["category", "units_sold", "id"]),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -98,20 +110,92 @@ class ProductVariant(models.Model):
         AttributeValue, related_name="variants", blank=True
     )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Stock as loaded, so the ledger signal gets the edit's delta without
+        # re-reading the row
+        if "stock" in field_names:
+            instance._loaded_stock = instance.stock
+        return instance
+
     def __str__(self):
         return f"{self.product.name} - {self.name}"
 
 
+class StockMovement(models.Model):
+    """
+    Append-only inventory ledger: one signed quantity change per row.
+    Old rows are folded into StockSnapshot by compact_stock_ledger.
+    """
+
+    SALE = "SALE"
+    RESTOCK = "RESTOCK"
+    ADJUSTMENT = "ADJUSTMENT"
+    CANCELLATION = "CANCELLATION"
+    KIND_CHOICES = (
+        (SALE, "Venta"),
+        (RESTOCK, "Reposición"),
+        (ADJUSTMENT, "Ajuste"),
+        (CANCELLATION, "Cancelación"),
+    )
+
+    product_variant = models.ForeignKey(
+        ProductVariant, related_name="stock_movements", on_delete=models.CASCADE
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    quantity = models.IntegerField()
+    # Plain id: the catalog app does not depend on orders
+    order_id = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["product_variant", "id"],
+                include=["quantity"],
+                name="stockmovement_variant_idx",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.quantity:+d} ({self.product_variant_id})"
+
+
+class StockSnapshot(models.Model):
+    """Stock of a variant as of its last compaction, net of all folded movements."""
+
+    product_variant = models.OneToOneField(
+        ProductVariant,
+        related_name="stock_snapshot",
+        on_delete=models.CASCADE,
+        primary_key=True,
+    )
+    quantity = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.product_variant_id}: {self.quantity}"
+
+
 class ProductImage(models.Model):
     product = models.ForeignKey(
         Product, related_name="images", on_delete=models.CASCADE
     )
-    image = models.ImageField(upload_to="products/", blank=True, null=True)
+    image = models.ImageField(
+        upload_to="products/",
+        storage=get_media_storage,
+        max_length=255,
+        db_index=True,
+        blank=True,
+        null=True,
+    )
     position = models.PositiveIntegerField(default=0)
 
     class Meta:
         ordering = ["position"]
         # unique_together = ('product', 'position')
+        indexes = [models.Index(fields=["product", "position"])]
 
     def __str__(self):
         return f"{self.product.name} - Image {self.position}"
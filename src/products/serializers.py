@@ -1,6 +1,8 @@
+from django.db import transaction
 from django.db.models import Prefetch
 from rest_framework import serializers
 
+from .cache import invalidate_catalog
 from .models import (
     Product,
     ProductImage,
@@ -12,6 +14,19 @@ from .models import (
 )
 
 
+def main_image_url(product, request=None):
+    """
+    Returns the absolute URL of the first image by position.
+    Iterates images.all() so a prefetched gallery is reused instead of re-queried.
+    """
+    image = next(iter(product.images.all()), None)
+    if not image or not image.image:
+        return None
+
+    url = image.image.url
+    return request.build_absolute_uri(url) if request else url
+
+
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
@@ -24,6 +39,84 @@ class ProductImageSerializer(serializers.ModelSerializer):
         fields = ["id", "product", "image", "position"]
 
 
+class ProductGallerySerializer(serializers.Serializer):
+    """
+    Appends uploaded images and/or reorders a product's gallery in one request.
+    Ids listed in `order` come first, remaining images keep their relative order
+    and new uploads are appended at the end.
+    """
+
+    images = serializers.ListField(
+        child=serializers.ImageField(), required=False, allow_empty=True
+    )
+    order = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=True
+    )
+
+    def validate_order(self, value):
+        if len(set(value)) != len(value):
+            raise serializers.ValidationError("Duplicate image ids.")
+        return value
+
+    def validate(self, data):
+        if not data.get("images") and not data.get("order"):
+            raise serializers.ValidationError(
+                "Provide images to upload and/or an order of image ids."
+            )
+
+        product = self.context["product"]
+        order = data.get("order", [])
+        known = set(
+            ProductImage.objects.filter(product=product, id__in=order).values_list(
+                "id", flat=True
+            )
+        )
+        unknown = [image_id for image_id in order if image_id not in known]
+        if unknown:
+            raise serializers.ValidationError(
+                {"order": f"Images {unknown} do not belong to this product."}
+            )
+        return data
+
+    def create(self, validated_data):
+        product = self.context["product"]
+        order = validated_data.get("order", [])
+
+        with transaction.atomic():
+            # Lock the gallery so concurrent reorders are applied one after another
+            gallery = list(
+                ProductImage.objects.select_for_update()
+                .filter(product=product)
+                .order_by("position", "id")
+            )
+            by_id = {image.id: image for image in gallery}
+            ordered_ids = set(order)
+            uploads = [
+                ProductImage(product=product, image=file)
+                for file in validated_data.get("images", [])
+            ]
+            ordered = (
+                [by_id[image_id] for image_id in order if image_id in by_id]
+                + [image for image in gallery if image.id not in ordered_ids]
+                + uploads
+            )
+
+            changed = []
+            for position, image in enumerate(ordered):
+                if image.pk and image.position != position:
+                    changed.append(image)
+                image.position = position
+
+            ProductImage.objects.bulk_update(changed, ["position"])
+            ProductImage.objects.bulk_create(uploads)
+            # Bulk writes send no post_save, so the catalog cache (main image
+            # of cached listings) is invalidated here
+            if changed or uploads:
+                transaction.on_commit(invalidate_catalog)
+
+        return ordered
+
+
 class ProductVariantSerializer(serializers.ModelSerializer):
     attributes = serializers.DictField(
         child=serializers.CharField(), write_only=True, required=False
@@ -90,13 +183,7 @@ class ProductListSerializer(serializers.ModelSerializer):
 
     def get_image(self, obj):
         """Returns the absolute URL of the main product image."""
-        image = obj.images.order_by("position").first()
-        if not image or not image.image:
-            return None
-
-        request = self.context.get("request")
-        url = image.image.url
-        return request.build_absolute_uri(url) if request else url
+        return main_image_url(obj, self.context.get("request"))
 
     def get_tags(self, obj):
         return [tag.name for tag in obj.tags.all()]
@@ -133,13 +220,7 @@ class ProductDetailSerializer(serializers.ModelSerializer):
 
     def get_main_image(self, obj):
         """Returns the absolute URL of the main image."""
-        image = obj.images.order_by("position").first()
-        if not image or not image.image:
-            return None
-
-        request = self.context.get("request")
-        url = image.image.url
-        return request.build_absolute_uri(url) if request else url
+        return main_image_url(obj, self.context.get("request"))
 
     def get_related_products(self, obj):
         """
@@ -147,11 +228,12 @@ class ProductDetailSerializer(serializers.ModelSerializer):
         """
         related_qs = Product.objects.exclude(id=obj.id)
 
-        # Filter by category if exists else by tags
-        if obj.category:
-            related_qs = related_qs.filter(category=obj.category)
-        elif obj.tags.exists():
-            related_qs = related_qs.filter(tags__in=obj.tags.all()).distinct()
+        # Filter by category if exists else by tags (tags are prefetched by the view)
+        tags = list(obj.tags.all())
+        if obj.category_id:
+            related_qs = related_qs.filter(category_id=obj.category_id)
+        elif tags:
+            related_qs = related_qs.filter(tags__in=tags).distinct()
         else:
             return []
 
@@ -173,12 +255,6 @@ class ProductDetailSerializer(serializers.ModelSerializer):
         request = self.context.get("request")
         result = []
         for p in related_qs:
-            image = p.images.order_by("position").first()
-            image_url = None
-            if image and image.image:
-                url = image.image.url
-                image_url = request.build_absolute_uri(url) if request else url
-
             result.append(
                 {
                     "id": p.id,
@@ -186,7 +262,7 @@ class ProductDetailSerializer(serializers.ModelSerializer):
                     "slug": p.slug,
                     "price": str(p.default_price),
                     "currency": p.currency,
-                    "image": image_url,
+                    "image": main_image_url(p, request),
                 }
             )
 
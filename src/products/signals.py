@@ -1,6 +1,17 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
-from .models import Product, ProductVariant
+from .cache import invalidate_catalog
+from .models import (
+    Attribute,
+    AttributeValue,
+    Category,
+    Product,
+    ProductImage,
+    ProductVariant,
+    StockMovement,
+)
+from .stock_ledger import record_movements, with_ledger_stock
+from .variant_matrix import invalidate_variant_matrix
 
 
 @receiver(post_save, sender=Product)
@@ -15,3 +26,68 @@ def create_default_variant(sender, instance, created, **kwargs):
                 "stock": instance.default_stock or 0,
             },
         )
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(m2m_changed, sender=Product.tags.through)
+@receiver(post_save, sender=Attribute)
+@receiver(post_delete, sender=Attribute)
+@receiver(post_save, sender=AttributeValue)
+@receiver(post_delete, sender=AttributeValue)
+def invalidate_catalog_cache(sender, **kwargs):
+    invalidate_catalog()
+
+
+@receiver(post_save, sender=ProductVariant)
+@receiver(post_delete, sender=ProductVariant)
+def invalidate_product_variant_matrix(sender, instance, **kwargs):
+    invalidate_variant_matrix(instance.product_id)
+
+
+@receiver(m2m_changed, sender=ProductVariant.attribute_values.through)
+def invalidate_variant_matrix_on_attributes(sender, instance, action, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if kwargs["reverse"]:
+        product_ids = set(
+            ProductVariant.objects.filter(pk__in=kwargs["pk_set"] or []).values_list(
+                "product_id", flat=True
+            )
+        )
+        invalidate_variant_matrix(*product_ids)
+    else:
+        invalidate_variant_matrix(instance.product_id)
+
+
+@receiver(post_save, sender=ProductVariant)
+def record_stock_edit(
+    sender, instance, created, raw=False, update_fields=None, **kwargs
+):
+    """
+    Stock set through the admin/API lands in the ledger as RESTOCK or
+    ADJUSTMENT. The delta comes from the stock the instance was loaded with;
+    fixture loads (raw) and instances not read from the database are brought
+    in line with the ledger instead, so loaddata data reconciles too; that
+    comparison reads the saved row and its ledger in one statement.
+    """
+    if update_fields is not None and "stock" not in update_fields:
+        return
+    if created and not raw:
+        delta = instance.stock
+    elif not raw and hasattr(instance, "_loaded_stock"):
+        delta = instance.stock - instance._loaded_stock
+    else:
+        stock, ledger = (
+            with_ledger_stock(ProductVariant.objects.filter(pk=instance.pk))
+            .values_list("stock", "ledger")
+            .get()
+        )
+        delta = stock - ledger
+    instance._loaded_stock = instance.stock
+    kind = StockMovement.RESTOCK if delta > 0 else StockMovement.ADJUSTMENT
+    record_movements(kind, {instance.pk: delta})
@@ -0,0 +1,134 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import ProductVariant, StockMovement, StockSnapshot
+
+
+def record_movements(kind, quantities, order_id=None):
+    """Appends one movement per {variant_id: signed quantity}, in one INSERT."""
+    StockMovement.objects.bulk_create(
+        [
+            StockMovement(
+                product_variant_id=variant_id,
+                kind=kind,
+                quantity=quantity,
+                order_id=order_id,
+            )
+            for variant_id, quantity in quantities.items()
+            if quantity
+        ]
+    )
+
+
+def with_ledger_stock(queryset):
+    """
+    Annotates variants with `ledger`: compacted snapshot plus the movements not
+    folded into it yet. Both come from subqueries of the same statement, so the
+    stock column and the ledger are read from one snapshot of the database: a
+    checkout or compaction committing mid-read can't make them disagree.
+    """
+    snapshot = StockSnapshot.objects.filter(product_variant=OuterRef("pk")).values(
+        "quantity"
+    )
+    movements = (
+        StockMovement.objects.filter(product_variant=OuterRef("pk"))
+        .values("product_variant")
+        .annotate(total=Sum("quantity"))
+        .values("total")
+    )
+    return queryset.annotate(
+        ledger=Coalesce(Subquery(snapshot), 0) + Coalesce(Subquery(movements), 0)
+    )
+
+
+def ledger_stock(variant_ids):
+    """
+    Stock derived from the ledger, in one query for any number of variants.
+
+    The ledger is the audit trail that reconciliation checks the stock column
+    against; availability (carts, checkout) still comes from the guarded
+    ProductVariant.stock counter, which is what refuses an oversell.
+    """
+    ledger = dict(
+        with_ledger_stock(ProductVariant.objects.filter(id__in=variant_ids))
+        .values_list("id", "ledger")
+        .order_by()
+    )
+    return {variant_id: ledger.get(variant_id, 0) for variant_id in variant_ids}
+
+
+def compact_batch(cutoff, batch_size):
+    """
+    Folds up to `batch_size` movements older than `cutoff` into the snapshots
+    and deletes them, in one transaction. Only snapshot rows are locked, never
+    the (hot) ProductVariant rows. Returns the number of movements folded.
+    """
+    with transaction.atomic():
+        movements = list(
+            StockMovement.objects.filter(created_at__lt=cutoff)
+            .order_by("id")
+            .values_list("id", "product_variant_id", "quantity")[:batch_size]
+        )
+        if not movements:
+            return 0
+        deltas = Counter()
+        for _, variant_id, quantity in movements:
+            deltas[variant_id] += quantity
+
+        snapshots = StockSnapshot.objects.select_for_update().in_bulk(list(deltas))
+        for variant_id, snapshot in snapshots.items():
+            snapshot.quantity += deltas[variant_id]
+        StockSnapshot.objects.bulk_update(snapshots.values(), ["quantity"])
+        StockSnapshot.objects.bulk_create(
+            [
+                StockSnapshot(product_variant_id=variant_id, quantity=delta)
+                for variant_id, delta in deltas.items()
+                if variant_id not in snapshots
+            ]
+        )
+        StockMovement.objects.filter(id__in=[m[0] for m in movements]).delete()
+    return len(movements)
+
+
+def compact_ledger(older_than_days=30, batch_size=1000):
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    folded = 0
+    while True:
+        moved = compact_batch(cutoff, batch_size)
+        if not moved:
+            return folded
+        folded += moved
+
+
+def reconcile_stock(batch_size=1000, fix=False):
+    """
+    Compares ProductVariant.stock with the ledger, batch by batch (keyset on
+    id), reading both in the same statement. Yields (variant_id, stock, ledger) for every mismatch; with fix=True an
+    ADJUSTMENT movement brings the ledger back in line with the stock column,
+    which is what checkout guards against overselling.
+    """
+    last_id = 0
+    while True:
+        batch = list(
+            with_ledger_stock(ProductVariant.objects.filter(id__gt=last_id))
+            .order_by("id")
+            .values_list("id", "stock", "ledger")[:batch_size]
+        )
+        if not batch:
+            return
+        last_id = batch[-1][0]
+        mismatches = [row for row in batch if row[1] != row[2]]
+        if fix:
+            record_movements(
+                StockMovement.ADJUSTMENT,
+                {
+                    variant_id: stock - ledger
+                    for variant_id, stock, ledger in mismatches
+                },
+            )
+        yield from mismatches
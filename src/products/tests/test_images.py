@@ -92,3 +92,255 @@ class TestProductImages:
         assert "main_image" in data
         # Check if the path contains our base filename
         assert "detail" in data["main_image"]
+
+
+@pytest.mark.django_db
+class TestProductGallery:
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_superuser(
+            email="admin@example.com", password="password"
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.product = Product.objects.create(
+            name="Gallery Product",
+            description="Test",
+            base_sku="TEST-GAL",
+            default_price=10.00,
+        )
+        self.images = [
+            ProductImage.objects.create(product=self.product, position=i)
+            for i in range(3)
+        ]
+        self.url = reverse("product-gallery", kwargs={"slug": self.product.slug})
+
+    def test_reorder_gallery(self):
+        first, second, third = self.images
+        response = self.client.post(
+            self.url, {"order": [third.id, first.id]}, format="json"
+        )
+
+        assert response.status_code == 200
+        assert [image["id"] for image in response.json()] == [
+            third.id,
+            first.id,
+            second.id,
+        ]
+        assert list(
+            self.product.images.order_by("position").values_list("id", flat=True)
+        ) == [third.id, first.id, second.id]
+
+    def test_reorder_invalidates_catalog_cache(
+        self, django_capture_on_commit_callbacks
+    ):
+        from products.cache import catalog_version
+
+        before = catalog_version()
+        with django_capture_on_commit_callbacks(execute=True):
+            self.client.post(self.url, {"order": [self.images[2].id]}, format="json")
+
+        assert catalog_version() > before
+
+    def test_upload_appends_images(self):
+        files = [
+            SimpleUploadedFile(
+                f"bulk{i}.gif",
+                b"\x47\x49\x46\x38\x39\x61\x01\x00\x01\x00\x00\x00\x00"
+                b"\x21\xf9\x04\x01\x0a\x00\x01\x00\x2c\x00\x00\x00\x00"
+                b"\x01\x00\x01\x00\x00\x02\x02\x4c\x01\x00\x3b",
+                content_type="image/gif",
+            )
+            for i in range(2)
+        ]
+        response = self.client.post(
+            self.url,
+            {"images": files, "order": [self.images[2].id]},
+            format="multipart",
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 5
+        assert data[0]["id"] == self.images[2].id
+        assert [image["position"] for image in data] == [0, 1, 2, 3, 4]
+        assert self.product.images.count() == 5
+
+    def test_reorder_rejects_foreign_images(self):
+        other = Product.objects.create(
+            name="Other", description="Test", base_sku="OTHER", default_price=1
+        )
+        foreign = ProductImage.objects.create(product=other, position=0)
+
+        response = self.client.post(self.url, {"order": [foreign.id]}, format="json")
+
+        assert response.status_code == 400
+        assert "order" in response.json()
+
+    def test_gallery_requires_admin(self, api_client):
+        response = api_client.post(self.url, {"order": []}, format="json")
+        assert response.status_code in (401, 403)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestImageDeduplication:
+    def setup_method(self):
+        self.product = Product.objects.create(
+            name="Dedup Product",
+            description="Test",
+            base_sku="TEST-DEDUP",
+            default_price=10.00,
+        )
+        self.other = Product.objects.create(
+            name="Other Product",
+            description="Test",
+            base_sku="TEST-OTHER",
+            default_price=10.00,
+        )
+
+    def _upload(self, product, name, content=b"shared-lifestyle-image"):
+        return ProductImage.objects.create(
+            product=product,
+            image=SimpleUploadedFile(name, content, content_type="image/jpeg"),
+        )
+
+    def test_identical_content_is_stored_once(self):
+        first = self._upload(self.product, "lifestyle.jpg")
+        second = self._upload(self.other, "lifestyle-copy.jpg")
+
+        assert first.image.name == second.image.name
+        assert first.image.name.startswith("blobs/")
+
+    def test_different_content_is_stored_separately(self):
+        first = self._upload(self.product, "a.jpg", b"content-a")
+        second = self._upload(self.product, "b.jpg", b"content-b")
+
+        assert first.image.name != second.image.name
+
+    def test_blob_shared_with_content_blocks(self):
+        from content.models import Content, ContentBlock
+
+        image = self._upload(self.product, "hero.jpg", b"hero-content")
+        block = ContentBlock.objects.create(
+            content=Content.objects.create(identifier="home", title="Home"),
+            identifier="hero",
+            image=SimpleUploadedFile("hero.jpg", b"hero-content"),
+        )
+
+        assert block.image.name == image.image.name
+
+    def test_concurrent_uploads_keep_one_blob(self, tmp_path):
+        from unittest import mock
+
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import FileSystemStorage
+        from utils.storage import DeduplicatedStorage
+
+        backend = FileSystemStorage(location=tmp_path)
+        storage = DeduplicatedStorage(backend)
+        first = storage.save("race.jpg", ContentFile(b"race"))
+
+        # The second upload checked exists() before the first write landed
+        real_exists = backend.exists
+        checks = iter([False])
+        with mock.patch.object(
+            backend, "exists", side_effect=lambda name: next(checks, real_exists(name))
+        ):
+            second = storage.save("race.jpg", ContentFile(b"race"))
+
+        assert second == first
+        assert backend.listdir(first.rsplit("/", 1)[0]) == ([], ["race.jpg"])
+
+    def test_blob_deleted_only_when_unreferenced(self):
+        first = self._upload(self.product, "shared.jpg", b"refcounted")
+        second = self._upload(self.other, "shared.jpg", b"refcounted")
+        file_path = first.image.path
+
+        first.delete()
+        assert os.path.exists(file_path)
+
+        second.delete()
+        assert not os.path.exists(file_path)
+
+
+@pytest.mark.django_db
+class TestProductScopedImages:
+    def setup_method(self):
+        self.client = APIClient()
+        self.product = Product.objects.create(
+            name="Scoped Product",
+            description="Test",
+            base_sku="TEST-SCOPE",
+            default_price=10.00,
+        )
+        self.other = Product.objects.create(
+            name="Other Product",
+            description="Test",
+            base_sku="TEST-OTHER",
+            default_price=10.00,
+        )
+        for i in range(12):
+            ProductImage.objects.create(product=self.product, position=i)
+        ProductImage.objects.create(product=self.other, position=0)
+
+    def test_nested_list_only_returns_product_images(self):
+        url = reverse("product-images-list", kwargs={"product_slug": self.product.slug})
+        response = self.client.get(url, {"page_size": 20})
+
+        assert response.status_code == 200
+        assert response.data["count"] == 12
+        assert {image["product"] for image in response.data["results"]} == {
+            self.product.id
+        }
+        assert [image["position"] for image in response.data["results"]] == list(
+            range(12)
+        )
+
+    def test_nested_list_is_paginated(self):
+        url = reverse("product-images-list", kwargs={"product_slug": self.product.slug})
+        response = self.client.get(url)
+
+        assert len(response.data["results"]) == 10
+        assert response.data["next"] is not None
+
+    def test_nested_detail_and_unknown_product(self):
+        image = self.other.images.first()
+        url = reverse(
+            "product-images-detail",
+            kwargs={"product_slug": self.other.slug, "pk": image.id},
+        )
+        assert self.client.get(url).status_code == 200
+
+        url = reverse(
+            "product-images-detail",
+            kwargs={"product_slug": self.product.slug, "pk": image.id},
+        )
+        assert self.client.get(url).status_code == 404
+
+        url = reverse("product-images-list", kwargs={"product_slug": "missing"})
+        assert self.client.get(url).status_code == 404
+
+    def test_global_list_is_paginated_and_filterable(self):
+        response = self.client.get(reverse("productimage-list"))
+        assert response.data["count"] == 13
+        assert len(response.data["results"]) == 10
+
+        response = self.client.get(
+            reverse("productimage-list"), {"product": self.other.id}
+        )
+        assert response.data["count"] == 1
+
+    def test_nested_routes_have_their_own_operation_ids(self):
+        from drf_spectacular.generators import SchemaGenerator
+
+        paths = SchemaGenerator().get_schema(request=None, public=True)["paths"]
+        operation_ids = [
+            operation["operationId"]
+            for path in paths.values()
+            for operation in path.values()
+        ]
+
+        assert len(operation_ids) == len(set(operation_ids))
+        nested = paths["/api/products/{product_slug}/images/"]["get"]
+        assert nested["operationId"] == "products_product_images_list"
+        assert "product" not in {p["name"] for p in nested.get("parameters", [])}
@@ -0,0 +1,67 @@
+import pytest
+
+from django.urls import reverse
+from products.models import Category, Product
+
+
+@pytest.mark.django_db
+class TestProductOrdering:
+    def setup_method(self):
+        self.category = Category.objects.create(name="Shoes", description="Desc")
+        self.other = Category.objects.create(name="Hats", description="Desc")
+        self.products = {
+            name: Product.objects.create(
+                name=name,
+                base_sku=name.upper(),
+                category=self.category,
+                default_price=price,
+            )
+            for name, price in (("Boot", 50), ("Sandal", 20), ("Clog", 20))
+        }
+        Product.objects.create(
+            name="Beanie", base_sku="BEANIE", category=self.other, default_price=5
+        )
+        self.url = reverse("product-list")
+
+    def names(self, api_client, **params):
+        response = api_client.get(self.url, params)
+        assert response.status_code == 200
+        return [item["name"] for item in response.data["results"]]
+
+    def test_order_by_price_is_stable(self, api_client):
+        # Sandal and Clog share a price: the id tie-breaker keeps creation order
+        assert self.names(
+            api_client, ordering="price", category=self.category.slug
+        ) == [
+            "Sandal",
+            "Clog",
+            "Boot",
+        ]
+        assert self.names(
+            api_client, ordering="-price", category=self.category.slug
+        ) == ["Boot", "Clog", "Sandal"]
+
+    def test_order_by_name_and_newest(self, api_client):
+        assert self.names(api_client, ordering="name")[:2] == ["Beanie", "Boot"]
+        assert self.names(api_client, ordering="-created")[0] == "Beanie"
+
+    def test_order_by_popularity(self, api_client):
+        Product.objects.filter(pk=self.products["Clog"].pk).update(units_sold=7)
+        assert self.names(api_client, ordering="-popularity")[0] == "Clog"
+
+    def test_unknown_ordering_is_rejected(self, api_client):
+        response = api_client.get(self.url, {"ordering": "stock"})
+        assert response.status_code == 400
+
+    def test_pages_do_not_overlap(self, api_client):
+        for i in range(12):
+            Product.objects.create(
+                name=f"Same {i}", base_sku=f"S{i}", category=self.other, default_price=1
+            )
+        seen = []
+        for page in (1, 2, 3, 4):
+            response = api_client.get(
+                self.url, {"ordering": "price", "page": page, "page_size": 5}
+            )
+            seen += [item["id"] for item in response.data["results"]]
+        assert len(seen) == len(set(seen)) == Product.objects.count()
@@ -0,0 +1,84 @@
+import pytest
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from products.models import (
+    Attribute,
+    AttributeValue,
+    Product,
+    ProductImage,
+    ProductVariant,
+    Tag,
+)
+
+# All common fixtures (api_client, category, product)
+# are now available from utils.test_helpers via conftest.py
+
+# product + tags + images + variants + attribute values + related + related images
+DETAIL_QUERY_BUDGET = 7
+# count + products + tags + images
+LIST_QUERY_BUDGET = 4
+
+
+def add_variants(product, count):
+    color = Attribute.objects.create(name="Color")
+    size = Attribute.objects.create(name="Size")
+    for i in range(count):
+        variant = ProductVariant.objects.create(
+            product=product, name=f"V{i}", sku=f"{product.base_sku}-{i}", price=10
+        )
+        variant.attribute_values.add(
+            AttributeValue.objects.create(attribute=color, value=f"Color {i}"),
+            AttributeValue.objects.create(attribute=size, value=f"Size {i}"),
+        )
+
+
+@pytest.fixture
+def catalog(category):
+    tag = Tag.objects.create(name="budget")
+    for i in range(3):
+        p = Product.objects.create(
+            name=f"Related {i}",
+            base_sku=f"REL-{i}",
+            category=category,
+            default_price=10,
+        )
+        p.tags.add(tag)
+        ProductImage.objects.create(
+            product=p,
+            image=SimpleUploadedFile(f"rel{i}.jpg", f"rel{i}".encode()),
+        )
+    return tag
+
+
+@pytest.mark.django_db
+class TestProductQueryBudget:
+    def test_detail_query_count_is_constant(
+        self, api_client, product, catalog, django_assert_max_num_queries
+    ):
+        product.tags.add(catalog)
+        large = Product.objects.create(
+            name="Large", base_sku="LARGE", category=product.category, default_price=10
+        )
+        add_variants(large, 20)
+
+        for p, variant_count in ((product, 1), (large, 21)):
+            url = reverse("product-detail", kwargs={"slug": p.slug})
+            with django_assert_max_num_queries(DETAIL_QUERY_BUDGET):
+                response = api_client.get(url)
+
+            assert response.status_code == 200
+            assert len(response.data["variants"]) == variant_count
+            assert response.data["related_products"]
+
+        displays = [v["attribute_values_display"] for v in response.data["variants"]]
+        assert displays.count({}) == 1
+        assert all(len(d) == 2 for d in displays if d)
+
+    def test_list_query_count_is_constant(
+        self, api_client, catalog, django_assert_max_num_queries
+    ):
+        with django_assert_max_num_queries(LIST_QUERY_BUDGET):
+            response = api_client.get(reverse("product-list"))
+        assert response.status_code == 200
+        assert all(item["image"] for item in response.data["results"])
@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from products.models import ProductVariant, StockMovement, StockSnapshot
+from products.stock_ledger import ledger_stock, reconcile_stock
+
+# All common fixtures (product, variant) are available from
+# utils.test_helpers via conftest.py
+
+
+def movements(variant):
+    return list(
+        StockMovement.objects.filter(product_variant=variant)
+        .order_by("id")
+        .values_list("kind", "quantity")
+    )
+
+
+@pytest.mark.django_db
+class TestStockLedger:
+    def test_stock_edits_are_recorded(self, product):
+        variant = product.variants.get()  # created by signal with default_stock=10
+        variant.stock = 4
+        variant.save()
+        variant.stock = 9
+        variant.save()
+
+        assert movements(variant) == [
+            ("RESTOCK", 10),
+            ("ADJUSTMENT", -6),
+            ("RESTOCK", 5),
+        ]
+        assert ledger_stock([variant.id]) == {variant.id: 9}
+
+    def test_compaction_folds_old_movements(self, variant):
+        StockMovement.objects.filter(product_variant=variant).update(
+            created_at=timezone.now() - timedelta(days=60)
+        )
+        StockMovement.objects.create(
+            product_variant=variant, kind=StockMovement.SALE, quantity=-2
+        )
+        ProductVariant.objects.filter(pk=variant.pk).update(stock=8)
+
+        call_command("compact_stock_ledger", days=30, batch_size=1)
+
+        assert StockSnapshot.objects.get(product_variant=variant).quantity == 10
+        assert movements(variant) == [("SALE", -2)]
+        assert ledger_stock([variant.id]) == {variant.id: 8}
+
+    def test_reconcile_reports_and_fixes_drift(self, variant, capsys):
+        ProductVariant.objects.filter(pk=variant.pk).update(stock=7)
+
+        call_command("reconcile_stock_ledger", batch_size=1)
+        assert "stock=7 ledger=10" in capsys.readouterr().out
+        assert ledger_stock([variant.id]) == {variant.id: 10}
+
+        call_command("reconcile_stock_ledger", fix=True)
+        assert movements(variant)[-1] == ("ADJUSTMENT", -3)
+        call_command("reconcile_stock_ledger")
+        assert "0 mismatches found" in capsys.readouterr().out
+
+    def test_reconcile_reads_stock_and_ledger_together(
+        self, product, django_assert_num_queries
+    ):
+        variants = list(product.variants.all())
+        ProductVariant.objects.update(stock=3)
+
+        # One statement per batch (stock + snapshot + movements) and the empty
+        # batch that ends the scan: no window between the stock and ledger reads
+        with django_assert_num_queries(2):
+            mismatches = list(reconcile_stock(batch_size=len(variants)))
+
+        assert mismatches == [(v.id, 3, 10) for v in variants]
+
+    def test_stock_edit_does_not_reread_the_variant(
+        self, variant, django_assert_num_queries
+    ):
+        variant = ProductVariant.objects.get(pk=variant.pk)
+        variant.stock = 12
+        with django_assert_num_queries(2):  # UPDATE variant + INSERT movement
+            variant.save()
+        assert movements(variant)[-1] == ("RESTOCK", 2)
+
+    def test_fixture_loads_reconcile(self, capsys):
+        call_command(
+            "loaddata",
+            "categories",
+            "tags",
+            "attributes",
+            "products",
+            "variants",
+            verbosity=0,
+        )
+
+        call_command("reconcile_stock_ledger")
+        assert "0 mismatches found" in capsys.readouterr().out
+
+    def test_ledger_admin_is_read_only(self, admin_user, rf):
+        from django.contrib.admin.sites import site
+
+        request = rf.get("/")
+        request.user = admin_user
+        for model in (StockMovement, StockSnapshot):
+            model_admin = site._registry[model]
+            assert not model_admin.has_add_permission(request)
+            assert not model_admin.has_change_permission(request)
+            assert not model_admin.has_delete_permission(request)
@@ -0,0 +1,79 @@
+import pytest
+
+from django.urls import reverse
+from products.models import Category, Product
+
+
+@pytest.fixture
+def categories(db):
+    result = []
+    for c in range(3):
+        category = Category.objects.create(name=f"Cat {c}", description="D")
+        for i in range(6):
+            Product.objects.create(
+                name=f"Product {c}-{i}",
+                base_sku=f"SKU-{c}-{i}",
+                category=category,
+                default_price=10 * (i + 1),
+            )
+        result.append(category)
+    return result
+
+
+@pytest.mark.django_db
+class TestTopByCategory:
+    url = reverse("product-top-by-category")
+
+    def test_returns_top_n_per_category(self, api_client, categories):
+        response = api_client.get(self.url)
+
+        assert response.status_code == 200
+        assert [group["category"]["slug"] for group in response.data] == [
+            c.slug for c in categories
+        ]
+        assert all(len(group["products"]) == 4 for group in response.data)
+
+    def test_limit_and_ordering(self, api_client, categories):
+        response = api_client.get(self.url, {"limit": 2, "ordering": "-price"})
+
+        prices = [
+            [p["default_price"] for p in group["products"]] for group in response.data
+        ]
+        assert prices == [["60.00", "50.00"]] * 3
+
+    def test_rejects_unknown_ordering(self, api_client, categories):
+        response = api_client.get(self.url, {"ordering": "stock"})
+        assert response.status_code == 400
+
+    def test_result_is_cached_until_catalog_changes(
+        self, api_client, categories, django_assert_num_queries
+    ):
+        params = {"limit": 1, "ordering": "price"}
+        api_client.get(self.url, params)
+        with django_assert_num_queries(0):
+            response = api_client.get(self.url, params)
+        assert response.data[0]["products"][0]["name"] == "Product 0-0"
+
+        Product.objects.create(
+            name="Cheapest",
+            base_sku="CHEAP",
+            category=categories[0],
+            default_price=1,
+        )
+        response = api_client.get(self.url, params)
+        assert response.data[0]["products"][0]["name"] == "Cheapest"
+
+    def test_image_urls_follow_the_request_host(self, api_client, categories, settings):
+        from products.models import ProductImage
+
+        settings.ALLOWED_HOSTS = ["*"]
+        product = categories[0].products.order_by("default_price").first()
+        ProductImage.objects.create(product=product, image="products/a.jpg")
+        params = {"limit": 1, "ordering": "price"}
+
+        api_client.get(self.url, params, HTTP_HOST="shop.example.com")
+        response = api_client.get(self.url, params, HTTP_HOST="admin.example.com")
+
+        image = response.data[0]["products"][0]["image"]
+        assert image.startswith("http://admin.example.com/")
+        assert image.endswith("a.jpg")
@@ -0,0 +1,87 @@
+import pytest
+
+from django.urls import reverse
+from products.models import Attribute, AttributeValue, ProductVariant
+
+# All common fixtures (api_client, product)
+# are now available from utils.test_helpers via conftest.py
+
+
+@pytest.fixture
+def variants(product):
+    color = Attribute.objects.create(name="Color")
+    size = Attribute.objects.create(name="Size")
+    red = AttributeValue.objects.create(attribute=color, value="Red")
+    blue = AttributeValue.objects.create(attribute=color, value="Blue")
+    small = AttributeValue.objects.create(attribute=size, value="S")
+
+    result = []
+    for sku, values, stock in (("RS", [red, small], 3), ("BS", [blue, small], 0)):
+        variant = ProductVariant.objects.create(
+            product=product, name=sku, sku=sku, price=20, stock=stock
+        )
+        variant.attribute_values.set(values)
+        result.append(variant)
+    return result
+
+
+@pytest.mark.django_db
+class TestVariantMatrix:
+    def test_matrix_lists_axes_and_combinations(self, api_client, product, variants):
+        url = reverse("product-variant-matrix", kwargs={"slug": product.slug})
+        response = api_client.get(url)
+
+        assert response.status_code == 200
+        assert response.data["axes"] == {"Color": ["Red", "Blue"], "Size": ["S"]}
+        assert len(response.data["variants"]) == 3  # Default + 2
+        assert "Color=Blue|Size=S" in response.data["combinations"]
+        by_sku = {v["sku"]: v for v in response.data["variants"]}
+        assert by_sku["BS"]["in_stock"] is False
+
+    def test_resolve_variant(self, api_client, product, variants):
+        url = reverse("product-resolve-variant", kwargs={"slug": product.slug})
+
+        response = api_client.get(url, {"Size": "S", "Color": "Red"})
+        assert response.status_code == 200
+        assert response.data["id"] == variants[0].id
+
+        response = api_client.get(url, {"Size": "XL", "Color": "Red"})
+        assert response.status_code == 404
+
+    def test_matrix_is_cached_and_stock_is_live(
+        self, api_client, product, variants, django_assert_num_queries
+    ):
+        url = reverse("product-variant-matrix", kwargs={"slug": product.slug})
+        api_client.get(url)
+        with django_assert_num_queries(2):  # product lookup + available stock
+            api_client.get(url)
+
+        ProductVariant.objects.filter(pk=variants[1].pk).update(stock=5)
+
+        response = api_client.get(url)
+        by_sku = {v["sku"]: v for v in response.data["variants"]}
+        assert by_sku["BS"]["available_stock"] == 5
+
+    def test_cart_holds_are_not_available(self, api_client, product, variants, user):
+        from orders.models import Cart, CartProduct
+        from orders.reservations import reservation_expiry
+
+        CartProduct.objects.create(
+            cart=Cart.objects.create(user=user),
+            product_variant=variants[0],
+            quantity=3,
+            reserved_until=reservation_expiry(),
+        )
+
+        url = reverse("product-variant-matrix", kwargs={"slug": product.slug})
+        by_sku = {v["sku"]: v for v in api_client.get(url).data["variants"]}
+        assert (by_sku["RS"]["available_stock"], by_sku["RS"]["in_stock"]) == (0, False)
+
+    def test_matrix_rebuilt_when_attributes_change(self, api_client, product, variants):
+        url = reverse("product-variant-matrix", kwargs={"slug": product.slug})
+        api_client.get(url)
+
+        variants[1].attribute_values.clear()
+
+        response = api_client.get(url)
+        assert "Color=Blue|Size=S" not in response.data["combinations"]
@@ -1,9 +1,29 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
-from .views import ProductViewSet, ProductImageViewSet, CategoryViewSet
+from .views import (
+    CategoryViewSet,
+    ProductGalleryViewSet,
+    ProductImageViewSet,
+    ProductViewSet,
+)
 
 router = DefaultRouter()
 router.register(r"categories", CategoryViewSet, basename="category")
 router.register(r"images", ProductImageViewSet, basename="productimage")
 router.register(r"", ProductViewSet, basename="product")
 
-urlpatterns = router.urls
+# Read-only gallery of a single product: /api/products/<slug>/images/
+product_images = [
+    path(
+        "<slug:product_slug>/images/",
+        ProductGalleryViewSet.as_view({"get": "list"}),
+        name="product-images-list",
+    ),
+    path(
+        "<slug:product_slug>/images/<int:pk>/",
+        ProductGalleryViewSet.as_view({"get": "retrieve"}),
+        name="product-images-detail",
+    ),
+]
+
+urlpatterns = product_images + router.urls
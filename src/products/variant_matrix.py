@@ -0,0 +1,101 @@
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+from .cache import catalog_cache_key, get_or_set_catalog
+from .models import AttributeValue, ProductVariant
+
+
+def variant_matrix_key(product_id):
+    return catalog_cache_key("variant-matrix", product_id)
+
+
+def combination_key(attributes):
+    """Canonical lookup key for an attribute combination, e.g. "Color=Red|Size=M"."""
+    return "|".join(f"{name}={value}" for name, value in sorted(attributes.items()))
+
+
+def build_variant_matrix(product_id):
+    """
+    Precomputes the option matrix of a product:
+    - axes: attribute name -> values, in order of first appearance
+    - variants: id, sku, price and attributes of every variant
+    - combinations: combination_key -> index in variants, for O(1) resolution
+    Stock is not part of it: cart holds change it far more often than the
+    matrix is rebuilt, see with_live_stock().
+    """
+    variants = (
+        ProductVariant.objects.filter(product_id=product_id)
+        .prefetch_related(
+            Prefetch(
+                "attribute_values",
+                queryset=AttributeValue.objects.select_related("attribute"),
+            )
+        )
+        .order_by("id")
+    )
+
+    axes = {}
+    rows = []
+    combinations = {}
+    for variant in variants:
+        attributes = {
+            av.attribute.name: av.value for av in variant.attribute_values.all()
+        }
+        for name, value in attributes.items():
+            values = axes.setdefault(name, [])
+            if value not in values:
+                values.append(value)
+
+        combinations[combination_key(attributes)] = len(rows)
+        rows.append(
+            {
+                "id": variant.id,
+                "name": variant.name,
+                "sku": variant.sku,
+                "price": str(variant.price),
+                "attributes": attributes,
+            }
+        )
+
+    return {
+        "axes": dict(sorted(axes.items())),
+        "variants": rows,
+        "combinations": combinations,
+    }
+
+
+def get_variant_matrix(product_id):
+    return get_or_set_catalog(
+        variant_matrix_key(product_id), lambda: build_variant_matrix(product_id)
+    )
+
+
+def with_live_stock(matrix, product_id):
+    """
+    Copy of a (cached) matrix whose variants carry available_stock (stock
+    minus active cart holds) and in_stock, read with one query per request.
+    """
+    from orders.reservations import with_available_stock
+
+    available = dict(
+        with_available_stock(
+            ProductVariant.objects.filter(product_id=product_id)
+        ).values_list("id", "available_stock")
+    )
+    variants = []
+    for row in matrix["variants"]:
+        stock = max(available.get(row["id"], 0), 0)
+        variants.append({**row, "available_stock": stock, "in_stock": stock > 0})
+    return {**matrix, "variants": variants}
+
+
+def resolve_variant(matrix, attributes):
+    """Returns the variant row matching the chosen attributes, or None."""
+    chosen = {name: attributes[name] for name in matrix["axes"] if name in attributes}
+    index = matrix["combinations"].get(combination_key(chosen))
+    return None if index is None else matrix["variants"][index]
+
+
+def invalidate_variant_matrix(*product_ids):
+    """Drops cached matrices, e.g. after variants or attributes changed."""
+    cache.delete_many([variant_matrix_key(product_id) for product_id in product_ids])
@@ -1,15 +1,30 @@
-from rest_framework import viewsets, filters
+from rest_framework import viewsets, filters, status
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAdminUser, AllowAny
+from rest_framework.response import Response
+from django.db.models import F, Prefetch, Window
+from django.db.models.functions import RowNumber
+from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Product, ProductVariant, ProductImage, Category
+from drf_spectacular.utils import extend_schema, extend_schema_view
+from .models import AttributeValue, Product, ProductVariant, ProductImage, Category
 from .serializers import (
     ProductListSerializer,
     ProductDetailSerializer,
     ProductImageSerializer,
+    ProductGallerySerializer,
     CategorySerializer,
 )
-from .filters import ProductFilter
+from .cache import catalog_cache_key, get_or_set_catalog
+from .filters import ProductFilter, resolve_ordering
 from .pagination import StandardResultsSetPagination
+from .variant_matrix import get_variant_matrix, resolve_variant, with_live_stock
+
+
+def with_absolute_image(product_data, request):
+    """Serialized product with its (relative) image URL made absolute for `request`."""
+    image = product_data["image"]
+    return {**product_data, "image": image and request.build_absolute_uri(image)}
 
 
 class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
@@ -28,13 +43,31 @@ class ProductViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         base_qs = Product.objects.select_related("category")
+        if self.action in ["gallery", "variant_matrix", "resolve_variant"]:
+            return base_qs
         if self.action == "list":
             return base_qs.prefetch_related("tags", "images")
-        return base_qs.prefetch_related("tags", "images", "variants")
+        # Single prefetch plan: variants -> attribute_values -> attribute, so the
+        # number of queries does not grow with the number of variants.
+        variants_qs = ProductVariant.objects.prefetch_related(
+            Prefetch(
+                "attribute_values",
+                queryset=AttributeValue.objects.select_related("attribute"),
+            )
+        )
+        return base_qs.prefetch_related(
+            "tags", "images", Prefetch("variants", queryset=variants_qs)
+        )
 
     def get_permissions(self):
         """Public read, admin-only write."""
-        if self.action in ["list", "retrieve"]:
+        if self.action in [
+            "list",
+            "retrieve",
+            "top_by_category",
+            "variant_matrix",
+            "resolve_variant",
+        ]:
             return [AllowAny()]
         return [IsAdminUser()]
 
@@ -54,13 +87,149 @@ class ProductViewSet(viewsets.ModelViewSet):
                 stock=product.default_stock or 0,
             )
 
+    @action(detail=True, methods=["post"])
+    def gallery(self, request, slug=None):
+        """
+        Uploads several images and/or reorders the gallery in a single request.
+        Expects: images (files) and/or order (list of image ids, first is the main image)
+        """
+        product = self.get_object()
+        serializer = ProductGallerySerializer(
+            data=request.data, context={"product": product}
+        )
+        serializer.is_valid(raise_exception=True)
+        images = serializer.save()
+        return Response(
+            ProductImageSerializer(images, many=True, context={"request": request}).data
+        )
+
+    @action(detail=True, methods=["get"], url_path="variant-matrix")
+    def variant_matrix(self, request, slug=None):
+        """
+        Returns the cached option matrix (axes, variants, combinations), with
+        each variant's available stock (net of cart holds) read live.
+        """
+        product = self.get_object()
+        return Response(with_live_stock(get_variant_matrix(product.id), product.id))
+
+    @action(detail=True, methods=["get"], url_path="resolve-variant")
+    def resolve_variant(self, request, slug=None):
+        """
+        Maps an attribute combination to its variant.
+        Example: /api/products/<slug>/resolve-variant/?Color=Red&Size=M
+        """
+        product = self.get_object()
+        matrix = with_live_stock(get_variant_matrix(product.id), product.id)
+        variant = resolve_variant(matrix, request.query_params.dict())
+        if variant is None:
+            return Response(
+                {"error": "No variant matches the selected attributes"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(variant)
+
+    @action(detail=False, methods=["get"], url_path="top-by-category")
+    def top_by_category(self, request):
+        """
+        Returns the top N products of every category, ranked with a window function.
+        Query params: limit (default 4, max 20) and ordering (id, price, name; "-" for desc).
+        """
+        try:
+            limit = min(max(int(request.query_params.get("limit", 4)), 1), 20)
+        except ValueError:
+            return Response(
+                {"error": "limit must be an integer"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        ordering = resolve_ordering(request.query_params.get("ordering"))
+        if ordering is None:
+            return Response(
+                {"error": "Unsupported ordering"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        key = catalog_cache_key("top-by-category", limit, ",".join(ordering))
+        # The cached payload holds relative image URLs; they are made absolute
+        # for the host of each request, never for whichever host filled it
+        groups = get_or_set_catalog(key, lambda: self._top_by_category(limit, ordering))
+        return Response(
+            [
+                {
+                    **group,
+                    "products": [
+                        with_absolute_image(p, request) for p in group["products"]
+                    ],
+                }
+                for group in groups
+            ]
+        )
+
+    def _top_by_category(self, limit, ordering):
+        ranked = (
+            Product.objects.filter(category__isnull=False)
+            .annotate(
+                rank=Window(
+                    RowNumber(),
+                    partition_by=[F("category_id")],
+                    order_by=[
+                        F(f.lstrip("-")).desc() if f.startswith("-") else F(f).asc()
+                        for f in ordering
+                    ],
+                )
+            )
+            .filter(rank__lte=limit)
+            .select_related("category")
+            .prefetch_related("tags", "images")
+            .order_by("category_id", "rank")
+        )
+
+        groups = {}
+        for product in ranked:
+            group = groups.setdefault(
+                product.category_id,
+                {
+                    "category": CategorySerializer(product.category).data,
+                    "products": [],
+                },
+            )
+            group["products"].append(ProductListSerializer(product).data)
+        return list(groups.values())
+
 
 class ProductImageViewSet(viewsets.ModelViewSet):
-    queryset = ProductImage.objects.select_related("product").order_by("position")
+    """
+    Global image API (paginated, filterable by ?product=<id>).
+    Also mounted read-only at /api/products/<product_slug>/images/ for a single
+    gallery, see ProductGalleryViewSet.
+    """
+
     serializer_class = ProductImageSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ["product"]
+    pagination_class = StandardResultsSetPagination
+
+    def get_queryset(self):
+        qs = ProductImage.objects.order_by("position", "id")
+        product_slug = self.kwargs.get("product_slug")
+        if product_slug is not None:
+            product = get_object_or_404(Product.objects.only("id"), slug=product_slug)
+            return qs.filter(product=product)
+        return qs
 
     def get_permissions(self):
         """Public read, admin-only write."""
         if self.action in ["list", "retrieve"]:
             return [AllowAny()]
         return [IsAdminUser()]
+
+
+@extend_schema_view(
+    list=extend_schema(operation_id="products_product_images_list"),
+    retrieve=extend_schema(operation_id="products_product_images_retrieve"),
+)
+class ProductGalleryViewSet(ProductImageViewSet):
+    """
+    The images of one product (/api/products/<product_slug>/images/), with its
+    own schema operation ids so it does not collide with the global image API.
+    """
+
+    filterset_fields = []
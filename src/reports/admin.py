@@ -0,0 +1,28 @@
+from django.contrib import admin
+from .models import DailyCategorySales, DailyProductSales, DailyVariantSales
+
+
+class SalesRollupAdmin(admin.ModelAdmin):
+    list_filter = ["day"]
+    date_hierarchy = "day"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailyVariantSales)
+class DailyVariantSalesAdmin(SalesRollupAdmin):
+    list_display = ["day", "product_variant", "units", "revenue"]
+
+
+@admin.register(DailyProductSales)
+class DailyProductSalesAdmin(SalesRollupAdmin):
+    list_display = ["day", "product", "units", "revenue"]
+
+
+@admin.register(DailyCategorySales)
+class DailyCategorySalesAdmin(SalesRollupAdmin):
+    list_display = ["day", "category", "units", "revenue"]
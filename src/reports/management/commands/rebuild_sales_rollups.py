@@ -0,0 +1,23 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from reports.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recomputes the daily sales rollups for a date range from the orders."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", type=date.fromisoformat, required=True)
+        parser.add_argument("--end", type=date.fromisoformat)
+
+    def handle(self, *args, **options):
+        start = options["start"]
+        end = options["end"] or timezone.localdate()
+        if end < start:
+            raise CommandError("--end must not be before --start")
+
+        written = rebuild_rollups(start, end)
+        self.stdout.write(f"Rebuilt {written} rollup rows for {start}..{end}")
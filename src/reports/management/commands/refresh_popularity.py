@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from reports.rollups import refresh_units_sold
+
+
+class Command(BaseCommand):
+    help = "Refreshes the products' units sold (popularity) from the sales rollups."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        updated = refresh_units_sold(batch_size=options["batch_size"])
+        self.stdout.write(f"Updated units sold for {updated} products")
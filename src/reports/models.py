@@ -0,0 +1,60 @@
+from django.db import models
+from products.models import Category, Product, ProductVariant
+
+
+class SalesRollup(models.Model):
+    """
+    Units and revenue sold per day and catalog entity, net of cancellations.
+    Maintained incrementally from order signals; rebuildable from the orders.
+    """
+
+    day = models.DateField()
+    units = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        abstract = True
+
+
+class DailyVariantSales(SalesRollup):
+    product_variant = models.ForeignKey(
+        ProductVariant, related_name="+", on_delete=models.CASCADE
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "product_variant"], name="unique_daily_variant_sales"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.day} variant {self.product_variant_id}: {self.units}"
+
+
+class DailyProductSales(SalesRollup):
+    product = models.ForeignKey(Product, related_name="+", on_delete=models.CASCADE)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "product"], name="unique_daily_product_sales"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.day} product {self.product_id}: {self.units}"
+
+
+class DailyCategorySales(SalesRollup):
+    category = models.ForeignKey(Category, related_name="+", on_delete=models.CASCADE)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "category"], name="unique_daily_category_sales"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.day} category {self.category_id}: {self.units}"
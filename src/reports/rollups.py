@@ -0,0 +1,144 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import DecimalField, F, Sum
+from django.db.models.functions import TruncDate
+
+from orders.models import ArchivedOrderProduct, OrderProduct
+from products.models import Product
+from .models import DailyCategorySales, DailyProductSales, DailyVariantSales
+
+# (rollup model, its key column, path from OrderProduct to that key)
+ROLLUPS = (
+    (DailyVariantSales, "product_variant_id", "product_variant_id"),
+    (DailyProductSales, "product_id", "product_variant__product_id"),
+    (DailyCategorySales, "category_id", "product_variant__product__category_id"),
+)
+
+UPSERT_SQL = """
+INSERT INTO {table} (day, {key}, units, revenue) VALUES {values}
+ON CONFLICT (day, {key}) DO UPDATE
+SET units = {table}.units + EXCLUDED.units,
+    revenue = {table}.revenue + EXCLUDED.revenue
+"""
+
+
+def aggregate_lines(lines, path):
+    """Groups order lines by (order day, key): one aggregate query."""
+    return (
+        lines.filter(**{f"{path}__isnull": False})
+        .annotate(day=TruncDate("order__created_at"))
+        .values_list("day", path)
+        .annotate(
+            units=Sum("quantity"),
+            revenue=Sum(
+                F("quantity") * F("price_at_purchase"),
+                output_field=DecimalField(max_digits=14, decimal_places=2),
+            ),
+        )
+        .order_by()
+    )
+
+
+def add_to_rollup(model, key, rows, sign=1):
+    """
+    Adds (day, key_id, units, revenue) deltas with one INSERT ... ON CONFLICT.
+    Rows are written in (day, key_id) order so concurrent upserts touching the
+    same rollup rows lock them in the same order and cannot deadlock.
+    """
+    if not rows:
+        return
+    params = []
+    for day, key_id, units, revenue in sorted(rows, key=lambda row: row[:2]):
+        params += [
+            connection.ops.adapt_datefield_value(day),
+            key_id,
+            sign * units,
+            sign * revenue,
+        ]
+    sql = UPSERT_SQL.format(
+        table=model._meta.db_table,
+        key=key,
+        values=", ".join(["(%s, %s, %s, %s)"] * len(rows)),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def apply_orders(order_ids, sign=1):
+    """
+    Adds (sign=1) or removes (sign=-1) the orders' lines from every rollup,
+    on the day each order was placed.
+    """
+    lines = OrderProduct.objects.filter(order_id__in=order_ids)
+    with transaction.atomic():
+        for model, key, path in ROLLUPS:
+            add_to_rollup(model, key, list(aggregate_lines(lines, path)), sign)
+
+
+def rebuild_rollups(start, end):
+    """
+    Recomputes the rollups for days in [start, end] from the hot and archived
+    order lines, ignoring cancelled orders. Returns the number of rows written.
+    """
+    sources = [
+        lines.filter(
+            order__created_at__date__gte=start, order__created_at__date__lte=end
+        ).exclude(order__status="CANCELLED")
+        for lines in (OrderProduct.objects.all(), ArchivedOrderProduct.objects.all())
+    ]
+    written = 0
+    with transaction.atomic():
+        for model, key, path in ROLLUPS:
+            totals = defaultdict(lambda: [0, Decimal("0.00")])
+            for lines in sources:
+                for day, key_id, units, revenue in aggregate_lines(lines, path):
+                    totals[day, key_id][0] += units
+                    totals[day, key_id][1] += revenue
+
+            model.objects.filter(day__gte=start, day__lte=end).delete()
+            rows = model.objects.bulk_create(
+                [
+                    model(day=day, units=units, revenue=revenue, **{key: key_id})
+                    for (day, key_id), (units, revenue) in totals.items()
+                ],
+                batch_size=1000,
+            )
+            written += len(rows)
+    return written
+
+
+def refresh_units_sold(batch_size=1000):
+    """
+    Sets Product.units_sold (the `popularity` ordering) to the units in the
+    product sales rollups, which already net out cancelled orders. Runs
+    periodically instead of in checkout, so checkouts of different variants
+    of a product never queue on the product row. Products are walked in id
+    batches and only rows whose value changed are written. Returns that count.
+    """
+    last_id = updated = 0
+    while True:
+        products = list(
+            Product.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .only("id", "units_sold")[:batch_size]
+        )
+        if not products:
+            return updated
+        last_id = products[-1].id
+        totals = dict(
+            DailyProductSales.objects.filter(product__in=products)
+            .values_list("product_id")
+            .annotate(units=Sum("units"))
+            .order_by()
+        )
+        changed = []
+        for product in products:
+            units = max(totals.get(product.id, 0), 0)
+            if product.units_sold != units:
+                product.units_sold = units
+                changed.append(product)
+        with transaction.atomic():
+            Product.objects.bulk_update(changed, ["units_sold"])
+        updated += len(changed)
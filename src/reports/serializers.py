@@ -0,0 +1,39 @@
+from rest_framework import serializers
+from .models import DailyCategorySales, DailyProductSales, DailyVariantSales
+
+
+class SalesReportQuerySerializer(serializers.Serializer):
+    level = serializers.ChoiceField(
+        choices=["variant", "product", "category"], default="product"
+    )
+    start = serializers.DateField()
+    end = serializers.DateField()
+
+    def validate(self, data):
+        if data["end"] < data["start"]:
+            raise serializers.ValidationError("end must not be before start.")
+        return data
+
+
+class SalesRollupSerializer(serializers.ModelSerializer):
+    revenue = serializers.DecimalField(
+        max_digits=14, decimal_places=2, coerce_to_string=False
+    )
+
+
+class DailyVariantSalesSerializer(SalesRollupSerializer):
+    class Meta:
+        model = DailyVariantSales
+        fields = ["day", "product_variant", "units", "revenue"]
+
+
+class DailyProductSalesSerializer(SalesRollupSerializer):
+    class Meta:
+        model = DailyProductSales
+        fields = ["day", "product", "units", "revenue"]
+
+
+class DailyCategorySalesSerializer(SalesRollupSerializer):
+    class Meta:
+        model = DailyCategorySales
+        fields = ["day", "category", "units", "revenue"]
@@ -0,0 +1,20 @@
+from django.db import transaction
+from django.dispatch import receiver
+from orders.signals import order_placed, orders_cancelled
+from .rollups import apply_orders
+
+
+# Rollups are updated after the order transaction commits, keeping checkout
+# and cancellations short. The callbacks are robust: a failure is logged
+# instead of turning an already committed checkout into a 500, and
+# rebuild_sales_rollups repairs any missed update.
+@receiver(order_placed)
+def add_order_to_rollups(sender, order, **kwargs):
+    order_id = order.id
+    transaction.on_commit(lambda: apply_orders([order_id]), robust=True)
+
+
+@receiver(orders_cancelled)
+def remove_orders_from_rollups(sender, order_ids, **kwargs):
+    order_ids = list(order_ids)
+    transaction.on_commit(lambda: apply_orders(order_ids, sign=-1), robust=True)
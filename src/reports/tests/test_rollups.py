@@ -0,0 +1,178 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from orders.archive import archive_orders
+from orders.checkout import place_order
+from orders.models import Cart, CartProduct, Order
+from reports.models import DailyCategorySales, DailyProductSales, DailyVariantSales
+
+# All common fixtures (admin_client, authenticated_client, user, variant)
+# are available from utils.test_helpers via conftest.py
+
+
+def rollup_rows(model, key):
+    return list(model.objects.values_list("day", key, "units", "revenue"))
+
+
+@pytest.fixture
+def placed_order(user, variant, django_capture_on_commit_callbacks):
+    cart = Cart.objects.create(user=user)
+    CartProduct.objects.create(cart=cart, product_variant=variant, quantity=3)
+    with django_capture_on_commit_callbacks(execute=True):
+        return place_order(user, "Addr", "Addr")
+
+
+@pytest.mark.django_db
+class TestIncrementalRollups:
+    def test_checkout_adds_to_every_rollup(self, placed_order, variant):
+        today = timezone.localdate()
+        product = variant.product
+
+        assert rollup_rows(DailyVariantSales, "product_variant_id") == [
+            (today, variant.id, 3, Decimal("300.00"))
+        ]
+        assert rollup_rows(DailyProductSales, "product_id") == [
+            (today, product.id, 3, Decimal("300.00"))
+        ]
+        assert rollup_rows(DailyCategorySales, "category_id") == [
+            (today, product.category_id, 3, Decimal("300.00"))
+        ]
+
+    def test_second_order_increments_existing_rows(
+        self, placed_order, user, variant, django_capture_on_commit_callbacks
+    ):
+        CartProduct.objects.create(
+            cart=Cart.objects.get(user=user), product_variant=variant, quantity=2
+        )
+        with django_capture_on_commit_callbacks(execute=True):
+            place_order(user, "Addr", "Addr")
+
+        row = DailyProductSales.objects.get()
+        assert (row.units, row.revenue) == (5, Decimal("500.00"))
+
+    def test_cancellation_subtracts(
+        self, placed_order, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            Order.objects.filter(pk=placed_order.pk).transition_to("CANCELLED")
+
+        row = DailyVariantSales.objects.get()
+        assert (row.units, row.revenue) == (0, Decimal("0.00"))
+
+    def test_rollup_failure_does_not_fail_checkout(
+        self, authenticated_client, user, variant, django_capture_on_commit_callbacks
+    ):
+        CartProduct.objects.create(
+            cart=Cart.objects.create(user=user), product_variant=variant, quantity=1
+        )
+        with mock.patch("reports.signals.apply_orders", side_effect=RuntimeError):
+            with django_capture_on_commit_callbacks(execute=True):
+                response = authenticated_client.post(
+                    reverse("orders-checkout"), {"shipping_address": "Addr"}
+                )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Order.objects.count() == 1
+        assert not DailyVariantSales.objects.exists()
+
+
+@pytest.mark.django_db
+class TestRebuildRollups:
+    def test_rebuild_matches_incremental_state(self, placed_order):
+        expected = rollup_rows(DailyCategorySales, "category_id")
+        DailyCategorySales.objects.update(units=99)
+        DailyProductSales.objects.all().delete()
+
+        today = timezone.localdate().isoformat()
+        call_command("rebuild_sales_rollups", "--start", today, "--end", today)
+
+        assert rollup_rows(DailyCategorySales, "category_id") == expected
+        assert DailyProductSales.objects.get().units == 3
+
+    def test_rebuild_includes_archived_orders(self, placed_order):
+        Order.objects.filter(pk=placed_order.pk).update(status="DELIVERED")
+        archive_orders(timezone.now() + timedelta(days=1))
+        DailyVariantSales.objects.all().delete()
+
+        today = timezone.localdate().isoformat()
+        call_command("rebuild_sales_rollups", "--start", today)
+
+        assert DailyVariantSales.objects.get().units == 3
+
+    def test_rebuild_skips_cancelled_orders(self, placed_order):
+        Order.objects.filter(pk=placed_order.pk).update(status="CANCELLED")
+        today = timezone.localdate().isoformat()
+        call_command("rebuild_sales_rollups", "--start", today)
+
+        assert not DailyVariantSales.objects.exists()
+
+
+@pytest.mark.django_db
+class TestPopularityRefresh:
+    def test_checkout_does_not_touch_the_product_row(
+        self, placed_order, variant, django_capture_on_commit_callbacks
+    ):
+        variant.product.refresh_from_db()
+        assert variant.product.units_sold == 0
+
+        call_command("refresh_popularity", "--batch-size", "1")
+        variant.product.refresh_from_db()
+        assert variant.product.units_sold == 3
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Order.objects.filter(pk=placed_order.pk).transition_to("CANCELLED")
+        call_command("refresh_popularity")
+        variant.product.refresh_from_db()
+        assert variant.product.units_sold == 0
+
+
+@pytest.mark.django_db
+class TestSalesReportApi:
+    url = reverse("sales-report-list")
+
+    def test_requires_admin(self, authenticated_client):
+        response = authenticated_client.get(self.url)
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_reads_rollups_by_level(
+        self, admin_client, placed_order, variant, django_assert_num_queries
+    ):
+        today = timezone.localdate().isoformat()
+        with django_assert_num_queries(2):  # count + page
+            response = admin_client.get(
+                self.url, {"level": "category", "start": today, "end": today}
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["results"] == [
+            {
+                "day": today,
+                "category": variant.product.category_id,
+                "units": 3,
+                "revenue": Decimal("300.00"),
+            }
+        ]
+
+    def test_validates_range(self, admin_client):
+        response = admin_client.get(
+            self.url, {"start": "2026-02-01", "end": "2026-01-01"}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_missing_range_is_rejected(self, admin_client):
+        response = admin_client.get(self.url)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert set(response.data) == {"start", "end"}
+
+    def test_is_in_the_api_schema(self):
+        from drf_spectacular.generators import SchemaGenerator
+
+        paths = SchemaGenerator().get_schema(request=None, public=True)["paths"]
+        params = paths["/api/reports/sales/"]["get"]["parameters"]
+        assert {"level", "start", "end"} <= {p["name"] for p in params}
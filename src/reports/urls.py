@@ -0,0 +1,10 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import SalesReportViewSet
+
+router = DefaultRouter()
+router.register(r"sales", SalesReportViewSet, basename="sales-report")
+
+urlpatterns = [
+    path("", include(router.urls)),
+]
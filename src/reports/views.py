@@ -0,0 +1,48 @@
+from drf_spectacular.utils import extend_schema
+from rest_framework import mixins, viewsets
+from rest_framework.permissions import IsAdminUser
+from products.pagination import StandardResultsSetPagination
+from .serializers import (
+    DailyCategorySalesSerializer,
+    DailyProductSalesSerializer,
+    DailyVariantSalesSerializer,
+    SalesReportQuerySerializer,
+)
+
+SERIALIZERS = {
+    "variant": DailyVariantSalesSerializer,
+    "product": DailyProductSalesSerializer,
+    "category": DailyCategorySalesSerializer,
+}
+
+
+class SalesReportViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Daily units and revenue per variant, product or category (admin only).
+    Reads only the rollup tables: ?level=product&start=2026-01-01&end=2026-01-31
+    """
+
+    permission_classes = [IsAdminUser]
+    pagination_class = StandardResultsSetPagination
+
+    def get_serializer_class(self):
+        # Picked from `level` alone so schema generation (no query params)
+        # still resolves a serializer; list() validates the full query
+        level = self.request.query_params.get("level") if self.request else None
+        return SERIALIZERS.get(level, DailyProductSalesSerializer)
+
+    def get_queryset(self):
+        model = self.get_serializer_class().Meta.model
+        params = getattr(self, "params", None)
+        if params is None:
+            return model.objects.none()
+        return model.objects.filter(
+            day__gte=params["start"], day__lte=params["end"]
+        ).order_by("day", "id")
+
+    @extend_schema(parameters=[SalesReportQuerySerializer])
+    def list(self, request, *args, **kwargs):
+        query = SalesReportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        self.params = query.validated_data
+        return super().list(request, *args, **kwargs)
@@ -0,0 +1,129 @@
+import hashlib
+import posixpath
+
+from django.apps import apps
+from django.core.files import File
+from django.core.files.storage import Storage, default_storage
+from django.db import models
+
+BLOB_PREFIX = "blobs"
+
+
+def file_digest(content):
+    """Returns the SHA-256 hex digest of an uploaded file, leaving it rewound."""
+    hasher = hashlib.sha256()
+    if hasattr(content, "seek"):
+        content.seek(0)
+    for chunk in content.chunks():
+        hasher.update(chunk)
+    if hasattr(content, "seek"):
+        content.seek(0)
+    return hasher.hexdigest()
+
+
+def deduplicated_fields():
+    """Yields (model, field_name) for every file field backed by DeduplicatedStorage."""
+    for model in apps.get_models():
+        for field in model._meta.get_fields():
+            if isinstance(field, models.FileField) and isinstance(
+                field.storage, DeduplicatedStorage
+            ):
+                yield model, field.name
+
+
+def find_blob(digest):
+    """Returns the name of an already stored blob with the given digest, if any."""
+    prefix = f"{BLOB_PREFIX}/{digest}/"
+    for model, field_name in deduplicated_fields():
+        name = (
+            model._base_manager.filter(**{f"{field_name}__startswith": prefix})
+            .values_list(field_name, flat=True)
+            .first()
+        )
+        if name:
+            return name
+    return None
+
+
+def count_references(name):
+    """Counts the rows (across all deduplicated fields) that point to a stored blob."""
+    return sum(
+        model._base_manager.filter(**{field_name: name}).count()
+        for model, field_name in deduplicated_fields()
+    )
+
+
+class DeduplicatedStorage(Storage):
+    """
+    Content-addressed wrapper around the default storage.
+
+    Uploads are stored under blobs/<sha256>/<filename>, so identical content is
+    written once and shared by every row that uploads it. Deletes (issued by
+    django_cleanup) only reach the backend once no row references the blob.
+
+    The layout is deliberately flat: a blob can be shared by ProductImage and
+    ContentBlock rows, so the fields' upload_to prefixes (products/, content/)
+    are not part of the stored name; only the original filename is kept.
+    """
+
+    def __init__(self, backend=None):
+        self._backend = backend
+
+    @property
+    def backend(self):
+        return self._backend or default_storage
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        digest = file_digest(content)
+        existing = find_blob(digest)
+        if existing:
+            return existing
+
+        name = posixpath.join(BLOB_PREFIX, digest, posixpath.basename(name))
+        if self.backend.exists(name):
+            # Same digest and filename: written by an upload whose row is not
+            # committed yet (or not saved at all); the content is identical
+            return name
+        saved = self.backend.save(name, content, max_length=max_length)
+        if saved != name and self.backend.exists(name):
+            # A concurrent upload of the same content wrote `name` between the
+            # exists() check and our write, and the backend picked another
+            # name for ours: keep the single canonical blob
+            self.backend.delete(saved)
+            return name
+        return saved
+
+    def delete(self, name):
+        if count_references(name):
+            return
+        self.backend.delete(name)
+
+    def _open(self, name, mode="rb"):
+        return self.backend.open(name, mode)
+
+    def exists(self, name):
+        return self.backend.exists(name)
+
+    def url(self, name):
+        return self.backend.url(name)
+
+    def path(self, name):
+        return self.backend.path(name)
+
+    def size(self, name):
+        return self.backend.size(name)
+
+    def listdir(self, path):
+        return self.backend.listdir(path)
+
+
+media_storage = DeduplicatedStorage()
+
+
+def get_media_storage():
+    """Storage callable for ImageFields that share deduplicated blobs."""
+    return media_storage
@@ -12,6 +12,7 @@ from decimal import Decimal
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import override_settings
 from rest_framework.test import APIClient
 from orders.models import Cart, CartProduct
@@ -36,6 +37,14 @@ def media_root_tmp(request):
         shutil.rmtree(tmp_dir)
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Starts every test with an empty cache so cached payloads never leak."""
+    cache.clear()
+    yield
+    cache.clear()
+
+
 # ============================================================================
 # API Client Fixtures
 # ============================================================================